@@ -1,5 +1,5 @@
 from pydantic import BaseModel
-from typing import Optional, List
+from typing import Optional, List, Literal, Tuple
 
 
 class CameraInfo(BaseModel):
@@ -18,11 +18,33 @@ class StreamConfig(BaseModel):
     detection_model_path: str
     classes: Optional[List[str]] = None  # opcional
     tracker_model: str
-    frames_per_second: int
+    frames_per_second: float  # aceita taxas fracionárias (ex: 0.5)
     frames_before_disappearance: int
     confidence_threshold: float
     min_track_frames: int = 7  # opcional
     iou: float
+    weighted_class_vote: bool = False  # votação de classe ponderada pela confiança
+    snapshot_mode: Literal["frame", "crop"] = "frame"  # imagem enviada no evento
+    snapshot_margin: float = 0.25  # margem do recorte, em fração do tamanho da bbox
+    snapshot_thumbnail_width: Optional[int] = None  # miniatura do frame no modo crop
+    # backend de inferência: pesos PyTorch ou modelo exportado (em cache)
+    inference_backend: Literal["pytorch", "onnx", "openvino", "onnx-int8"] = "pytorch"
+    # lado maior da entrada do modelo (imgsz, múltiplo de 32); o frame não é
+    # redimensionado antes, o modelo faz o letterbox direto para esse tamanho
+    inference_size: int = 640
+    # ajuste da taxa de frames pela carga, entre os limites (padrão: fps/4 e fps)
+    adaptive_fps: bool = False
+    min_frames_per_second: Optional[float] = None
+    max_frames_per_second: Optional[float] = None
+    # pula a detecção quando a fração de pixels alterados fica abaixo do limite,
+    # com uma inferência forçada a cada motion_keepalive_seconds
+    motion_gate: bool = False
+    motion_threshold: float = 0.005
+    motion_keepalive_seconds: float = 10.0
+    # polígonos da região de interesse, em coordenadas normalizadas (0 a 1) do frame;
+    # a inferência roda só no recorte que os envolve
+    roi: Optional[List[List[Tuple[float, float]]]] = None
+    roi_filter: bool = True  # descarta detecções com a base fora dos polígonos
 
 
 class MultiStreamConfig(BaseModel):
@@ -33,11 +55,25 @@ class MultiStreamConfig(BaseModel):
     detection_model_path: str
     classes: Optional[List[str]] = None
     tracker_model: str
-    frames_per_second: int
+    frames_per_second: float  # aceita taxas fracionárias (ex: 0.5)
     frames_before_disappearance: int
     confidence_threshold: float
     min_track_frames: int = 7
     iou: float
+    weighted_class_vote: bool = False
+    snapshot_mode: Literal["frame", "crop"] = "frame"
+    snapshot_margin: float = 0.25
+    snapshot_thumbnail_width: Optional[int] = None
+    inference_backend: Literal["pytorch", "onnx", "openvino", "onnx-int8"] = "pytorch"
+    inference_size: int = 640
+    adaptive_fps: bool = False
+    min_frames_per_second: Optional[float] = None
+    max_frames_per_second: Optional[float] = None
+    motion_gate: bool = False
+    motion_threshold: float = 0.005
+    motion_keepalive_seconds: float = 10.0
+    roi: Optional[List[List[Tuple[float, float]]]] = None
+    roi_filter: bool = True
 
 
 class CameraResponse(BaseModel):
@@ -60,3 +96,6 @@ class MonitoredCamerasResponse(BaseModel):
     """Resposta com lista de câmeras monitoradas."""
 
     cameras: List[dict]
+    event_dispatcher: Optional[dict] = None
+    camera_launcher: Optional[dict] = None
+    camera_pool: Optional[dict] = None
@@ -1,5 +1,5 @@
 from pydantic import BaseModel
-from typing import Tuple, List
+from typing import Tuple, List, Optional
 
 
 class Event(BaseModel):
@@ -15,3 +15,6 @@ class Event(BaseModel):
     ]  # coordenada inicial do "quadrado" que identifica o objeto
     coord_end: Tuple[int, int]  # coordenada final do "quadrado" que identifica o objeto
     print: bytes  # print da imagem analisada
+    # origem (x, y) do recorte no frame original, quando o print é só o recorte do objeto
+    crop_origin: Optional[Tuple[int, int]] = None
+    thumbnail: Optional[bytes] = None  # miniatura do frame inteiro (opcional)
@@ -20,13 +20,22 @@ from app.core.camera_service import (
 )
 from app.utils.logging_utils import setup_logger
 from app.core.process_manager import process_manager  # ← NOVO
+from app.core.camera_status import CameraStatus
+from app.config import settings
 
 logger = setup_logger("camera_routes")
 
 router = APIRouter(tags=["cameras"])
 
 
-def _start_camera_in_process(camera_info_dict: dict, stream_config_dict: dict):
+def _start_camera_in_process(
+    camera_info_dict: dict,
+    stream_config_dict: dict,
+    inference_channel=None,
+    capture_channel=None,
+    event_channel=None,
+    camera_status=None,
+):
     """
     Função que roda em um processo separado.
     Converte dicts de volta para objetos e inicia o processamento.
@@ -39,7 +48,144 @@ def _start_camera_in_process(camera_info_dict: dict, stream_config_dict: dict):
     stream_config = StreamConfig(**stream_config_dict)
     
     # Processar stream (isso roda em processo separado - sem GIL!)
-    process_camera_stream(camera_info, stream_config)
+    process_camera_stream(
+        camera_info,
+        stream_config,
+        inference_channel,
+        capture_channel,
+        event_channel,
+        camera_status,
+    )
+
+
+def _register_inference_channel(camera_id: int):
+    """
+    Registra a câmera no servidor de inferência compartilhado, se habilitado.
+    Retorna o canal a ser passado ao processo da câmera (ou None).
+    """
+    # No modo pool os workers fazem a inferência em lote das suas câmeras
+    if not settings.INFERENCE_SERVER or settings.EXECUTION_MODE == "pool":
+        return None
+
+    from app.core.inference_server import inference_server
+
+    return inference_server.register_camera(camera_id)
+
+
+def _unregister_inference_channel(camera_id: int) -> None:
+    """Remove a câmera do servidor de inferência compartilhado, se habilitado."""
+    if not settings.INFERENCE_SERVER or settings.EXECUTION_MODE == "pool":
+        return
+
+    from app.core.inference_server import inference_server
+
+    inference_server.unregister_camera(camera_id)
+
+
+def _start_capture_channel(camera_info: CameraInfo, stream_config: StreamConfig):
+    """
+    Inicia o processo de captura da câmera, se CAPTURE_MODE=process.
+    Retorna (processos auxiliares, canal a ser passado ao processo da câmera).
+    """
+    if settings.CAPTURE_MODE != "process":
+        return [], None
+
+    from app.core.frame_capture import start_capture_process
+
+    capture_process, capture_channel = start_capture_process(
+        camera_info.camera_id, camera_info.url, stream_config.frames_per_second
+    )
+    return [capture_process], capture_channel
+
+
+def _event_channel():
+    """Canal do despachante de eventos do nó (iniciado no primeiro uso)."""
+    from app.core.event_dispatcher import event_dispatcher
+
+    return event_dispatcher.get_channel()
+
+
+def _release_inference_channel(inference_channel) -> None:
+    """Fecha no processo da API a ponta de resposta herdada pelo processo da câmera."""
+    if inference_channel is not None:
+        inference_channel[1].close()
+
+
+def _launch_camera(
+    camera_info: CameraInfo,
+    stream_config: StreamConfig,
+    inference_channel,
+    camera_status: CameraStatus,
+):
+    """
+    Inicia a câmera conforme EXECUTION_MODE: em uma thread da API, em um
+    worker do pool ou em um processo próprio (por fork do zygote, com
+    CAMERA_LAUNCHER=zygote, ou diretamente pela API).
+    Retorna (processo, processos auxiliares).
+    """
+    if settings.EXECUTION_MODE == "thread":
+        from app.core.detection_service import start_camera_processing
+
+        helpers, capture_channel = _start_capture_channel(camera_info, stream_config)
+        thread = start_camera_processing(
+            camera_info,
+            stream_config,
+            inference_channel,
+            capture_channel,
+            _event_channel(),
+            camera_status,
+        )
+        return thread, helpers
+
+    if settings.EXECUTION_MODE == "pool":
+        from app.core.camera_pool import camera_pool
+
+        handle = camera_pool.add_camera(
+            camera_info.model_dump(), stream_config.model_dump(), camera_status
+        )
+        return handle, []
+
+    try:
+        if settings.CAMERA_LAUNCHER == "zygote":
+            from app.core.worker_launcher import camera_launcher
+
+            launched = camera_launcher.launch(
+                camera_info.model_dump(),
+                stream_config.model_dump(),
+                inference_channel,
+                camera_status,
+            )
+            if launched is not None:
+                return launched
+
+        return _start_camera_process(camera_info, stream_config, inference_channel, camera_status)
+    finally:
+        _release_inference_channel(inference_channel)
+
+
+def _start_camera_process(
+    camera_info: CameraInfo,
+    stream_config: StreamConfig,
+    inference_channel,
+    camera_status: CameraStatus,
+):
+    """Cria o processo da câmera (e os auxiliares) diretamente pela API."""
+    helpers, capture_channel = _start_capture_channel(camera_info, stream_config)
+    process = mp.Process(
+        target=_start_camera_in_process,
+        args=(
+            camera_info.model_dump(),
+            stream_config.model_dump(),
+            inference_channel,
+            capture_channel,
+            _event_channel(),
+            camera_status,
+        ),
+        daemon=True,
+        name=f"camera_{camera_info.camera_id}",
+    )
+    process.start()
+    return process, helpers
 
 
 @router.post("/monitor", response_model=CameraResponse)
@@ -56,16 +202,15 @@ async def start_monitoring(
         if "camera" in response and response["camera"] is not None:
             # Inicia processo separado (não thread!)
             camera_info = response["camera"]
+            inference_channel = _register_inference_channel(camera_id)
+            camera_status = CameraStatus()
             
-            process = mp.Process(
-                target=_start_camera_in_process,
-                args=(camera_info.model_dump(), stream_config.model_dump()),
-                daemon=True,
+            process, helpers = _launch_camera(
+                camera_info, stream_config, inference_channel, camera_status
             )
-            process.start()
             
             # Registrar no gerenciador
-            process_manager.add_process(camera_id, process)
+            process_manager.add_process(camera_id, process, helpers, camera_status)
 
         return response
     except Exception as exc:
@@ -89,11 +234,27 @@ async def start_monitoring_batch(
     from app.core.shared_state import active_streams
     import datetime
     
-    # PRÉ-CARREGAR modelo YOLO no processo principal
-    logger.info(f"Pré-carregando modelo YOLO: {multi_config.detection_model_path}")
-    from app.core.detection_service import get_or_load_model
-    get_or_load_model(multi_config.detection_model_path)
-    logger.info(f"Modelo YOLO pré-carregado")
+    # PRÉ-CARREGAR modelo YOLO no zygote (ou no processo principal), herdado
+    # pelos processos das câmeras
+    # (com o servidor de inferência o modelo fica apenas nos workers dele e no
+    # modo pool cada worker carrega o seu)
+    if not settings.INFERENCE_SERVER and settings.EXECUTION_MODE != "pool":
+        logger.info(f"Pré-carregando modelo YOLO: {multi_config.detection_model_path}")
+        if settings.EXECUTION_MODE == "process" and settings.CAMERA_LAUNCHER == "zygote":
+            from app.core.worker_launcher import camera_launcher
+            camera_launcher.preload(
+                multi_config.detection_model_path,
+                multi_config.inference_backend,
+                multi_config.inference_size,
+            )
+        else:
+            from app.core.detection_service import get_or_load_model
+            get_or_load_model(
+                multi_config.detection_model_path,
+                multi_config.inference_backend,
+                multi_config.inference_size,
+            )
+        logger.info(f"Modelo YOLO pré-carregado")
     
     # Lista para armazenar processos
     processes = []
@@ -113,6 +274,20 @@ async def start_monitoring_batch(
                 confidence_threshold=multi_config.confidence_threshold,
                 min_track_frames=multi_config.min_track_frames,
                 iou=multi_config.iou,
+                weighted_class_vote=multi_config.weighted_class_vote,
+                snapshot_mode=multi_config.snapshot_mode,
+                snapshot_margin=multi_config.snapshot_margin,
+                snapshot_thumbnail_width=multi_config.snapshot_thumbnail_width,
+                inference_backend=multi_config.inference_backend,
+                inference_size=multi_config.inference_size,
+                adaptive_fps=multi_config.adaptive_fps,
+                min_frames_per_second=multi_config.min_frames_per_second,
+                max_frames_per_second=multi_config.max_frames_per_second,
+                motion_gate=multi_config.motion_gate,
+                motion_threshold=multi_config.motion_threshold,
+                motion_keepalive_seconds=multi_config.motion_keepalive_seconds,
+                roi=multi_config.roi,
+                roi_filter=multi_config.roi_filter,
             )
             
             # Obter informações da câmera
@@ -141,19 +316,17 @@ async def start_monitoring_batch(
                 "started_at": datetime.datetime.now().isoformat(),
             }
             
+            inference_channel = _register_inference_channel(camera_id)
+            camera_status = CameraStatus()
+
             # Criar e INICIAR processo imediatamente (não espera!)
-            process = mp.Process(
-                target=_start_camera_in_process,
-                args=(camera_info.model_dump(), stream_config.model_dump()),
-                daemon=True,
-                name=f"camera_{camera_id}"
+            process, helpers = _launch_camera(
+                camera_info, stream_config, inference_channel, camera_status
             )
-            
-            process.start()
             processes.append((camera_id, process))
             
             # Registrar no gerenciador
-            process_manager.add_process(camera_id, process)
+            process_manager.add_process(camera_id, process, helpers, camera_status)
             
             successful.append(camera_id)
             logger.info(f"✓ Processo para câmera {camera_id} iniciado (PID: {process.pid})")
@@ -189,6 +362,8 @@ async def stop_all_monitoring_route() -> Dict[str, Any]:
     """
     try:
         # Usar o gerenciador para terminar todos os processos
+        for camera_id in list(process_manager.processes.keys()):
+            _unregister_inference_channel(camera_id)
         process_manager.cleanup_all()
         
         return await stop_all_monitoring()
@@ -205,6 +380,7 @@ async def stop_monitoring_route(camera_id: int) -> Dict[str, str]:
     try:
         # Usar o gerenciador para terminar o processo
         process_manager.remove_process(camera_id)
+        _unregister_inference_channel(camera_id)
         
         result = await stop_monitoring_camera(camera_id)
 
@@ -238,7 +414,18 @@ async def get_monitored_cameras_route() -> Dict[str, List[Dict[str, Any]]]:
             if camera_id in process_info:
                 camera['process_info'] = process_info[camera_id]
         
-        return {"cameras": cameras}
+        from app.core.event_dispatcher import event_dispatcher
+
+        response = {"cameras": cameras, "event_dispatcher": event_dispatcher.get_info()}
+        if settings.EXECUTION_MODE == "pool":
+            from app.core.camera_pool import camera_pool
+
+            response["camera_pool"] = camera_pool.get_info()
+        elif settings.EXECUTION_MODE == "process" and settings.CAMERA_LAUNCHER == "zygote":
+            from app.core.worker_launcher import camera_launcher
+
+            response["camera_launcher"] = camera_launcher.get_info()
+        return response
     except Exception as exc:
         logger.error(f"Erro ao obter câmeras monitoradas: {exc}")
         raise HTTPException(status_code=500, detail="Erro interno do servidor")
@@ -25,13 +25,75 @@ SPECIFICATIONS_PATH = get_env_var("SPECIFICATIONS_PATH")
 SEND_EVENT_URL = get_env_var("SEND_EVENT_URL")
 SEND_EVENT_TIMEOUT = int(get_env_var("SEND_EVENT_TIMEOUT"))
 
+# Despachante de eventos centralizado (um por nó, alimentado por todas as câmeras)
+SEND_EVENT_BATCH_URL = os.getenv(
+    "SEND_EVENT_BATCH_URL", SEND_EVENT_URL.rstrip("/") + "/batch"
+)
+EVENT_QUEUE_SIZE = int(os.getenv("EVENT_QUEUE_SIZE", "1000"))
+EVENT_BATCH_SIZE = int(os.getenv("EVENT_BATCH_SIZE", "50"))
+EVENT_FLUSH_INTERVAL_MS = float(os.getenv("EVENT_FLUSH_INTERVAL_MS", "500"))
+
+# Spool em disco para eventos não entregues (ativo por padrão, ao lado do
+# MODEL_CACHE_DIR; EVENT_SPOOL_DIR=off desativa)
+EVENT_SPOOL_DIR = os.getenv("EVENT_SPOOL_DIR", "event_spool")
+if EVENT_SPOOL_DIR.strip().lower() in ("", "off", "none", "false", "0"):
+    EVENT_SPOOL_DIR = ""
+EVENT_SPOOL_SEGMENT_MB = int(os.getenv("EVENT_SPOOL_SEGMENT_MB", "16"))
+EVENT_SPOOL_MAX_MB = int(os.getenv("EVENT_SPOOL_MAX_MB", "512"))
+EVENT_SPOOL_RETRY_MAX_S = float(os.getenv("EVENT_SPOOL_RETRY_MAX_S", "30"))
+
 # Configurações de conexão de câmera (opcional)
 MAX_RECONNECT_ATTEMPTS = int(os.getenv("MAX_RECONNECT_ATTEMPTS", "5"))
 INITIAL_RECONNECT_DELAY = int(os.getenv("INITIAL_RECONNECT_DELAY", "2"))
 
 QUALITY_CONVERT = int(get_env_var("QUALITY_CONVERT"))  # Qualidade JPEG (1-100)
 
-RESIZE_FRAME = bool(get_env_var("RESIZE_FRAME"))
 WIDTH_RESIZE = int(
     get_env_var("WIDTH_CONVERT")
 )  # Largura para redimensionamento de frames
+
+
+def get_bool_env_var(name: str, default: str = "False") -> bool:
+    return os.getenv(name, default).strip().lower() in ("1", "true", "yes", "on")
+
+
+# Servidor de inferência compartilhado entre os processos de câmera (opcional)
+INFERENCE_SERVER = get_bool_env_var("INFERENCE_SERVER")
+INFERENCE_SERVER_WORKERS = int(os.getenv("INFERENCE_SERVER_WORKERS", "1"))
+INFERENCE_MAX_BATCH_SIZE = int(os.getenv("INFERENCE_MAX_BATCH_SIZE", "16"))
+INFERENCE_MAX_WAIT_MS = float(os.getenv("INFERENCE_MAX_WAIT_MS", "10"))
+INFERENCE_REQUEST_TIMEOUT = float(os.getenv("INFERENCE_REQUEST_TIMEOUT", "5"))
+
+# Modo de captura dos frames: "thread" (no processo da câmera) ou "process"
+# (processo próprio gravando em um buffer de memória compartilhada)
+CAPTURE_MODE = os.getenv("CAPTURE_MODE", "thread").strip().lower()
+FRAME_RING_SLOTS = int(os.getenv("FRAME_RING_SLOTS", "4"))
+FRAME_RING_MAX_WIDTH = int(os.getenv("FRAME_RING_MAX_WIDTH", "1920"))
+FRAME_RING_MAX_HEIGHT = int(os.getenv("FRAME_RING_MAX_HEIGHT", "1080"))
+
+# Criação dos processos de câmera: "process" (padrão, mp.Process criado pela API)
+# ou "zygote" (fork a partir de um processo com módulos e modelos já carregados)
+CAMERA_LAUNCHER = os.getenv("CAMERA_LAUNCHER", "process").strip().lower()
+
+# Execução das câmeras: "process" (um processo por câmera), "thread" (uma
+# thread por câmera no processo da API, com o modelo compartilhado) ou "pool"
+# (POOL_WORKERS processos, cada um atendendo várias câmeras)
+EXECUTION_MODE = os.getenv("EXECUTION_MODE", "process").strip().lower()
+
+# Número de workers no modo pool (padrão: metade dos núcleos)
+POOL_WORKERS = int(os.getenv("POOL_WORKERS", str(max(1, (os.cpu_count() or 2) // 2))))
+
+# Inferências de aquecimento antes de conectar à câmera (0 desativa)
+WARMUP_ITERATIONS = int(os.getenv("WARMUP_ITERATIONS", "3"))
+
+# Codificador JPEG dos snapshots: auto, opencv, turbojpeg ou simplejpeg
+# (com fallback automático para o próximo disponível)
+JPEG_ENCODER = os.getenv("JPEG_ENCODER", "auto")
+JPEG_FAST_PRESET = get_bool_env_var("JPEG_FAST_PRESET")
+
+# Cache de modelos exportados (ONNX / OpenVINO)
+MODEL_CACHE_DIR = os.getenv("MODEL_CACHE_DIR", "model_cache")
+
+# Quantização INT8: frames de calibração capturados das câmeras
+QUANT_CALIBRATION_DIR = os.getenv("QUANT_CALIBRATION_DIR", "calibration_frames")
+QUANT_CALIBRATION_FRAMES = int(os.getenv("QUANT_CALIBRATION_FRAMES", "200"))
@@ -0,0 +1,89 @@
+"""
+Seleção da melhor imagem (best-shot) de cada objeto rastreado.
+
+Cada detecção recebe uma pontuação a partir da área relativa da bbox, da
+confiança, da distância até a borda do frame e da nitidez da região. A tabela
+de tracks guarda apenas uma referência ao melhor frame candidato de cada
+objeto; a codificação JPEG acontece só quando o track é finalizado e o evento
+é de fato enviado.
+
+A nitidez (variância do Laplaciano) é o único termo com custo relevante, por
+isso só é calculada para detecções cuja pontuação parcial já supera a melhor
+pontuação atual do track (a nitidez apenas reduz a pontuação).
+"""
+import cv2
+import numpy as np
+
+# Distância até a borda (em fração do menor lado do frame) a partir da qual
+# o objeto não é penalizado por estar cortado
+EDGE_MARGIN_FRACTION = 0.05
+
+# Variância do Laplaciano que corresponde a meia nitidez
+SHARPNESS_REFERENCE = 100.0
+
+# Maior lado da região usada para medir a nitidez
+SHARPNESS_MAX_SIDE = 64
+
+
+def base_scores(
+    boxes: np.ndarray, confidences: np.ndarray, frame_shape: tuple
+) -> np.ndarray:
+    """
+    Pontuação parcial (área relativa x confiança x distância da borda) de cada
+    detecção. É um limite superior da pontuação final.
+    """
+    height, width = frame_shape[:2]
+    boxes = boxes.astype(np.float32)
+
+    areas = (boxes[:, 2] - boxes[:, 0]) * (boxes[:, 3] - boxes[:, 1])
+    relative_areas = areas / float(width * height)
+
+    edge_distance = np.minimum.reduce(
+        [boxes[:, 0], boxes[:, 1], width - boxes[:, 2], height - boxes[:, 3]]
+    )
+    edge_reference = EDGE_MARGIN_FRACTION * min(width, height)
+    edge_factor = 0.5 + 0.5 * np.clip(edge_distance / edge_reference, 0.0, 1.0)
+
+    return relative_areas * confidences.astype(np.float32) * edge_factor
+
+
+def sharpness_factor(frame: np.ndarray, box: np.ndarray) -> float:
+    """Fator de nitidez em [0.5, 1) da região da bbox."""
+    x1, y1, x2, y2 = box.tolist()
+    region = frame[y1:y2, x1:x2]
+    if region.size == 0:
+        return 0.5
+
+    longest_side = max(region.shape[:2])
+    if longest_side > SHARPNESS_MAX_SIDE:
+        scale = SHARPNESS_MAX_SIDE / longest_side
+        region = cv2.resize(
+            region,
+            (max(1, int(region.shape[1] * scale)), max(1, int(region.shape[0] * scale))),
+            interpolation=cv2.INTER_AREA,
+        )
+
+    if region.ndim == 3:
+        region = cv2.cvtColor(region, cv2.COLOR_BGR2GRAY)
+
+    variance = float(cv2.Laplacian(region, cv2.CV_32F).var())
+    return 0.5 + 0.5 * variance / (variance + SHARPNESS_REFERENCE)
+
+
+def score_detections(
+    frame: np.ndarray,
+    boxes: np.ndarray,
+    confidences: np.ndarray,
+    current_best: np.ndarray,
+) -> np.ndarray:
+    """
+    Pontuação final das detecções. Detecções que não podem superar a melhor
+    pontuação atual do seu track mantêm a pontuação parcial, sem calcular a
+    nitidez (elas não serão escolhidas de qualquer forma).
+    """
+    scores = base_scores(boxes, confidences, frame.shape)
+
+    for index in np.flatnonzero(scores > current_best).tolist():
+        scores[index] *= sharpness_factor(frame, boxes[index])
+
+    return scores
@@ -0,0 +1,500 @@
+"""
+Pool de workers de câmera (EXECUTION_MODE=pool).
+
+Em vez de um processo por câmera, POOL_WORKERS processos atendem todas as
+câmeras (M câmeras : N workers). Cada worker:
+
+- mantém uma thread de captura por câmera, que guarda apenas o frame
+  amostrado mais recente;
+- junta os frames prontos de todas as suas câmeras e executa um único
+  predict por grupo de câmeras com os mesmos parâmetros de inferência;
+- passa as detecções de cada câmera pelo tracker e pela tabela de objetos
+  dela (isolados por câmera) e publica os eventos no despachante do nó.
+
+Cada worker mede a fração do tempo ocupada com inferência e processamento;
+novas câmeras vão para o worker com menor carga medida (somada à estimativa
+das câmeras atribuídas que ainda não foram medidas).
+"""
+import atexit
+import multiprocessing as mp
+import threading
+import time
+from multiprocessing.connection import Connection
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.core.camera_status import CameraStatus
+from app.utils.logging_utils import setup_logger
+from app.utils.process_utils import process_memory
+from app.config import settings
+
+logger = setup_logger("camera_pool")
+
+# Contadores de carga de cada worker (mp.Array)
+STAT_BUSY = 0  # fração do tempo ocupada (média móvel)
+STAT_MEASURED_CAMERAS = 1  # câmeras que processaram frames na última janela
+STAT_FRAMES = 2  # frames processados
+NUM_STATS = 3
+
+# Janela de medição da carga (s) e peso da média móvel
+LOAD_WINDOW = 2.0
+LOAD_SMOOTHING = 0.5
+
+
+class _PoolCamera:
+    """Estado de uma câmera dentro de um worker do pool."""
+
+    def __init__(self, camera_info, stream_config, camera_status: CameraStatus):
+        self.camera_info = camera_info
+        self.stream_config = stream_config
+        self.status = camera_status
+        self.should_stop = threading.Event()
+        self.thread: Optional[threading.Thread] = None
+        self.sampler = None
+        self.fps_controller = None
+        self.motion_gate = None
+        self.failed = False
+        self._frame = None
+        self._lock = threading.Lock()
+
+    def put_frame(self, frame) -> None:
+        with self._lock:
+            self._frame = (time.time(), frame)
+
+    def take_frame(self):
+        """(instante da captura, frame) mais recente ainda não processado, ou None."""
+        with self._lock:
+            frame, self._frame = self._frame, None
+        return frame
+
+
+def _pool_worker_main(
+    worker_id: int,
+    control_conn: Connection,
+    event_channel: tuple,
+    stats,
+) -> None:
+    """Loop principal de um worker do pool (roda em processo separado)."""
+    from app.api.models.camera import CameraInfo, StreamConfig
+    from app.core import detection_service
+    from app.core.event_dispatcher import EventPublisher
+    from app.core.frame_capture import capture_loop
+    from app.core.frame_sampler import FrameSampler
+    from app.core.inference_server import _stream_params
+    from app.core.shared_state import active_streams
+
+    worker_logger = setup_logger(f"camera_pool_{worker_id}")
+    # Ponta do despachante de eventos, usada por todas as câmeras do worker
+    publisher = EventPublisher(event_channel)
+
+    cameras: Dict[int, _PoolCamera] = {}
+    frames_ready = threading.Event()
+    warmed_models = set()
+
+    def add_camera(camera_info_dict, stream_config_dict, camera_status) -> None:
+        camera_info = CameraInfo(**camera_info_dict)
+        stream_config = StreamConfig(**stream_config_dict)
+        cam_id = camera_info.camera_id
+        camera = _PoolCamera(camera_info, stream_config, camera_status)
+
+        camera_status.set_state("loading")
+        detector = detection_service.get_shared_detector(
+            stream_config.detection_model_path,
+            stream_config.inference_backend,
+            stream_config.inference_size,
+        )
+        detection_service.initialize_tracker_for_camera(cam_id)
+
+        # O aquecimento é feito uma vez por modelo no worker (bloqueia as demais câmeras)
+        model_key = (
+            stream_config.detection_model_path,
+            stream_config.inference_backend,
+            stream_config.inference_size,
+        )
+        if settings.WARMUP_ITERATIONS > 0 and model_key not in warmed_models:
+            warmed_models.add(model_key)
+            camera_status.set_state("warming")
+            try:
+                warmup_seconds = detection_service.warmup_model(
+                    detector, stream_config, settings.WARMUP_ITERATIONS
+                )
+                camera_status.set_warmup(warmup_seconds, settings.WARMUP_ITERATIONS)
+            except Exception as e:
+                worker_logger.warning(f"Câmera {cam_id}: falha no aquecimento do modelo: {e}")
+
+        camera.fps_controller = detection_service.create_fps_controller(stream_config)
+        camera.motion_gate = detection_service.create_motion_gate(stream_config)
+        camera.sampler = FrameSampler(
+            camera.fps_controller.fps if camera.fps_controller else stream_config.frames_per_second
+        )
+        camera_status.set_effective_fps(camera.sampler.target_fps)
+
+        def on_frame(frame) -> None:
+            camera.put_frame(frame)
+            frames_ready.set()
+
+        def capture() -> None:
+            if not capture_loop(
+                cam_id,
+                camera_info.url,
+                camera.should_stop,
+                on_frame,
+                time.time(),
+                camera.sampler,
+            ):
+                camera.failed = True
+                frames_ready.set()
+
+        camera.thread = threading.Thread(target=capture, daemon=True, name=f"capture_{cam_id}")
+        cameras[cam_id] = camera
+        camera.thread.start()
+        camera_status.set_state("running")
+        worker_logger.info(f"Câmera {cam_id} adicionada ao worker {worker_id}")
+
+    def remove_camera(cam_id: int) -> None:
+        camera = cameras.pop(cam_id, None)
+        if camera is None:
+            return
+
+        camera.should_stop.set()
+        camera.thread.join(timeout=5)
+
+        # Estado por câmera do processo
+        detection_service.release_camera_state(cam_id)
+        active_streams.pop(cam_id, None)
+
+        camera.status.set_state("stopped")
+        camera.status.close()
+        worker_logger.info(f"Câmera {cam_id} removida do worker {worker_id}")
+
+    def handle_control_messages() -> bool:
+        while control_conn.poll():
+            try:
+                message = control_conn.recv()
+            except EOFError:
+                return False
+
+            command = message[0]
+            if command == "add":
+                try:
+                    add_camera(*message[1:])
+                except Exception as e:
+                    worker_logger.error(f"Erro ao adicionar câmera: {e}")
+                    message[3].set_state("stopped")
+            elif command == "remove":
+                remove_camera(message[1])
+            elif command == "stop":
+                return False
+        return True
+
+    def gate_frame(camera: _PoolCamera, frame) -> bool:
+        """Aplica o motion_gate da câmera. Retorna True se o frame foi pulado."""
+        gate = camera.motion_gate
+        if gate is None:
+            return False
+
+        input_frame, _ = detection_service.prepare_frame(frame, camera.stream_config)
+        skipped = not gate.should_infer(input_frame)
+        if skipped:
+            detection_service.handle_static_frame(camera.stream_config, publisher)
+
+        cam_id = camera.stream_config.camera_id
+        detection_service.camera_metrics[cam_id].update(gate.stats())
+        camera.status.set_motion_skip_fraction(gate.skip_fraction)
+        return skipped
+
+    def process_group(camera_frames: List[Tuple[_PoolCamera, Any]]) -> None:
+        stream_config = camera_frames[0][0].stream_config
+        detector = detection_service.get_shared_detector(
+            stream_config.detection_model_path,
+            stream_config.inference_backend,
+            stream_config.inference_size,
+        )
+        prepared = [
+            detection_service.prepare_frame(frame, camera.stream_config)
+            for camera, (_, frame) in camera_frames
+        ]
+
+        inference_start = time.time()
+        try:
+            detections = detector.detect_batch(
+                [input_frame for input_frame, _ in prepared], stream_config
+            )
+        except Exception as e:
+            worker_logger.error(f"Erro na inferência em lote: {e}")
+            return
+        # O tempo do lote é dividido entre as câmeras
+        inference_time = (time.time() - inference_start) / len(camera_frames)
+
+        for (camera, (captured_at, frame)), prepared_frame, camera_detections in zip(
+            camera_frames, prepared, detections
+        ):
+            input_frame, roi = prepared_frame
+            cam_config = camera.stream_config
+            camera_start = time.time()
+            try:
+                frame_detections = detection_service.track_detections(
+                    cam_config,
+                    camera_detections,
+                    input_frame,
+                    detector.names,
+                    roi,
+                )
+                detection_service.record_inference(cam_config.camera_id, inference_time)
+                detection_service.handle_detections(
+                    cam_config, frame, frame_detections, publisher
+                )
+                detection_service.camera_metrics[cam_config.camera_id].update(
+                    camera.sampler.stats()
+                )
+
+                if camera.fps_controller is not None:
+                    new_fps = detection_service.update_frame_rate(
+                        camera.fps_controller,
+                        cam_config,
+                        inference_time + time.time() - camera_start,
+                        inference_start - captured_at,
+                        camera.status,
+                    )
+                    if new_fps is not None:
+                        camera.sampler.set_target_fps(new_fps)
+            except Exception as e:
+                worker_logger.error(
+                    f"Erro ao processar frame para câmera {cam_config.camera_id}: {e}"
+                )
+
+    worker_logger.info(f"Worker {worker_id} do pool iniciado")
+
+    window_start = time.monotonic()
+    busy_time = 0.0
+    measured = set()
+
+    while handle_control_messages():
+        if frames_ready.wait(timeout=0.1):
+            frames_ready.clear()
+            busy_start = time.monotonic()
+
+            # Câmeras cuja captura desistiu de reconectar saem do pool
+            for cam_id in [cam_id for cam_id, camera in cameras.items() if camera.failed]:
+                worker_logger.error(f"Câmera {cam_id}: captura encerrada")
+                remove_camera(cam_id)
+
+            # Frames prontos agrupados por parâmetros de inferência
+            groups: Dict[tuple, list] = {}
+            for cam_id, camera in cameras.items():
+                captured = camera.take_frame()
+                if captured is None:
+                    continue
+                measured.add(cam_id)
+                if not gate_frame(camera, captured[1]):
+                    groups.setdefault(_stream_params(camera.stream_config), []).append(
+                        (camera, captured)
+                    )
+
+            batch_size = max(1, settings.INFERENCE_MAX_BATCH_SIZE)
+            for camera_frames in groups.values():
+                for start in range(0, len(camera_frames), batch_size):
+                    process_group(camera_frames[start : start + batch_size])
+                    stats[STAT_FRAMES] += len(camera_frames[start : start + batch_size])
+
+            busy_time += time.monotonic() - busy_start
+
+        elapsed = time.monotonic() - window_start
+        if elapsed >= LOAD_WINDOW:
+            busy = busy_time / elapsed
+            stats[STAT_BUSY] = LOAD_SMOOTHING * stats[STAT_BUSY] + (1 - LOAD_SMOOTHING) * busy
+            stats[STAT_MEASURED_CAMERAS] = len(measured & set(cameras))
+            window_start = time.monotonic()
+            busy_time = 0.0
+            measured.clear()
+
+    for cam_id in list(cameras):
+        remove_camera(cam_id)
+    worker_logger.info(f"Worker {worker_id} do pool encerrado")
+
+
+class PoolCameraHandle:
+    """
+    Câmera atendida por um worker do pool. Expõe a parte da interface de
+    mp.Process usada pelo process_manager (o pid é o do worker).
+    """
+
+    def __init__(self, pool: "CameraPool", camera_id: int, worker_id: int, status: CameraStatus):
+        self._pool = pool
+        self._status = status
+        self.camera_id = camera_id
+        self.worker_id = worker_id
+        self._process = pool.workers[worker_id]["process"]
+        self.pid = self._process.pid
+        self.name = f"camera_{camera_id}@camera_pool_{worker_id}"
+
+    def is_alive(self) -> bool:
+        return self._process.is_alive() and self._status.state != "stopped"
+
+    @property
+    def exitcode(self) -> Optional[int]:
+        if self.is_alive():
+            return None
+        return self._process.exitcode if not self._process.is_alive() else 0
+
+    def terminate(self) -> None:
+        self._pool.remove_camera(self.camera_id)
+
+    def kill(self) -> None:
+        # Não há como matar só uma câmera: ela deixa de ser considerada ativa e
+        # o worker a remove quando atender o comando
+        self._pool.remove_camera(self.camera_id)
+        self._status.set_state("stopped")
+
+    def join(self, timeout: Optional[float] = None) -> None:
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while self.is_alive():
+            if deadline is not None and time.monotonic() >= deadline:
+                return
+            time.sleep(0.05)
+
+
+class CameraPool:
+    """Gerencia os workers do pool e a atribuição das câmeras por carga."""
+
+    def __init__(self, num_workers: int):
+        self.num_workers = max(1, num_workers)
+        self.workers: List[Dict[str, Any]] = []
+        self.camera_workers: Dict[int, int] = {}
+        self._lock = threading.Lock()
+        atexit.register(self.stop)
+
+    def start(self) -> None:
+        """Inicia os workers, se ainda não estiverem rodando."""
+        with self._lock:
+            if self.workers:
+                return
+
+            from app.core.event_dispatcher import event_dispatcher
+
+            event_channel = event_dispatcher.get_channel()
+
+            for worker_id in range(self.num_workers):
+                control_recv, control_send = mp.Pipe(duplex=False)
+                stats = mp.Array("d", NUM_STATS, lock=False)
+
+                process = mp.Process(
+                    target=_pool_worker_main,
+                    args=(worker_id, control_recv, event_channel, stats),
+                    daemon=True,
+                    name=f"camera_pool_{worker_id}",
+                )
+                process.start()
+                control_recv.close()
+
+                self.workers.append(
+                    {
+                        "process": process,
+                        "control": control_send,
+                        "stats": stats,
+                        "cameras": set(),
+                    }
+                )
+                logger.info(f"✓ Worker {worker_id} do pool iniciado (PID: {process.pid})")
+
+    def _estimated_loads(self) -> List[float]:
+        """
+        Carga de cada worker: fração ocupada medida mais o custo estimado das
+        câmeras atribuídas que ainda não foram medidas (custo médio por câmera
+        medido no pool; sem medições, cada câmera conta como uma unidade).
+        """
+        busy = [worker["stats"][STAT_BUSY] for worker in self.workers]
+        measured = [
+            min(int(worker["stats"][STAT_MEASURED_CAMERAS]), len(worker["cameras"]))
+            for worker in self.workers
+        ]
+
+        total_measured = sum(measured)
+        if total_measured == 0:
+            return [float(len(worker["cameras"])) for worker in self.workers]
+
+        camera_cost = sum(busy) / total_measured
+        return [
+            busy[index] + (len(worker["cameras"]) - measured[index]) * camera_cost
+            for index, worker in enumerate(self.workers)
+        ]
+
+    def add_camera(
+        self, camera_info_dict: dict, stream_config_dict: dict, camera_status: CameraStatus
+    ) -> PoolCameraHandle:
+        """Atribui a câmera ao worker menos carregado."""
+        self.start()
+        camera_id = camera_info_dict["camera_id"]
+        self.remove_camera(camera_id)
+
+        with self._lock:
+            loads = self._estimated_loads()
+            alive = [
+                index
+                for index, worker in enumerate(self.workers)
+                if worker["process"].is_alive()
+            ]
+            if not alive:
+                raise RuntimeError("Nenhum worker do pool ativo")
+
+            worker_id = min(alive, key=lambda index: loads[index])
+            worker = self.workers[worker_id]
+            worker["control"].send(("add", camera_info_dict, stream_config_dict, camera_status))
+            worker["cameras"].add(camera_id)
+            self.camera_workers[camera_id] = worker_id
+
+        logger.info(
+            f"Câmera {camera_id} atribuída ao worker {worker_id} do pool "
+            f"(carga estimada {loads[worker_id]:.2f})"
+        )
+        return PoolCameraHandle(self, camera_id, worker_id, camera_status)
+
+    def remove_camera(self, camera_id: int) -> None:
+        """Remove a câmera do worker ao qual estava atribuída."""
+        with self._lock:
+            worker_id = self.camera_workers.pop(camera_id, None)
+            if worker_id is None:
+                return
+
+            worker = self.workers[worker_id]
+            worker["cameras"].discard(camera_id)
+            try:
+                worker["control"].send(("remove", camera_id))
+            except (BrokenPipeError, OSError):
+                pass
+
+    def stop(self) -> None:
+        """Encerra todos os workers."""
+        with self._lock:
+            for worker in self.workers:
+                try:
+                    worker["control"].send(("stop",))
+                except (BrokenPipeError, OSError):
+                    pass
+
+            for worker in self.workers:
+                process = worker["process"]
+                process.join(timeout=10)
+                if process.is_alive():
+                    process.kill()
+                    process.join()
+
+            self.workers.clear()
+            self.camera_workers.clear()
+
+    def get_info(self) -> Dict[int, Dict[str, Any]]:
+        """Carga, câmeras e memória de cada worker do pool."""
+        return {
+            worker_id: {
+                "pid": worker["process"].pid,
+                "alive": worker["process"].is_alive(),
+                "cameras": sorted(worker["cameras"]),
+                "busy": round(worker["stats"][STAT_BUSY], 3),
+                "frames_processed": int(worker["stats"][STAT_FRAMES]),
+                "memory": process_memory(worker["process"].pid),
+            }
+            for worker_id, worker in enumerate(self.workers)
+        }
+
+
+# Instância global do pool (iniciado sob demanda)
+camera_pool = CameraPool(settings.POOL_WORKERS)
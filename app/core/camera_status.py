@@ -0,0 +1,118 @@
+"""
+Estado de prontidão de cada câmera, compartilhado entre o processo da câmera e
+o processo da API.
+
+O estado fica em um pequeno segmento de memória compartilhada criado pela API
+e atualizado pelo processo da câmera a cada transição (starting -> loading ->
+warming -> running). O /monitored apenas lê os valores: não há fila a drenar
+nem risco de corromper um canal se o processo da câmera for terminado no meio
+de uma escrita. O segmento é identificado pelo nome, então o objeto pode ser
+enviado ao zygote (app.core.worker_launcher) depois de criado.
+
+Há um único escritor por vez (o processo da câmera enquanto vive, o
+gerenciador de processos depois que ele termina), então não há lock.
+"""
+import struct
+import time
+from multiprocessing import shared_memory
+from typing import Any, Dict, Optional
+
+CAMERA_STATES = ("starting", "loading", "warming", "running", "stopped")
+
+# Posições no segmento compartilhado
+_STATE = 0
+_STATE_SINCE = 1
+_STARTED_AT = 2
+_RUNNING_AT = 3
+_WARMUP_SECONDS = 4
+_WARMUP_ITERATIONS = 5
+_EFFECTIVE_FPS = 6
+_MOTION_SKIP_FRACTION = 7
+_NUM_FIELDS = 8
+
+_FIELD = struct.Struct("d")
+
+
+class CameraStatus:
+    """Estado de uma câmera em memória compartilhada."""
+
+    def __init__(self, name: Optional[str] = None):
+        create = name is None
+        self.shm = shared_memory.SharedMemory(
+            name=name, create=create, size=_FIELD.size * _NUM_FIELDS if create else 0
+        )
+        self._owner = create
+
+        if create:
+            now = time.time()
+            self._set(_STATE_SINCE, now)
+            self._set(_STARTED_AT, now)
+            self._set(_RUNNING_AT, -1)
+            self._set(_WARMUP_SECONDS, -1)
+            self._set(_EFFECTIVE_FPS, -1)
+            self._set(_MOTION_SKIP_FRACTION, -1)
+        # Ao conectar pelo nome o segmento é registrado de novo no resource_tracker,
+        # que é o mesmo da API (os processos são criados por fork): o registro é
+        # único e só o unlink do dono o remove
+
+    def __reduce__(self):
+        return self.__class__, (self.shm.name,)
+
+    def _get(self, field: int) -> float:
+        return _FIELD.unpack_from(self.shm.buf, field * _FIELD.size)[0]
+
+    def _set(self, field: int, value: float) -> None:
+        _FIELD.pack_into(self.shm.buf, field * _FIELD.size, value)
+
+    def set_state(self, state: str) -> None:
+        now = time.time()
+        if state == "running":
+            self._set(_RUNNING_AT, now)
+        self._set(_STATE_SINCE, now)
+        self._set(_STATE, CAMERA_STATES.index(state))
+
+    def set_warmup(self, seconds: float, iterations: int) -> None:
+        self._set(_WARMUP_SECONDS, seconds)
+        self._set(_WARMUP_ITERATIONS, iterations)
+
+    def set_effective_fps(self, fps: float) -> None:
+        self._set(_EFFECTIVE_FPS, fps)
+
+    def set_motion_skip_fraction(self, fraction: float) -> None:
+        self._set(_MOTION_SKIP_FRACTION, fraction)
+
+    @property
+    def state(self) -> str:
+        return CAMERA_STATES[int(self._get(_STATE))]
+
+    def to_dict(self) -> Dict[str, Any]:
+        values = [self._get(field) for field in range(_NUM_FIELDS)]
+
+        running_at = values[_RUNNING_AT]
+        warmup_seconds = values[_WARMUP_SECONDS]
+        effective_fps = values[_EFFECTIVE_FPS]
+        skip_fraction = values[_MOTION_SKIP_FRACTION]
+        return {
+            "state": CAMERA_STATES[int(values[_STATE])],
+            "state_since": round(values[_STATE_SINCE], 3),
+            "seconds_since_start": round(values[_STATE_SINCE] - values[_STARTED_AT], 3),
+            # Tempo desde o lançamento do processo até começar a processar frames
+            "startup_seconds": (
+                round(running_at - values[_STARTED_AT], 3) if running_at >= 0 else None
+            ),
+            "warmup_seconds": round(warmup_seconds, 3) if warmup_seconds >= 0 else None,
+            "warmup_iterations": int(values[_WARMUP_ITERATIONS]),
+            # Taxa de frames em uso (muda com adaptive_fps)
+            "effective_fps": round(effective_fps, 3) if effective_fps >= 0 else None,
+            # Fração dos frames sem detecção por falta de movimento (motion_gate)
+            "motion_skip_fraction": round(skip_fraction, 4) if skip_fraction >= 0 else None,
+        }
+
+    def close(self) -> None:
+        """Libera o mapeamento (e remove o segmento, se for o dono)."""
+        self.shm.close()
+        if self._owner:
+            try:
+                self.shm.unlink()
+            except FileNotFoundError:
+                pass
@@ -0,0 +1,100 @@
+"""
+Detecções de um frame em formato colunar.
+
+Em vez de iterar sobre `result.boxes` (vários sincronismos tensor -> Python por
+caixa), os dados são lidos de uma vez como um array numpy e o deslocamento e o filtro
+de caixas inválidas são feitos vetorialmente. As classes ficam como ids: o nome
+só é resolvido uma vez por track, quando ele termina (TrackStore.pop_expired).
+"""
+import numpy as np
+from typing import Dict, Tuple
+
+from app.utils.logging_utils import setup_logger
+
+logger = setup_logger("detection_batch")
+
+# Colunas das linhas de tracking (result.boxes.data com ids ou saída do CameraTracker)
+COL_TRACK_ID = 4
+COL_CONF = 5
+COL_CLASS = 6
+
+class DetectionBatch:
+    """Detecções rastreadas de um frame (uma linha por objeto)."""
+
+    __slots__ = ("track_ids", "boxes", "confidences", "class_ids", "names")
+
+    def __init__(
+        self,
+        track_ids: np.ndarray,
+        boxes: np.ndarray,
+        confidences: np.ndarray,
+        class_ids: np.ndarray,
+        names: Dict[int, str],
+    ):
+        self.track_ids = track_ids  # int64 (N,)
+        self.boxes = boxes  # int32 (N, 4): x1, y1, x2, y2
+        self.confidences = confidences  # float32 (N,)
+        self.class_ids = class_ids  # int32 (N,)
+        self.names = names
+
+    def __len__(self) -> int:
+        return len(self.track_ids)
+
+    @classmethod
+    def empty(cls, names: Dict[int, str]) -> "DetectionBatch":
+        return cls(
+            np.empty(0, dtype=np.int64),
+            np.empty((0, 4), dtype=np.int32),
+            np.empty(0, dtype=np.float32),
+            np.empty(0, dtype=np.int32),
+            names,
+        )
+
+    @classmethod
+    def from_tracks(
+        cls,
+        tracks: np.ndarray,
+        names: Dict[int, str],
+        offset: Tuple[int, int] = (0, 0),
+    ) -> "DetectionBatch":
+        """
+        Cria o lote a partir de linhas (x1, y1, x2, y2, id, conf, cls, ...),
+        nas coordenadas da entrada do modelo. Este é o único ponto de ajuste das
+        bounding boxes: soma a origem do recorte (offset) caso a inferência
+        tenha rodado em uma região do frame.
+        """
+        if tracks is None or len(tracks) == 0:
+            return cls.empty(names)
+
+        tracks = np.asarray(tracks, dtype=np.float32)
+        boxes = tracks[:, :4]
+        if offset != (0, 0):
+            boxes = boxes + np.array(offset * 2, dtype=np.float32)
+        boxes = boxes.astype(np.int32)
+
+        valid = (boxes[:, 2] > boxes[:, 0]) & (boxes[:, 3] > boxes[:, 1])
+        if not valid.all():
+            logger.warning(
+                f"{int((~valid).sum())} bbox(es) inválida(s) descartada(s): "
+                f"{boxes[~valid].tolist()}"
+            )
+            tracks = tracks[valid]
+            boxes = boxes[valid]
+
+        return cls(
+            tracks[:, COL_TRACK_ID].astype(np.int64),
+            boxes,
+            tracks[:, COL_CONF].astype(np.float32),
+            tracks[:, COL_CLASS].astype(np.int32),
+            names,
+        )
+
+    def select(self, keep: np.ndarray) -> "DetectionBatch":
+        """Lote apenas com as detecções marcadas em keep."""
+        return DetectionBatch(
+            self.track_ids[keep],
+            self.boxes[keep],
+            self.confidences[keep],
+            self.class_ids[keep],
+            self.names,
+        )
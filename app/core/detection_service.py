@@ -1,59 +1,79 @@
-from os import wait
+import os
 import threading
 import time
 import datetime
-import cv2
 import numpy as np
-from typing import List, Dict, Any, Set, Tuple, Optional
-from ultralytics import YOLO
-from collections import Counter
+from typing import TYPE_CHECKING, List, Dict, Tuple, Optional
 import queue
-from concurrent.futures import ThreadPoolExecutor, as_completed
-import logging
+from concurrent.futures import ThreadPoolExecutor
 
 from app.core.shared_state import active_streams, object_trackers
 from app.utils.logging_utils import setup_logger
-from app.utils.image_utils import convert_frame_to_bytes, draw_bounding_box
 from app.api.models.camera import StreamConfig, CameraInfo
 from app.api.models.event import Event
-from app.external.event_api import send_event
+from app.external.event_api import send_event, build_event_payload
+from app.core.event_dispatcher import EventPublisher
+from app.core.inference_server import InferenceClient
+from app.core.tracking import CameraTracker
+from app.core.detection_batch import DetectionBatch
+from app.core.track_store import TrackStore
+from app.core.snapshots import CropSnapshot, FrameSnapshot
+from app.core.best_shot import score_detections
+from app.core.model_export import DEFAULT_IMGSZ, load_model, model_key
+from app.core.frame_capture import capture_loop, attach_ring
+from app.core.frame_sampler import FrameSampler
+from app.core.fps_controller import AdaptiveFpsController
+from app.core.motion_gate import MotionGate
+from app.core.roi import RoiGeometry, get_roi
+from app.core.camera_status import CameraStatus
 from app.config import settings
 
+if TYPE_CHECKING:
+    from ultralytics import YOLO
+
 logger = setup_logger("detection_service")
 
 # Cache para converter classes para IDs
 _class_mapping_cache = {}
-STREAM_FPS = 30
-
-# thread pool para envio de eventos
-event_executor = ThreadPoolExecutor(max_workers=5, thread_name_prefix="event_sender")
 
-# thread pool para conversao de frames
-frame_converter_executor = ThreadPoolExecutor(
-    max_workers=4, thread_name_prefix="frame_converter"
-)
+# Codificação dos best-shots e publicação dos eventos, fora da thread de inferência
+event_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="event_encoder")
 
 # Métricas de performance por câmera
 camera_metrics = {}
 
+# IDs dos tracks da última inferência de cada câmera (frames pulados pelo motion_gate)
+last_track_ids: Dict[int, np.ndarray] = {}
+
 # Cache de modelos YOLO compartilhados (evita recarregar o mesmo modelo várias vezes)
 _model_cache = {}
 _model_cache_lock = threading.Lock()
 
+# Trackers por câmera: o modelo faz apenas a detecção e cada câmera tem o seu tracker
+camera_trackers: Dict[int, CameraTracker] = {}
+
+# Frame usado no aquecimento do modelo (mesma resolução típica das câmeras)
+WARMUP_FRAME_SHAPE = (720, 1280, 3)
 
-def get_or_load_model(model_path: str) -> YOLO:
+
+def get_or_load_model(
+    model_path: str, backend: str = "pytorch", imgsz: int = DEFAULT_IMGSZ
+) -> "YOLO":
     """
     Retorna modelo do cache ou carrega se não existir.
+    Com backend "onnx" ou "openvino" carrega o modelo exportado com entrada
+    imgsz (ver model_export).
     Thread-safe para uso com múltiplas câmeras.
     """
+    cache_key = model_key(model_path, backend, imgsz)
     with _model_cache_lock:
-        if model_path not in _model_cache:
-            logger.info(f"Carregando modelo YOLO: {model_path}")
-            _model_cache[model_path] = YOLO(model_path)
+        if cache_key not in _model_cache:
+            logger.info(f"Carregando modelo YOLO: {model_path} ({backend})")
+            _model_cache[cache_key] = load_model(*cache_key)
             logger.info(f"Modelo {model_path} carregado e armazenado em cache")
         else:
             logger.info(f"Usando modelo {model_path} do cache")
-        return _model_cache[model_path]
+        return _model_cache[cache_key]
 
 
 def initialize_tracker_for_camera(camera_id: int) -> None:
@@ -61,7 +81,7 @@ def initialize_tracker_for_camera(camera_id: int) -> None:
     Inicializa o dicionario de objetos para uma câmera específica, se ainda não existir.
     """
     if camera_id not in object_trackers:
-        object_trackers[camera_id] = {}
+        object_trackers[camera_id] = TrackStore()
     
     # Inicializa métricas para a câmera (start_time será definido no primeiro frame processado)
     if camera_id not in camera_metrics:
@@ -70,199 +90,146 @@ def initialize_tracker_for_camera(camera_id: int) -> None:
             "total_inference_time": 0.0,
             "first_frame_time": None,
             "last_frame_time": None,
+            "frames_grabbed": 0,
+            "frames_decoded": 0,
         }
 
 
-def extract_detections(result, scale_factor=1.0) -> List[Dict[str, Any]]:
+def release_camera_state(camera_id: int) -> None:
     """
-    Extrai as informações (bbox, classe, id e confiança) de uma detecção do YOLO.
-    Ajusta as bounding boxes caso o frame tenha sido redimensionado.
+    Descarta o estado da câmera mantido no processo (tracker, tabela de
+    objetos, métricas e caches), para que um novo início da câmera comece do zero.
     """
-    detections = []
-
-    boxes = result.boxes
-
-    if hasattr(boxes, "id") and boxes.id is not None:
-        for i, box in enumerate(boxes):
-            try:
-                track_id = int(box.id.item())
-                cls = int(box.cls.item())
-                class_name = result.names[cls]
-                x1, y1, x2, y2 = map(int, box.xyxy.tolist()[0])
-                if scale_factor != 1.0:
-                    x1, y1, x2, y2 = (
-                        int(x1 / scale_factor),
-                        int(y1 / scale_factor),
-                        int(x2 / scale_factor),
-                        int(y2 / scale_factor),
-                    )
-                conf = float(box.conf.item())
-
-                if x2 > x1 and y2 > y1:
-                    detections.append(
-                        {
-                            "track_id": track_id,
-                            "class_name": class_name,
-                            "bbox": (x1, y1, x2, y2),
-                            "confidence": conf,
-                        }
-                    )
-                else:
-                    logger.warning(
-                        f"bbox inválida detectada: {(x1, y1, x2, y2)} para objeto {track_id}"
-                    )
-
-            except Exception as e:
-                logger.error(f"Erro ao extrair detecção: {e}")
-
-    return detections
+    tracker = camera_trackers.pop(camera_id, None)
+    if tracker is not None:
+        tracker.reset()
+    camera_metrics.pop(camera_id, None)
+    last_track_ids.pop(camera_id, None)
+    object_trackers.pop(camera_id, None)
 
+    prefix = f"{camera_id}_"
+    for cache_key in [key for key in _class_mapping_cache if key.startswith(prefix)]:
+        _class_mapping_cache.pop(cache_key, None)
 
-def update_tracked_object(
-    camera_id: int,
-    track_id: int,
-    class_name: str,
-    bbox: tuple,
-    frame: np.ndarray,
-    confidence: float,
-) -> None:
 
-    is_new_object = track_id not in object_trackers[camera_id]
-    current_time = datetime.datetime.now().isoformat()
-    x1, y1, x2, y2 = bbox
+def filter_roi(
+    stream_config: StreamConfig, detections: DetectionBatch, roi: Optional[RoiGeometry]
+) -> DetectionBatch:
+    """Mantém apenas as detecções dentro dos polígonos da ROI, se roi_filter estiver ativo."""
+    if roi is None or not stream_config.roi_filter or len(detections) == 0:
+        return detections
+    return detections.select(roi.contains(detections.boxes))
 
-    if x1 >= x2 or y1 >= y2:
-        return
 
-    # calcula área da bbox atual
-    current_area = (x2 - x1) * (y2 - y1)
+def get_camera_tracker(stream_config: StreamConfig) -> CameraTracker:
+    """
+    Retorna o tracker da câmera, criando-o no primeiro uso.
+    """
+    camera_id = stream_config.camera_id
+    if camera_id not in camera_trackers:
+        camera_trackers[camera_id] = CameraTracker(
+            stream_config.tracker_model,
+            frame_rate=max(1, round(stream_config.frames_per_second)),
+        )
+    return camera_trackers[camera_id]
 
-    if is_new_object:
 
-        def process_frame_async():
-            try:
-                height, width = frame.shape[:2]
-                if width > settings.WIDTH_RESIZE:
-                    scale = settings.WIDTH_RESIZE / width
-                    new_width = settings.WIDTH_RESIZE
-                    new_height = int(height * scale)
-                    frame_resized = cv2.resize(frame, (new_width, new_height))
-                    bbox_for_frame = (
-                        int(x1 * scale),
-                        int(y1 * scale),
-                        int(x2 * scale),
-                        int(y2 * scale),
-                    )
-                else:
-                    frame_resized = frame
-                    bbox_for_frame = bbox
+def update_tracked_objects(
+    stream_config: StreamConfig, detections: DetectionBatch, frame: np.ndarray
+) -> np.ndarray:
+    """
+    Atualiza a tabela de objetos da câmera com as detecções do frame e guarda
+    um snapshot deste frame como melhor candidato (best-shot) dos objetos cuja
+    pontuação melhorou. Nada é codificado aqui: o JPEG só é gerado no envio do evento.
+    Retorna as linhas da tabela correspondentes às detecções.
+    """
+    store = object_trackers[stream_config.camera_id]
+
+    rows = store.update(
+        detections.track_ids,
+        detections.boxes,
+        detections.class_ids,
+        detections.confidences,
+        detections.names,
+        weighted_vote=stream_config.weighted_class_vote,
+    )
 
-                frame_bytes = convert_frame_to_bytes(
-                    frame_resized, settings.QUALITY_CONVERT
-                )
+    if len(rows) == 0:
+        return rows
 
-                object_trackers[camera_id][track_id].update(
-                    {
-                        "frame": frame_bytes,
-                        "bbox_for_frame": bbox_for_frame,
-                    }
-                )
+    current_best = store.best_score[rows]
+    scores = score_detections(
+        frame, detections.boxes, detections.confidences, current_best
+    )
+    improved = scores > current_best
+
+    if improved.any():
+        store.set_best_shots(
+            rows[improved],
+            scores[improved],
+            detections.boxes[improved],
+            create_best_shots(frame, detections.boxes[improved], stream_config),
+        )
 
-            except Exception as e:
-                logger.error(f"Erro ao processar frame para objeto {track_id}: {e}")
-
-        object_trackers[camera_id][track_id] = {
-            "class": class_name,
-            "last_seen": 0,
-            "disappeared": False,
-            "bbox": bbox,
-            "frame": None,
-            "bbox_for_frame": None,
-            "detection_history": [{"class": class_name, "confidence": confidence}],
-            "first_seen": current_time,
-            "last_seen_time": current_time,
-            "max_bbox_area": current_area,
-        }
+    return rows
 
-        frame_converter_executor.submit(process_frame_async)
-    else:
 
-        max_area = object_trackers[camera_id][track_id].get("max_bbox_area", 0)
-
-        # só atualiza a imagem se a área for pelo menos 20% maior
-        if current_area >= max_area * 1.2:
-
-            def process_frame_async():
-                try:
-                    height, width = frame.shape[:2]
-                    if width > settings.WIDTH_RESIZE:
-                        scale = settings.WIDTH_RESIZE / width
-                        new_width = settings.WIDTH_RESIZE
-                        new_height = int(height * scale)
-                        frame_resized = cv2.resize(frame, (new_width, new_height))
-                        bbox_for_frame = (
-                            int(x1 * scale),
-                            int(y1 * scale),
-                            int(x2 * scale),
-                            int(y2 * scale),
-                        )
-                    else:
-                        frame_resized = frame
-                        bbox_for_frame = bbox
-
-                    frame_bytes = convert_frame_to_bytes(
-                        frame_resized, settings.QUALITY_CONVERT
-                    )
+def create_best_shots(frame: np.ndarray, boxes: np.ndarray, stream_config: StreamConfig):
+    """
+    Snapshot do frame para os objetos cuja pontuação melhorou, guardando só o
+    que o evento usa: o frame reduzido para WIDTH_RESIZE (um só, compartilhado)
+    ou, no modo crop, o recorte de cada objeto e a miniatura opcional.
+    """
+    if stream_config.snapshot_mode != "crop":
+        return FrameSnapshot(frame)
 
-                    object_trackers[camera_id][track_id].update(
-                        {
-                            "frame": frame_bytes,
-                            "bbox_for_frame": bbox_for_frame,
-                            "max_bbox_area": current_area,
-                        }
-                    )
+    thumbnail = None
+    if stream_config.snapshot_thumbnail_width:
+        thumbnail = FrameSnapshot.thumbnail(frame, stream_config.snapshot_thumbnail_width)
+    return [
+        CropSnapshot(frame, box, stream_config.snapshot_margin, thumbnail)
+        for box in boxes
+    ]
 
-                except Exception as e:
-                    logger.error(f"Erro ao processar frame para objeto {track_id}: {e}")
 
-            frame_converter_executor.submit(process_frame_async)
+def encode_best_shot(obj_data: dict, stream_config: StreamConfig) -> Optional[dict]:
+    """
+    Codifica a imagem do evento a partir do melhor snapshot do objeto: o frame
+    reduzido (codificado uma única vez e compartilhado entre os objetos daquele
+    frame) ou, no modo crop, o recorte do objeto e a miniatura opcional.
+    """
+    snapshot = obj_data.get("best_shot")
+    if snapshot is None:
+        return None
+
+    if isinstance(snapshot, CropSnapshot):
+        return {
+            "frame": snapshot.encode(),
+            "bbox": snapshot.bbox,
+            "crop_origin": snapshot.origin,
+            "thumbnail": snapshot.encode_thumbnail(),
+        }
 
-        # atualização normal dos outros parametros
-        object_trackers[camera_id][track_id].update(
-            {
-                "last_seen": 0,
-                "bbox": bbox,
-                "last_seen_time": current_time,
-            }
-        )
-        object_trackers[camera_id][track_id]["detection_history"].append(
-            {"class": class_name, "confidence": confidence}
-        )
+    bbox = obj_data["best_shot_bbox"]
+    return {
+        "frame": snapshot.encode(),
+        "bbox": tuple(snapshot.map_bboxes(bbox[None, :])[0].tolist()),
+        "crop_origin": None,
+        "thumbnail": None,
+    }
 
 
 def validate_detection_consistency(
-    detection_history: list, min_percentage: float = 0.7
-) -> tuple[bool, str]:
+    best_class_votes: float, total_class_votes: float, min_percentage: float = 0.7
+) -> bool:
     """
-    Verifica se pelo menos min_percentage das detecções são da mesma classe.
+    Verifica se pelo menos min_percentage dos votos são da classe mais votada.
     """
-    if not detection_history:
-        return False, ""
-
-    # conta as ocorrências de cada classe
-    class_counts = Counter(detection["class"] for detection in detection_history)
-
-    # encontra a classe mais comum
-    most_common_class, most_common_count = class_counts.most_common(1)[0]
-
-    # calcula a porcentagem da classe mais comum
-    total_detections = len(detection_history)
-    percentage = most_common_count / total_detections
+    if total_class_votes <= 0:
+        return False
 
     # verifica se tem no mínimo essa porcentagem da mesma classe
-    is_valid = percentage >= min_percentage
-
-    return is_valid, most_common_class
+    return best_class_votes / total_class_votes >= min_percentage
 
 
 def get_camera_metrics(camera_id: int) -> Tuple[float, float]:
@@ -293,40 +260,47 @@ def get_camera_metrics(camera_id: int) -> Tuple[float, float]:
     return round(avg_latency, 2), round(avg_fps, 2)
 
 
-def send_single_event(
-    obj_data: dict, stream_config: StreamConfig, camera_id: int
-) -> bool:
+def is_event_valid(obj_data: dict, stream_config: StreamConfig) -> bool:
     """
-    Envia um único evento para o endpoint
+    Indica se o objeto desaparecido gera evento: tem best-shot, foi visto em
+    pelo menos min_track_frames frames e a classe é consistente.
     """
-    try:
-        track_id = obj_data["track_id"]
-        frame_bytes = obj_data.get("frame")
-        bbox_for_frame = obj_data.get("bbox_for_frame")
-
-        if not frame_bytes or not bbox_for_frame:
-            logger.warning(f"Dados faltando para objeto {track_id}")
-            return False
+    if obj_data.get("best_shot") is None:
+        logger.warning(f"Dados faltando para objeto {obj_data['track_id']}")
+        return False
 
-        initial_time = obj_data.get("first_seen", datetime.datetime.now().isoformat())
-        last_seen_time = obj_data.get(
-            "last_seen_time", datetime.datetime.now().isoformat()
-        )
+    # mínimo de detecções >= min_track
+    min_len = obj_data["detection_count"] >= stream_config.min_track_frames
 
-        x1, y1, x2, y2 = bbox_for_frame
+    # 70% ou + das detecções são da mesma classe
+    is_class_consistent = validate_detection_consistency(
+        obj_data["best_class_votes"],
+        obj_data["total_class_votes"],
+        min_percentage=0.7,  # stream_config.min_class_percentage
+    )
 
-        detection_history = obj_data["detection_history"]
+    return min_len and is_class_consistent
 
-        # mínimo de detecções >= min_track
-        min_len = len(detection_history) >= stream_config.min_track_frames
 
-        # 70% ou + das detecções são da mesma classe
-        is_class_consistent, main_class = validate_detection_consistency(
-            detection_history, min_percentage=0.7  # stream_config.min_class_percentage
+def publish_event(
+    obj_data: dict,
+    stream_config: StreamConfig,
+    camera_id: int,
+    publisher: Optional[EventPublisher] = None,
+) -> bool:
+    """
+    Codifica a imagem do objeto e publica o seu evento (no despachante do nó
+    ou, sem publisher, diretamente no endpoint). Roda no event_executor.
+    """
+    track_id = obj_data["track_id"]
+    try:
+        initial_time = obj_data.get("first_seen", datetime.datetime.now().isoformat())
+        last_seen_time = obj_data.get(
+            "last_seen_time", datetime.datetime.now().isoformat()
         )
 
-        if not min_len or not is_class_consistent:
-            return False
+        snapshot = encode_best_shot(obj_data, stream_config)
+        x1, y1, x2, y2 = snapshot["bbox"]
 
         # Obtém métricas da câmera
         latency, fps = get_camera_metrics(camera_id)
@@ -336,12 +310,16 @@ def send_single_event(
             start=initial_time,
             end=last_seen_time,
             event_type="objects",
-            tag=main_class,
+            tag=obj_data["class"],
             coord_initial=(x1, y1),
             coord_end=(x2, y2),
-            print=frame_bytes,
+            print=snapshot["frame"],
+            crop_origin=snapshot["crop_origin"],
+            thumbnail=snapshot["thumbnail"],
         )
 
+        if publisher is not None:
+            return publisher.publish(build_event_payload(event, latency, fps))
         return send_event(event, latency, fps)
 
     except Exception as e:
@@ -350,277 +328,419 @@ def send_single_event(
 
 
 def send_disappearance_events(
-    stream_config: StreamConfig, camera_id: int, disappeared_objects: list
+    stream_config: StreamConfig,
+    camera_id: int,
+    disappeared_objects: list,
+    publisher: Optional[EventPublisher] = None,
 ) -> None:
     """
-    Envia eventos para o endpoint usando threading.
+    Valida os objetos desaparecidos e enfileira a codificação e a publicação
+    dos eventos no event_executor: a thread de inferência (ou o loop do worker
+    no modo pool) não espera pelo JPEG nem pela rede.
     """
-    if not disappeared_objects:
-        return
-
-    # envia eventos em paralelo
-    # futures = []
     for obj in disappeared_objects:
-        event_executor.submit(send_single_event, obj, stream_config, camera_id)
-        # future = event_executor.submit(send_single_event, obj, stream_config, camera_id)
-        # futures.append(future)
+        if is_event_valid(obj, stream_config):
+            event_executor.submit(publish_event, obj, stream_config, camera_id, publisher)
 
-    # for future in as_completed(futures, timeout=5.0):
-    #     try:
-    #         result = future.result()
-    #         if not result:
-    #             logger.warning("Falha ao enviar evento")
-    #     except Exception as e:
-    #         logger.error(f"Erro no envio de evento: {e}")
 
-
-def process_disappearances(current_track_ids: set, stream_config: StreamConfig) -> list:
+def process_disappearances(seen_rows: np.ndarray, stream_config: StreamConfig) -> list:
     """
-    Processa objetos rastreados e identifica os que desapareceram.
+    Envelhece os objetos não vistos no frame e retorna os que desapareceram.
     """
     camera_id = stream_config.camera_id
-    disappeared_objects = []
 
     if camera_id not in object_trackers:
-        return disappeared_objects
-
-    objects_to_delete = []
-
-    for track_id in list(object_trackers[camera_id].keys()):
-        if track_id not in current_track_ids:
-            object_trackers[camera_id][track_id]["last_seen"] += 1
-
-            if (
-                object_trackers[camera_id][track_id]["last_seen"]
-                >= stream_config.frames_before_disappearance
-                and not object_trackers[camera_id][track_id]["disappeared"]
-            ):
-                object_trackers[camera_id][track_id]["disappeared"] = True
-
-                tracker_data = object_trackers[camera_id][track_id]
-
-                disappeared_objects.append(
-                    {
-                        "track_id": track_id,
-                        "class": tracker_data["class"],
-                        "last_bbox": tracker_data["bbox"],
-                        "last_seen_time": tracker_data.get(
-                            "last_seen_time", datetime.datetime.now().isoformat()
-                        ),
-                        "first_seen": tracker_data.get("first_seen"),
-                        "frame": tracker_data.get("frame"),
-                        "bbox_for_frame": tracker_data.get("bbox_for_frame"),
-                        "detection_history": tracker_data.get("detection_history"),
-                    }
-                )
+        return []
+
+    store = object_trackers[camera_id]
+    store.age_missing(seen_rows)
+
+    # Objetos sem aparecer há muitos frames são removidos da tabela
+    return store.pop_expired(stream_config.frames_before_disappearance)
+
+
+def get_class_ids(model, stream_config: StreamConfig) -> Optional[List[int]]:
+    """
+    Converte nomes de classes para índices. Cache para evitar processamento desnecessário.
+    """
+    cache_key = f"{stream_config.camera_id}_{hash(tuple(stream_config.classes or []))}"
+    if cache_key not in _class_mapping_cache:
+        if stream_config.classes:
+            name_to_index = {v: k for k, v in model.names.items()}
+            class_ids = [
+                name_to_index[name]
+                for name in stream_config.classes
+                if name in name_to_index
+            ]
+        else:
+            class_ids = None
+        _class_mapping_cache[cache_key] = class_ids
+
+    return _class_mapping_cache[cache_key]
+
+
+class SharedModelDetector:
+    """
+    Modelo do processo, compartilhado pelas câmeras que rodam nele (uma no
+    modo process, várias nos modos thread e pool).
+    Faz apenas a detecção (predict); o rastreamento fica no tracker de cada
+    câmera, para que os IDs de câmeras diferentes não se misturem.
+    """
+
+    def __init__(self, model):
+        self.model = model
+        self.names = model.names
+        self._lock = threading.Lock()  # o predictor da ultralytics não é thread-safe
+
+    def detect(self, frame: np.ndarray, stream_config: StreamConfig) -> np.ndarray:
+        """Detecções do frame (N x 6: x1, y1, x2, y2, conf, cls)."""
+        return self.detect_batch([frame], stream_config)[0]
+
+    def detect_batch(
+        self, frames: List[np.ndarray], stream_config: StreamConfig
+    ) -> List[np.ndarray]:
+        """Detecções de vários frames com os mesmos parâmetros, em um único predict."""
+        with self._lock:
+            results = self.model.predict(
+                source=frames,
+                conf=stream_config.confidence_threshold,
+                iou=stream_config.iou,
+                classes=get_class_ids(self.model, stream_config),
+                device=stream_config.device,
+                imgsz=stream_config.inference_size,
+                verbose=False,
+            )
+        return [result.boxes.data.cpu().numpy().astype(np.float32) for result in results]
+
+
+_detector_cache: Dict[tuple, SharedModelDetector] = {}
+
+
+def get_shared_detector(
+    model_path: str, backend: str = "pytorch", imgsz: int = DEFAULT_IMGSZ
+) -> SharedModelDetector:
+    """Detector compartilhado entre as câmeras do processo, sobre o modelo em cache."""
+    cache_key = model_key(model_path, backend, imgsz)
+    with _model_cache_lock:
+        detector = _detector_cache.get(cache_key)
+    if detector is None:
+        detector = SharedModelDetector(get_or_load_model(model_path, backend, imgsz))
+        with _model_cache_lock:
+            detector = _detector_cache.setdefault(cache_key, detector)
+    return detector
+
+
+def prepare_frame(
+    frame: np.ndarray, stream_config: StreamConfig
+) -> Tuple[np.ndarray, Optional[RoiGeometry]]:
+    """
+    Entrada da inferência: o recorte da ROI da câmera (ou o frame inteiro).
+    O frame não é redimensionado aqui: o próprio modelo faz o letterbox para
+    inference_size e devolve as caixas nas coordenadas da entrada.
+    Retorna (frame, ROI).
+    """
+    roi = get_roi(stream_config, frame.shape)
+    if roi is not None:
+        frame = roi.crop(frame)
+    return frame, roi
+
+
+def track_detections(
+    stream_config: StreamConfig,
+    detections: np.ndarray,
+    input_frame: np.ndarray,
+    names: Dict[int, str],
+    roi: Optional[RoiGeometry] = None,
+) -> DetectionBatch:
+    """
+    Passa as detecções do frame pelo tracker da câmera e as devolve em
+    coordenadas do frame original.
+    """
+    tracks = get_camera_tracker(stream_config).update(detections, input_frame)
+    frame_detections = DetectionBatch.from_tracks(
+        tracks, names, roi.origin if roi is not None else (0, 0)
+    )
+    return filter_roi(stream_config, frame_detections, roi)
+
+
+def record_inference(camera_id: int, inference_time: float) -> None:
+    """Atualiza as métricas da câmera com a inferência de um frame."""
+    if camera_id in camera_metrics:
+        current_time = time.time()
+        
+        # Define first_frame_time no primeiro frame processado
+        if camera_metrics[camera_id]["first_frame_time"] is None:
+            camera_metrics[camera_id]["first_frame_time"] = current_time
+        
+        # Atualiza last_frame_time a cada frame
+        camera_metrics[camera_id]["last_frame_time"] = current_time
+        camera_metrics[camera_id]["frames_processed"] += 1
+        camera_metrics[camera_id]["total_inference_time"] += inference_time
+
+
+def create_fps_controller(stream_config: StreamConfig) -> Optional[AdaptiveFpsController]:
+    """Controlador da taxa de frames da câmera, se adaptive_fps estiver ativo."""
+    if not stream_config.adaptive_fps:
+        return None
+
+    max_fps = stream_config.max_frames_per_second or stream_config.frames_per_second
+    min_fps = stream_config.min_frames_per_second or stream_config.frames_per_second / 4
+    return AdaptiveFpsController(stream_config.frames_per_second, min(min_fps, max_fps), max_fps)
+
+
+def update_frame_rate(
+    controller: AdaptiveFpsController,
+    stream_config: StreamConfig,
+    processing_time: float,
+    frame_age: float,
+    camera_status: Optional[CameraStatus] = None,
+) -> Optional[float]:
+    """
+    Passa o tempo de processamento e a idade do frame ao controlador da câmera.
+    Retorna a nova taxa de amostragem, se mudou.
+    """
+    camera_id = stream_config.camera_id
+    new_fps = controller.update(processing_time, frame_age)
+    camera_metrics[camera_id].update(controller.stats())
+
+    if new_fps is not None:
+        logger.info(
+            f"Câmera {camera_id}: taxa ajustada para {new_fps:g} fps "
+            f"(processamento médio {controller.avg_processing_time * 1000:.0f} ms, "
+            f"frame com {frame_age * 1000:.0f} ms)"
+        )
+        if camera_status is not None:
+            camera_status.set_effective_fps(new_fps)
+    return new_fps
 
-            # Deleta objetos que já estão sem aparecer há muitos frames.
-            if (
-                object_trackers[camera_id][track_id]["last_seen"]
-                >= stream_config.frames_before_disappearance
-            ):
-                objects_to_delete.append(track_id)
 
-    for track_id in objects_to_delete:
-        if track_id in object_trackers[camera_id]:
-            del object_trackers[camera_id][track_id]
+def handle_detections(
+    stream_config: StreamConfig,
+    frame: np.ndarray,
+    frame_detections: DetectionBatch,
+    publisher: Optional[EventPublisher] = None,
+) -> None:
+    """Atualiza os objetos da câmera e envia os eventos dos que desapareceram."""
+    camera_id = stream_config.camera_id
+
+    seen_rows = update_tracked_objects(stream_config, frame_detections, frame)
+    last_track_ids[camera_id] = frame_detections.track_ids
 
-    return disappeared_objects
+    disappeared_objects = process_disappearances(seen_rows, stream_config)
 
+    if disappeared_objects:
+        send_disappearance_events(stream_config, camera_id, disappeared_objects, publisher)
 
-def process_frame(model, stream_config: StreamConfig, frame: np.ndarray) -> None:
+
+def process_frame(
+    model,
+    stream_config: StreamConfig,
+    frame: np.ndarray,
+    publisher: Optional[EventPublisher] = None,
+) -> None:
     """
     Processa um único frame de uma câmera e delega para análises das detecções.
     """
-    scale_factor = 1.0
     try:
         camera_id = stream_config.camera_id
 
-        # Converter nomes de classes para índices. Cache para evitar processamento desnecessário.
-        cache_key = f"{camera_id}_{hash(tuple(stream_config.classes or []))}"
-        if cache_key not in _class_mapping_cache:
-            if stream_config.classes:
-                name_to_index = {v: k for k, v in model.names.items()}
-                class_ids = [
-                    name_to_index[name]
-                    for name in stream_config.classes
-                    if name in name_to_index
-                ]
-            else:
-                class_ids = None
-            _class_mapping_cache[cache_key] = class_ids
-        else:
-            class_ids = _class_mapping_cache[cache_key]
-
         try:
-            height, width = frame.shape[:2]
-            target_size = 1280  # or 1024
-
-            if settings.RESIZE_FRAME and width < target_size:
-                scale_factor = target_size / width
-                scaled_height = int(height * scale_factor)
-                scaled_frame = cv2.resize(frame, (target_size, scaled_height))
-            else:
-                scaled_frame = frame
-                scale_factor = 1.0
+            input_frame, roi = prepare_frame(frame, stream_config)
 
             # Mede tempo de inferência do YOLO
             inference_start = time.time()
-            
-            results = model.track(
-                source=scaled_frame,
-                persist=True,
-                conf=stream_config.confidence_threshold,
-                iou=stream_config.iou,
-                verbose=False,
-                tracker=stream_config.tracker_model,
-                classes=class_ids,
+
+            # Detecção no modelo (local ou no servidor), tracking no tracker da câmera
+            frame_detections = track_detections(
+                stream_config,
+                model.detect(input_frame, stream_config),
+                input_frame,
+                model.names,
+                roi,
             )
-            
-            inference_time = time.time() - inference_start
-            
-            # Atualiza métricas da câmera
-            if camera_id in camera_metrics:
-                current_time = time.time()
-                
-                # Define first_frame_time no primeiro frame processado
-                if camera_metrics[camera_id]["first_frame_time"] is None:
-                    camera_metrics[camera_id]["first_frame_time"] = current_time
-                
-                # Atualiza last_frame_time a cada frame
-                camera_metrics[camera_id]["last_frame_time"] = current_time
-                camera_metrics[camera_id]["frames_processed"] += 1
-                camera_metrics[camera_id]["total_inference_time"] += inference_time
+
+            record_inference(camera_id, time.time() - inference_start)
 
         except Exception as e:
             logger.error(f"Erro na inferência YOLO para câmera {camera_id}: {e}")
             return
 
-        current_track_ids = set()
+        handle_detections(stream_config, frame, frame_detections, publisher)
 
-        for result in results:
-            detections = extract_detections(result, scale_factor)
+    except Exception as e:
+        logger.error(f"Erro ao processar frame para câmera {camera_id}: {e}")
 
-            for detection in detections:
-                current_track_ids.add(detection["track_id"])
 
-                update_tracked_object(
-                    camera_id,
-                    detection["track_id"],
-                    detection["class_name"],
-                    detection["bbox"],
-                    frame,
-                    detection["confidence"],
-                )
+def create_motion_gate(stream_config: StreamConfig) -> Optional[MotionGate]:
+    """Filtro de movimento da câmera, se motion_gate estiver ativo."""
+    if not stream_config.motion_gate:
+        return None
+    return MotionGate(stream_config.motion_threshold, stream_config.motion_keepalive_seconds)
 
-        disappeared_objects = process_disappearances(current_track_ids, stream_config)
 
-        if disappeared_objects:
+def handle_static_frame(
+    stream_config: StreamConfig, publisher: Optional[EventPublisher] = None
+) -> None:
+    """
+    Frame pulado pelo motion_gate: os objetos da última inferência continuam
+    na cena e os demais envelhecem como em um frame processado, então os
+    desaparecimentos continuam sendo detectados.
+    """
+    camera_id = stream_config.camera_id
+    if camera_id not in object_trackers:
+        return
 
-            # Envia eventos usando thread separada
-            threading.Thread(
-                target=send_disappearance_events,
-                args=(stream_config, camera_id, disappeared_objects),
-                daemon=True,
-            ).start()
+    track_ids = last_track_ids.get(camera_id, np.empty(0, dtype=np.int64))
+    seen_rows = object_trackers[camera_id].touch(track_ids)
 
-    except Exception as e:
-        logger.error(f"Erro ao processar frame para câmera {camera_id}: {e}")
+    disappeared_objects = process_disappearances(seen_rows, stream_config)
 
+    if disappeared_objects:
+        send_disappearance_events(stream_config, camera_id, disappeared_objects, publisher)
 
-def process_camera_stream(camera_info: CameraInfo, stream_config: StreamConfig) -> None:
+
+def process_sampled_frame(
+    model,
+    stream_config: StreamConfig,
+    frame: np.ndarray,
+    motion_gate: Optional[MotionGate] = None,
+    camera_status: Optional[CameraStatus] = None,
+    publisher: Optional[EventPublisher] = None,
+) -> None:
+    """Processa o frame amostrado, pulando a detecção se não houver movimento."""
+    if motion_gate is None:
+        process_frame(model, stream_config, frame, publisher)
+        return
+
+    if motion_gate.should_infer(prepare_frame(frame, stream_config)[0]):
+        process_frame(model, stream_config, frame, publisher)
+    else:
+        handle_static_frame(stream_config, publisher)
+
+    camera_metrics[stream_config.camera_id].update(motion_gate.stats())
+    if camera_status is not None:
+        camera_status.set_motion_skip_fraction(motion_gate.skip_fraction)
+
+
+def warmup_model(model, stream_config: StreamConfig, iterations: int) -> float:
     """
-    Gerencia a lógica de conexão, reconexão e processamento dos frames
+    Executa inferências em um frame vazio para inicializar o modelo (alocação
+    de memória, compilação de kernels, criação do tracker) antes da primeira
+    imagem real. Retorna a duração do aquecimento em segundos.
     """
+    dummy_frame = np.zeros(WARMUP_FRAME_SHAPE, dtype=np.uint8)
+    start = time.time()
+
+    get_camera_tracker(stream_config)
+    for _ in range(iterations):
+        model.detect(dummy_frame, stream_config)
 
+    return time.time() - start
+
+
+def process_camera_stream(
+    camera_info: CameraInfo,
+    stream_config: StreamConfig,
+    inference_channel: Optional[tuple] = None,
+    capture_channel: Optional[tuple] = None,
+    event_channel: Optional[tuple] = None,
+    camera_status: Optional[CameraStatus] = None,
+) -> None:
+    """
+    Gerencia a lógica de conexão, reconexão e processamento dos frames.
+    O modelo faz apenas a detecção (local, compartilhado pelas câmeras do
+    processo, ou no servidor de inferência se inference_channel for informado)
+    e cada câmera tem o seu tracker.
+    Se capture_channel for informado, os frames vêm de um processo de captura.
+    Se event_channel for informado, os eventos vão para o despachante do nó.
+    Se camera_status for informado, recebe as transições loading -> warming -> running.
+    """
     cam_id = camera_info.camera_id
+    # Ponta do despachante de eventos desta câmera; sem ela os eventos são
+    # enviados diretamente
+    publisher = EventPublisher(event_channel) if event_channel is not None else None
+    if camera_status is not None:
+        camera_status.set_state("loading")
     logger.info(f"🚀 Thread da câmera {cam_id} INICIADA - vai carregar modelo agora")
-    
-    local_model = get_or_load_model(stream_config.detection_model_path)
-    logger.info(f"✓ Câmera {cam_id}: modelo carregado/obtido do cache")
+
+    if inference_channel is not None:
+        request_queue, response_conn = inference_channel
+        local_model = InferenceClient(
+            cam_id,
+            request_queue,
+            response_conn,
+            timeout=settings.INFERENCE_REQUEST_TIMEOUT,
+        )
+        logger.info(f"✓ Câmera {cam_id}: usando servidor de inferência compartilhado")
+    else:
+        local_model = get_shared_detector(
+            stream_config.detection_model_path,
+            stream_config.inference_backend,
+            stream_config.inference_size,
+        )
+        logger.info(f"✓ Câmera {cam_id}: modelo carregado/obtido do cache")
     
     initialize_tracker_for_camera(cam_id)
+
+    if settings.WARMUP_ITERATIONS > 0:
+        if camera_status is not None:
+            camera_status.set_state("warming")
+        try:
+            warmup_seconds = warmup_model(
+                local_model, stream_config, settings.WARMUP_ITERATIONS
+            )
+            logger.info(
+                f"✓ Câmera {cam_id}: modelo aquecido em {warmup_seconds:.2f}s "
+                f"({settings.WARMUP_ITERATIONS} inferências)"
+            )
+            if camera_status is not None:
+                camera_status.set_warmup(warmup_seconds, settings.WARMUP_ITERATIONS)
+        except Exception as e:
+            logger.warning(f"Câmera {cam_id}: falha no aquecimento do modelo: {e}")
+
+    fps_controller = create_fps_controller(stream_config)
+    motion_gate = create_motion_gate(stream_config)
+    if camera_status is not None:
+        camera_status.set_effective_fps(
+            fps_controller.fps if fps_controller else stream_config.frames_per_second
+        )
+        camera_status.set_state("running")
     start_time = time.time()
 
+    if capture_channel is not None:
+        _consume_ring_frames(
+            cam_id,
+            local_model,
+            stream_config,
+            capture_channel,
+            fps_controller,
+            motion_gate,
+            camera_status,
+            publisher,
+        )
+        return
+
     frame_queue = queue.Queue(maxsize=2) # queue pequena garante que frames sejam atuais
     should_stop = threading.Event()
-
-    max_reconnect_attempts = settings.MAX_RECONNECT_ATTEMPTS or 5
-    reconnect_delay = settings.INITIAL_RECONNECT_DELAY or 2
+    sampler = FrameSampler(
+        fps_controller.fps if fps_controller else stream_config.frames_per_second
+    )
 
     def capture_frames():
-        """Thread para captura dos frames, com reconexão"""
-        capture = None
-        reconnect_count = 0
-
-        while not should_stop.is_set():
-
-            # Conexão
-            if capture is None or not capture.isOpened():
-                if reconnect_count >= max_reconnect_attempts:
-                    logger.error(f"Câmera {cam_id}: máximo de reconexões atingido")
-                    active_streams[cam_id]["active"] = False
-                    break
-
-                if reconnect_count > 0:
-                    wait_time = reconnect_delay * reconnect_count
-                    logger.info(
-                        f"Câmera {cam_id}: aguardando {wait_time}s para reconectar..."
-                    )
-                    time.sleep(wait_time)
-
-                logger.info(f"Câmera {cam_id}: conectando...")
-
-                try:
-                    if capture is not None:
-                        capture.release()
-
-                    capture = cv2.VideoCapture(camera_info.url)
-                    capture.set(cv2.CAP_PROP_BUFFERSIZE, 1)
-
-                    if capture.isOpened():
-                        connection_time = time.time()
-                        logger.info(
-                            f"Câmera {cam_id}: conectada com sucesso [{connection_time - start_time}s]"
-                        )
-                        reconnect_count = 0
-                    else:
-                        logger.warning(f"Câmera {cam_id}: falha ao conectar")
-                        reconnect_count += 1
-                        continue
-
-                except Exception as e:
-                    logger.error(f"Câmera {cam_id}: erro ao conectar - {e}")
-                    reconnect_count += 1
-                    continue
-
-            # Lê frame
+        """Thread para captura dos frames amostrados, com reconexão"""
+
+        def on_frame(frame):
+            # Adiciona na queue (descarta frame novo se queue estiver cheia)
             try:
-                ret, frame = capture.read()
-
-                if not ret or frame is None:
-                    logger.warning(f"Câmera {cam_id}: falha ao ler frame")
-                    capture.release()
-                    capture = None
-                    reconnect_count += 1
-                    continue
-
-                # Adiciona na queue (descarta frame novo se queue estiver cheia)
-                try:
-                    frame_queue.put(frame, block=False)
-                except queue.Full:
-                    pass
-
-            except Exception as e:
-                logger.error(f"Câmera {cam_id}: erro na leitura - {e}")
-                if capture is not None:
-                    capture.release()
-                    capture = None
-                reconnect_count += 1
-
-        # Cleanup
-        if capture is not None:
-            capture.release()
+                frame_queue.put((time.time(), frame), block=False)
+            except queue.Full:
+                pass
+
+        if not capture_loop(
+            cam_id, camera_info.url, should_stop, on_frame, start_time, sampler
+        ):
+            active_streams[cam_id]["active"] = False
+
         logger.info(f"Câmera {cam_id}: thread de captura encerrada")
 
     # Inicia thread de captura
@@ -634,14 +754,26 @@ def process_camera_stream(camera_info: CameraInfo, stream_config: StreamConfig)
     try:
         while cam_id in active_streams and active_streams[cam_id]["active"]:
             try:
-                frame = frame_queue.get()
+                # A fila recebe apenas os frames selecionados pelo sampler
+                captured_at, frame = frame_queue.get(timeout=1.0)
                 frames_processed += 1
 
-                if (
-                    frames_processed % (STREAM_FPS // stream_config.frames_per_second)
-                    == 0
-                ):
-                    process_frame(local_model, stream_config, frame)
+                processing_start = time.time()
+                process_sampled_frame(
+                    local_model, stream_config, frame, motion_gate, camera_status, publisher
+                )
+                camera_metrics[cam_id].update(sampler.stats())
+
+                if fps_controller is not None:
+                    new_fps = update_frame_rate(
+                        fps_controller,
+                        stream_config,
+                        time.time() - processing_start,
+                        processing_start - captured_at,
+                        camera_status,
+                    )
+                    if new_fps is not None:
+                        sampler.set_target_fps(new_fps)
 
                 # TODO: mostrar FPS medio no dump/log
                 # if frames_processed % 300 == 0:
@@ -657,27 +789,155 @@ def process_camera_stream(camera_info: CameraInfo, stream_config: StreamConfig)
     finally:
         should_stop.set()
         capture_thread.join(timeout=5)
+        release_camera_state(cam_id)
+
+        elapsed = time.time() - time_connected
+        logger.info(
+            f"Câmera {cam_id}: encerrada - {frames_processed} frames em {elapsed:.1f}s "
+            f"({sampler.frames_decoded} decodificados de {sampler.frames_grabbed} recebidos)"
+        )
+
+
+def _consume_ring_frames(
+    cam_id: int,
+    local_model,
+    stream_config: StreamConfig,
+    capture_channel: tuple,
+    fps_controller: Optional[AdaptiveFpsController] = None,
+    motion_gate: Optional[MotionGate] = None,
+    camera_status: Optional[CameraStatus] = None,
+    publisher: Optional[EventPublisher] = None,
+) -> None:
+    """
+    Loop principal no modo de captura em processo separado: lê sempre o frame
+    mais recente do buffer em memória compartilhada, sem cópia. A taxa ajustada
+    pelo controlador é repassada ao processo de captura.
+    """
+    ring_spec, frame_ready, capture_stopped, capture_stats, target_fps = capture_channel
+    if fps_controller is not None:
+        target_fps.value = fps_controller.fps
+
+    try:
+        ring = attach_ring(ring_spec, capture_stopped)
+    except FileNotFoundError:
+        logger.error(f"Câmera {cam_id}: buffer de captura não encontrado")
+        active_streams[cam_id]["active"] = False
+        release_camera_state(cam_id)
+        return
+
+    time_connected = time.time()
+    frames_processed = 0
+    last_seq = 0
+
+    try:
+        while cam_id in active_streams and active_streams[cam_id]["active"]:
+            if not frame_ready.wait(timeout=1.0):
+                continue
+            frame_ready.clear()
+
+            if capture_stopped.is_set():
+                logger.error(f"Câmera {cam_id}: processo de captura encerrado")
+                active_streams[cam_id]["active"] = False
+                break
+
+            latest = ring.read_latest(last_seq)
+            if latest is None:
+                continue
+
+            # O processo de captura grava apenas os frames amostrados
+            seq, captured_at, frame = latest
+            last_seq = seq
+            frames_processed += 1
+
+            processing_start = time.time()
+            process_sampled_frame(
+                local_model, stream_config, frame, motion_gate, camera_status, publisher
+            )
+            if not ring.is_current(seq):
+                # Não deveria ocorrer: o slot fica reservado enquanto o frame é usado
+                logger.warning(f"Câmera {cam_id}: frame {seq} sobrescrito durante o processamento")
+            camera_metrics[cam_id]["frames_grabbed"] = capture_stats[0]
+            camera_metrics[cam_id]["frames_decoded"] = capture_stats[1]
+
+            if fps_controller is not None:
+                new_fps = update_frame_rate(
+                    fps_controller,
+                    stream_config,
+                    time.time() - processing_start,
+                    processing_start - captured_at,
+                    camera_status,
+                )
+                if new_fps is not None:
+                    target_fps.value = new_fps
+
+    finally:
+        ring.close()
+        release_camera_state(cam_id)
 
         elapsed = time.time() - time_connected
         logger.info(
-            f"Câmera {cam_id}: encerrada - {frames_processed} frames em {elapsed:.1f}s"
+            f"Câmera {cam_id}: encerrada - {frames_processed} frames em {elapsed:.1f}s "
+            f"({capture_stats[1]} decodificados de {capture_stats[0]} recebidos)"
         )
 
 
+class CameraThreadHandle:
+    """
+    Câmera rodando em uma thread (EXECUTION_MODE=thread). Expõe a parte da
+    interface de mp.Process usada pelo process_manager.
+    """
+
+    def __init__(self, camera_id: int, thread: threading.Thread):
+        self.camera_id = camera_id
+        self.thread = thread
+        self.name = thread.name
+        self.pid = os.getpid()
+
+    def is_alive(self) -> bool:
+        return self.thread.is_alive()
+
+    @property
+    def exitcode(self) -> Optional[int]:
+        return None if self.thread.is_alive() else 0
+
+    def terminate(self) -> None:
+        if self.camera_id in active_streams:
+            active_streams[self.camera_id]["active"] = False
+
+    kill = terminate
+
+    def join(self, timeout: Optional[float] = None) -> None:
+        self.thread.join(timeout)
+
+
 def start_camera_processing(
-    camera_info: CameraInfo, stream_config: StreamConfig
-) -> threading.Thread:
+    camera_info: CameraInfo,
+    stream_config: StreamConfig,
+    inference_channel: Optional[tuple] = None,
+    capture_channel: Optional[tuple] = None,
+    event_channel: Optional[tuple] = None,
+    camera_status: Optional[CameraStatus] = None,
+) -> CameraThreadHandle:
     """
-    Inicia o processamento de uma câmera em uma thread separada.
+    Inicia o processamento de uma câmera em uma thread separada, com o modelo
+    compartilhado entre as câmeras do processo.
     """
     thread = threading.Thread(
         target=process_camera_stream,
-        args=(camera_info, stream_config),
+        args=(
+            camera_info,
+            stream_config,
+            inference_channel,
+            capture_channel,
+            event_channel,
+            camera_status,
+        ),
         daemon=True,  # encerra junto com o processo principal
+        name=f"camera_{camera_info.camera_id}",
     )
 
     thread.start()
-    return thread
+    return CameraThreadHandle(camera_info.camera_id, thread)
 
 
 def stop_all_cameras():
@@ -689,7 +949,5 @@ def stop_all_cameras():
 
     time.sleep(2)
 
-    # Finaliza o thread pool de eventos
+    # Eventos já enfileirados ainda são codificados e publicados
     event_executor.shutdown(wait=True)
-
-    frame_converter_executor.shutdown(wait=True)
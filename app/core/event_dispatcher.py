@@ -0,0 +1,359 @@
+"""
+Despachante de eventos centralizado.
+
+Um único processo por nó recebe os eventos de todos os processos de câmera por
+uma fila limitada (EVENT_QUEUE_SIZE) e os envia em lotes para o endpoint de
+lote do visualizador, reutilizando conexões HTTP (keep-alive). Um lote é
+enviado quando atinge EVENT_BATCH_SIZE eventos ou quando o evento mais antigo
+espera EVENT_FLUSH_INTERVAL_MS.
+
+As câmeras publicam sem bloquear: com a fila cheia o evento é descartado e
+contabilizado, e a thread de processamento nunca espera pela rede.
+
+Lotes que não puderam ser entregues vão para o spool em disco (EVENT_SPOOL_DIR)
+e uma thread de reenvio os reproduz em ordem, com backoff exponencial, quando
+o receptor volta. Enquanto houver eventos no spool, os lotes novos também são
+gravados nele (mantendo a ordem) sem tentar a rede, de modo que uma queda do
+receptor não segura o despachante em timeouts sucessivos.
+
+Só falhas transitórias (conexão, timeout, 5xx) vão para o spool ou são
+reenviadas. Um lote recusado pelo receptor (4xx, ex: 422 por um evento
+inválido) é descartado e contabilizado como falha, e o cursor do spool avança
+além dele; do contrário um único lote inválido bloquearia todos os envios.
+"""
+import atexit
+import multiprocessing as mp
+import queue
+import signal
+import threading
+import time
+from typing import Any, Dict, Optional, Tuple
+
+from app.utils.logging_utils import setup_logger
+from app.core.event_spool import EventSpool
+from app.config import settings
+
+logger = setup_logger("event_dispatcher")
+
+# Índices dos contadores compartilhados
+STAT_SENT = 0
+STAT_FAILED = 1
+STAT_BATCHES = 2
+STAT_DROPPED = 3
+STAT_SPOOLED = 4
+STAT_REPLAYED = 5
+STAT_SPOOL_DROPPED = 6
+STAT_SPOOL_BYTES = 7
+NUM_STATS = 8
+
+# Intervalo inicial entre tentativas de reenvio do spool (segundos)
+SPOOL_RETRY_MIN = 1.0
+
+
+def _update_spool_stats(stats, spool: EventSpool) -> None:
+    spool_stats = spool.stats()
+    with stats.get_lock():
+        stats[STAT_SPOOLED] = spool_stats["spooled_events"]
+        stats[STAT_REPLAYED] = spool_stats["replayed_events"]
+        stats[STAT_SPOOL_DROPPED] = spool_stats["dropped_events"]
+        stats[STAT_SPOOL_BYTES] = spool_stats["pending_bytes"]
+
+
+def _drain_spool(
+    spool: EventSpool,
+    stats,
+    batch_size: int,
+    retry_max: float,
+    wake: threading.Event,
+    stop: threading.Event,
+) -> None:
+    """
+    Thread de reenvio: reproduz os eventos do spool em ordem, avançando o
+    cursor apenas após cada entrega, com backoff enquanto o receptor falhar.
+    """
+    from app.external.event_api import (
+        BATCH_REJECTED,
+        BATCH_RETRY,
+        create_session,
+        send_event_batch,
+    )
+
+    session = create_session()
+    backoff = SPOOL_RETRY_MIN
+
+    while not stop.is_set():
+        if not spool.has_pending():
+            wake.wait(timeout=1.0)
+            wake.clear()
+            continue
+
+        events, position = spool.read_batch(batch_size)
+        result = send_event_batch(events, session) if events else None
+        if result == BATCH_RETRY:
+            stop.wait(backoff)
+            backoff = min(backoff * 2, retry_max)
+            continue
+
+        backoff = SPOOL_RETRY_MIN
+        if position is not None:
+            spool.commit(position, len(events))
+        with stats.get_lock():
+            if result == BATCH_REJECTED:
+                stats[STAT_FAILED] += len(events)
+            else:
+                stats[STAT_SENT] += len(events)
+        if result == BATCH_REJECTED:
+            logger.error(f"Lote de {len(events)} eventos do spool recusado pelo receptor; descartado")
+        _update_spool_stats(stats, spool)
+
+    session.close()
+
+
+def _dispatcher_main(
+    event_queue: mp.Queue,
+    stats,
+    batch_size: int,
+    flush_interval: float,
+    spool_config: Optional[dict] = None,
+) -> None:
+    """
+    Loop do processo despachante: junta eventos até o tamanho máximo do lote
+    ou o prazo de envio e envia cada lote em uma única requisição.
+    """
+    from app.external.event_api import (
+        BATCH_DELIVERED,
+        BATCH_RETRY,
+        create_session,
+        send_event_batch,
+    )
+    from app.external.event_codec import encode_event
+
+    # O encerramento é feito pela sentinela None na fila
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+    session = create_session()
+    running = True
+
+    spool = None
+    drain_wake = threading.Event()
+    drain_stop = threading.Event()
+    drainer = None
+    if spool_config is not None:
+        spool = EventSpool(
+            spool_config["directory"],
+            spool_config["segment_max_bytes"],
+            spool_config["max_total_bytes"],
+        )
+        _update_spool_stats(stats, spool)
+        drainer = threading.Thread(
+            target=_drain_spool,
+            args=(
+                spool,
+                stats,
+                batch_size,
+                spool_config["retry_max"],
+                drain_wake,
+                drain_stop,
+            ),
+            daemon=True,
+            name="event_spool_drainer",
+        )
+        drainer.start()
+
+    while running:
+        try:
+            first = event_queue.get(timeout=1.0)
+        except queue.Empty:
+            continue
+
+        if first is None:
+            break
+
+        batch = [first]
+        deadline = time.monotonic() + flush_interval
+
+        while len(batch) < batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                event = event_queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if event is None:
+                running = False
+                break
+            batch.append(event)
+
+        # Cada evento é codificado uma única vez, para o envio e para o spool
+        batch = [encode_event(event) for event in batch]
+
+        if spool is not None and spool.has_pending():
+            # Receptor indisponível ou reenvio em andamento: entra no fim do spool
+            result = BATCH_RETRY
+        else:
+            result = send_event_batch(batch, session)
+        retry = result == BATCH_RETRY and spool is not None
+
+        with stats.get_lock():
+            stats[STAT_BATCHES] += 1
+            if result == BATCH_DELIVERED:
+                stats[STAT_SENT] += len(batch)
+            elif not retry:
+                stats[STAT_FAILED] += len(batch)
+
+        if retry:
+            try:
+                spool.append(batch)
+                drain_wake.set()
+            except OSError as e:
+                logger.error(f"Erro ao gravar {len(batch)} eventos no spool: {e}")
+                with stats.get_lock():
+                    stats[STAT_FAILED] += len(batch)
+            _update_spool_stats(stats, spool)
+
+    session.close()
+    if drainer is not None:
+        drain_stop.set()
+        drain_wake.set()
+        drainer.join(timeout=settings.SEND_EVENT_TIMEOUT + 1)
+        spool.close()
+    logger.info("Despachante de eventos encerrado")
+
+
+class EventPublisher:
+    """Ponta do despachante usada nos processos de câmera."""
+
+    def __init__(self, channel: Tuple[mp.Queue, Any]):
+        self.event_queue, self.stats = channel
+
+    def publish(self, event_dict: Dict[str, Any]) -> bool:
+        """Enfileira o evento sem bloquear; descarta se a fila estiver cheia."""
+        try:
+            self.event_queue.put_nowait(event_dict)
+            return True
+        except queue.Full:
+            with self.stats.get_lock():
+                self.stats[STAT_DROPPED] += 1
+            logger.warning(
+                f"Fila de eventos cheia, evento da câmera {event_dict.get('camera_id')} descartado"
+            )
+            return False
+
+
+class EventDispatcher:
+    """Gerencia o processo despachante de eventos do nó."""
+
+    def __init__(
+        self,
+        queue_size: int,
+        batch_size: int,
+        flush_interval_ms: float,
+        spool_config: Optional[dict] = None,
+    ):
+        self.queue_size = max(1, queue_size)
+        self.batch_size = max(1, batch_size)
+        self.flush_interval = flush_interval_ms / 1000.0
+        self.spool_config = spool_config
+        self.process: Optional[mp.Process] = None
+        self.event_queue: Optional[mp.Queue] = None
+        self.stats = None
+        self._lock = threading.Lock()
+
+    def start(self) -> None:
+        """Inicia o processo despachante, se ainda não estiver rodando."""
+        with self._lock:
+            if self.process is not None and self.process.is_alive():
+                return
+
+            self.event_queue = mp.Queue(maxsize=self.queue_size)
+            self.stats = mp.Array("q", NUM_STATS)
+
+            self.process = mp.Process(
+                target=_dispatcher_main,
+                args=(
+                    self.event_queue,
+                    self.stats,
+                    self.batch_size,
+                    self.flush_interval,
+                    self.spool_config,
+                ),
+                daemon=True,
+                name="event_dispatcher",
+            )
+            self.process.start()
+            logger.info(f"✓ Despachante de eventos iniciado (PID: {self.process.pid})")
+            if self.spool_config is None:
+                logger.warning(
+                    "Spool de eventos desativado (EVENT_SPOOL_DIR=off): lotes não "
+                    "entregues por falha do receptor serão descartados"
+                )
+
+    def get_channel(self) -> Tuple[mp.Queue, Any]:
+        """Canal (fila, contadores) a ser passado aos processos de câmera."""
+        self.start()
+        return self.event_queue, self.stats
+
+    def stop(self) -> None:
+        """Envia os eventos pendentes e encerra o processo despachante."""
+        with self._lock:
+            if self.process is None:
+                return
+
+            try:
+                self.event_queue.put(None, timeout=1.0)
+            except (queue.Full, ValueError, OSError):
+                pass
+
+            self.process.join(timeout=settings.SEND_EVENT_TIMEOUT + 5)
+            if self.process.is_alive():
+                self.process.kill()
+                self.process.join()
+
+            self.process = None
+
+    def get_info(self) -> Dict[str, Any]:
+        """Estado e contadores do despachante."""
+        if self.process is None:
+            return {"alive": False}
+
+        try:
+            queued = self.event_queue.qsize()
+        except NotImplementedError:
+            queued = None
+
+        return {
+            "pid": self.process.pid,
+            "alive": self.process.is_alive(),
+            "queued": queued,
+            "sent": self.stats[STAT_SENT],
+            "failed": self.stats[STAT_FAILED],
+            "batches": self.stats[STAT_BATCHES],
+            "dropped": self.stats[STAT_DROPPED],
+            "spool": {
+                "enabled": self.spool_config is not None,
+                "spooled": self.stats[STAT_SPOOLED],
+                "replayed": self.stats[STAT_REPLAYED],
+                "dropped": self.stats[STAT_SPOOL_DROPPED],
+                "pending_bytes": self.stats[STAT_SPOOL_BYTES],
+            },
+        }
+
+
+# Instância global do despachante (iniciada sob demanda)
+event_dispatcher = EventDispatcher(
+    queue_size=settings.EVENT_QUEUE_SIZE,
+    batch_size=settings.EVENT_BATCH_SIZE,
+    flush_interval_ms=settings.EVENT_FLUSH_INTERVAL_MS,
+    spool_config=(
+        {
+            "directory": settings.EVENT_SPOOL_DIR,
+            "segment_max_bytes": settings.EVENT_SPOOL_SEGMENT_MB * 1024 * 1024,
+            "max_total_bytes": settings.EVENT_SPOOL_MAX_MB * 1024 * 1024,
+            "retry_max": settings.EVENT_SPOOL_RETRY_MAX_S,
+        }
+        if settings.EVENT_SPOOL_DIR
+        else None
+    ),
+)
+atexit.register(event_dispatcher.stop)
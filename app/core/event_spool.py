@@ -0,0 +1,265 @@
+"""
+Spool em disco para eventos que não puderam ser entregues.
+
+Os eventos, já codificados no formato de transporte (app.external.event_codec),
+são gravados em segmentos append-only (`<n>.spool`) como registros opacos com
+prefixo de tamanho e CRC32, com um único fsync por lote gravado. Um cursor
+de reprodução (segmento, offset) indica o próximo registro a reenviar e só
+avança depois que o lote lido foi entregue; segmentos totalmente consumidos
+são apagados. Se o tamanho total passar do limite, os segmentos mais antigos
+são descartados (e contabilizados).
+
+Na abertura, registros incompletos no fim do último segmento (gravação
+interrompida) são truncados.
+"""
+import os
+import struct
+import threading
+import zlib
+from typing import Dict, List, Optional, Tuple
+
+from app.utils.logging_utils import setup_logger
+
+logger = setup_logger("event_spool")
+
+# Cabeçalho de cada registro: tamanho do corpo e CRC32 do corpo
+RECORD_HEADER = struct.Struct(">II")
+SEGMENT_SUFFIX = ".spool"
+CURSOR_FILE = "cursor"
+
+
+def _iter_records(f, offset: int):
+    """Itera (corpo, offset final) dos registros válidos a partir de offset."""
+    f.seek(offset)
+    while True:
+        header = f.read(RECORD_HEADER.size)
+        if len(header) < RECORD_HEADER.size:
+            return
+        length, crc = RECORD_HEADER.unpack(header)
+        body = f.read(length)
+        if len(body) < length or zlib.crc32(body) != crc:
+            return
+        offset += RECORD_HEADER.size + length
+        yield body, offset
+
+
+class EventSpool:
+    """Fila durável de eventos em segmentos de arquivo."""
+
+    def __init__(self, directory: str, segment_max_bytes: int, max_total_bytes: int):
+        self.directory = directory
+        self.segment_max_bytes = segment_max_bytes
+        self.max_total_bytes = max_total_bytes
+        self._lock = threading.Lock()
+        self._writer = None
+        self._writer_size = 0
+
+        # Métricas
+        self.spooled_events = 0
+        self.replayed_events = 0
+        self.dropped_events = 0
+
+        os.makedirs(directory, exist_ok=True)
+
+        self.segments: List[int] = sorted(
+            int(name[: -len(SEGMENT_SUFFIX)])
+            for name in os.listdir(directory)
+            if name.endswith(SEGMENT_SUFFIX)
+        )
+        self.cursor = self._load_cursor()
+
+        if self.segments:
+            self._recover_tail(self.segments[-1])
+            self._advance_past_consumed()
+            if self.segments:
+                logger.info(
+                    f"Spool com {len(self.segments)} segmento(s) pendente(s) em {directory}"
+                )
+
+    # -------------------------------------------------------------- arquivos
+
+    def _segment_path(self, segment: int) -> str:
+        return os.path.join(self.directory, f"{segment:012d}{SEGMENT_SUFFIX}")
+
+    def _load_cursor(self) -> Tuple[int, int]:
+        try:
+            with open(os.path.join(self.directory, CURSOR_FILE)) as f:
+                segment, offset = (int(value) for value in f.read().split())
+        except (OSError, ValueError):
+            segment, offset = 0, 0
+
+        if not self.segments:
+            return segment, 0
+        if not self.segments[0] <= segment <= self.segments[-1]:
+            return self.segments[0], 0
+        return segment, offset
+
+    def _save_cursor(self) -> None:
+        """Grava o cursor de forma atômica (arquivo temporário + rename)."""
+        path = os.path.join(self.directory, CURSOR_FILE)
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w") as f:
+            f.write(f"{self.cursor[0]} {self.cursor[1]}")
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+
+    def _recover_tail(self, segment: int) -> None:
+        """Trunca um registro incompleto ou corrompido no fim do segmento."""
+        path = self._segment_path(segment)
+        valid_size = 0
+        with open(path, "rb") as f:
+            for _, end in _iter_records(f, 0):
+                valid_size = end
+
+        if valid_size < os.path.getsize(path):
+            logger.warning(f"Spool: registro incompleto truncado em {path}")
+            with open(path, "r+b") as f:
+                f.truncate(valid_size)
+
+    def _open_writer(self) -> None:
+        if not self.segments:
+            self.segments.append(self.cursor[0])
+        path = self._segment_path(self.segments[-1])
+        self._writer = open(path, "ab")
+        self._writer_size = os.path.getsize(path)
+
+    def _close_writer(self) -> None:
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+
+    def _remove_segment(self, segment: int) -> None:
+        if segment == self.segments[-1]:
+            self._close_writer()
+        self.segments.remove(segment)
+        os.remove(self._segment_path(segment))
+
+    def _advance_past_consumed(self) -> None:
+        """Apaga os segmentos já consumidos e move o cursor para o próximo."""
+        while self.segments:
+            segment = self.segments[0]
+            if segment < self.cursor[0]:
+                self._remove_segment(segment)
+                continue
+            if segment == self.cursor[0] and self.cursor[1] >= os.path.getsize(
+                self._segment_path(segment)
+            ):
+                self._remove_segment(segment)
+                self.cursor = (segment + 1, 0)
+                continue
+            break
+
+        self._save_cursor()
+
+    def _total_bytes(self) -> int:
+        return sum(
+            os.path.getsize(self._segment_path(segment)) for segment in self.segments
+        )
+
+    def _enforce_size_cap(self) -> None:
+        """Descarta os segmentos mais antigos enquanto o spool passar do limite."""
+        while len(self.segments) > 1 and self._total_bytes() > self.max_total_bytes:
+            segment = self.segments[0]
+            start = self.cursor[1] if segment == self.cursor[0] else 0
+            with open(self._segment_path(segment), "rb") as f:
+                dropped = sum(1 for _ in _iter_records(f, start))
+
+            self._remove_segment(segment)
+            self.cursor = (self.segments[0], 0)
+            self._save_cursor()
+
+            self.dropped_events += dropped
+            logger.warning(
+                f"Spool acima de {self.max_total_bytes} bytes: {dropped} eventos descartados"
+            )
+
+    # ------------------------------------------------------------ operações
+
+    def append(self, records: List[bytes]) -> None:
+        """Grava um lote de eventos codificados com um único fsync."""
+        if not records:
+            return
+
+        buffer = bytearray()
+        for body in records:
+            buffer += RECORD_HEADER.pack(len(body), zlib.crc32(body))
+            buffer += body
+
+        with self._lock:
+            if self._writer is None:
+                self._open_writer()
+            if self._writer_size >= self.segment_max_bytes:
+                self._close_writer()
+                self.segments.append(self.segments[-1] + 1)
+                self._open_writer()
+
+            self._writer.write(buffer)
+            self._writer.flush()
+            os.fsync(self._writer.fileno())
+            self._writer_size += len(buffer)
+            self.spooled_events += len(records)
+
+            self._enforce_size_cap()
+
+    def read_batch(
+        self, max_events: int
+    ) -> Tuple[List[bytes], Optional[Tuple[int, int]]]:
+        """
+        Lê até max_events a partir do cursor, sem avançá-lo.
+        Retorna (eventos, posição após o último registro lido), a ser passada
+        para commit depois da entrega.
+        """
+        with self._lock:
+            events: List[bytes] = []
+            position = None
+
+            for segment in self.segments:
+                if segment < self.cursor[0]:
+                    continue
+                start = self.cursor[1] if segment == self.cursor[0] else 0
+                with open(self._segment_path(segment), "rb") as f:
+                    for body, end in _iter_records(f, start):
+                        events.append(body)
+                        position = (segment, end)
+                        if len(events) >= max_events:
+                            return events, position
+
+            if not events and self.segments:
+                # Apenas segmentos vazios ou ilegíveis: tudo pode ser descartado
+                last = self.segments[-1]
+                position = (last, os.path.getsize(self._segment_path(last)))
+
+            return events, position
+
+    def commit(self, position: Tuple[int, int], count: int) -> None:
+        """Avança o cursor após a entrega dos eventos lidos."""
+        with self._lock:
+            self.cursor = position
+            self.replayed_events += count
+            self._advance_past_consumed()
+
+    def has_pending(self) -> bool:
+        """Indica se há eventos aguardando reenvio."""
+        with self._lock:
+            if not self.segments:
+                return False
+            if self.cursor[0] < self.segments[-1]:
+                return True
+            return self.cursor[1] < os.path.getsize(
+                self._segment_path(self.segments[-1])
+            )
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "spooled_events": self.spooled_events,
+                "replayed_events": self.replayed_events,
+                "dropped_events": self.dropped_events,
+                "pending_bytes": self._total_bytes(),
+                "segments": len(self.segments),
+            }
+
+    def close(self) -> None:
+        with self._lock:
+            self._close_writer()
@@ -0,0 +1,98 @@
+"""
+Controle adaptativo da taxa de frames de cada câmera (adaptive_fps).
+
+O controlador compara o tempo de processamento de cada frame (inferência,
+tracking e eventos) com o orçamento da taxa atual (1 / fps) e a idade do frame
+ao começar a ser processado (tempo parado em fila). Segue o esquema AIMD:
+
+- sobrecarga (tempo médio acima de TARGET_LOAD do orçamento ou frame mais
+  velho que MAX_FRAME_AGE orçamentos): a taxa cai multiplicativamente, no
+  máximo uma vez por DECREASE_INTERVAL;
+- folga (tempo médio abaixo de HEADROOM_LOAD do orçamento durante
+  HEADROOM_SECONDS): a taxa sobe um passo fixo.
+
+A taxa fica sempre entre os limites configurados na stream. Com o nó
+sobrecarregado as câmeras passam a amostrar menos frames, em vez de acumular
+latência ou descartar frames sem aviso.
+"""
+import time
+from typing import Optional
+
+# Fração do orçamento de tempo acima da qual a câmera está sobrecarregada
+TARGET_LOAD = 0.9
+# Fração do orçamento abaixo da qual há folga para aumentar a taxa
+HEADROOM_LOAD = 0.5
+# Idade máxima do frame, em orçamentos, antes de considerar sobrecarga
+MAX_FRAME_AGE = 2.0
+
+DECREASE_FACTOR = 0.75
+DECREASE_INTERVAL = 1.0  # segundos entre reduções
+HEADROOM_SECONDS = 3.0  # tempo com folga antes de cada aumento
+INCREASE_STEP_RATIO = 0.1  # passo do aumento, em fração da taxa máxima
+
+# Peso da média móvel do tempo de processamento
+SMOOTHING = 0.3
+
+
+class AdaptiveFpsController:
+    """Ajusta a taxa de frames de uma câmera pela carga medida (AIMD)."""
+
+    def __init__(self, target_fps: float, min_fps: float, max_fps: float):
+        if not 0 < min_fps <= max_fps:
+            raise ValueError(f"Limites de fps inválidos: [{min_fps}, {max_fps}]")
+
+        self.min_fps = float(min_fps)
+        self.max_fps = float(max_fps)
+        self.fps = min(max(float(target_fps), self.min_fps), self.max_fps)
+        self.increase_step = max(self.max_fps * INCREASE_STEP_RATIO, 0.1)
+
+        self.avg_processing_time: Optional[float] = None
+        self.decreases = 0
+        self.increases = 0
+        self._last_decrease = float("-inf")
+        self._headroom_since: Optional[float] = None
+
+    def update(self, processing_time: float, frame_age: float = 0.0) -> Optional[float]:
+        """
+        Registra o processamento de um frame. Retorna a nova taxa se ela mudou
+        (ou None).
+        """
+        if self.avg_processing_time is None:
+            self.avg_processing_time = processing_time
+        else:
+            self.avg_processing_time += SMOOTHING * (processing_time - self.avg_processing_time)
+
+        now = time.monotonic()
+        budget = 1.0 / self.fps
+
+        if self.avg_processing_time > TARGET_LOAD * budget or frame_age > MAX_FRAME_AGE * budget:
+            self._headroom_since = None
+            if self.fps > self.min_fps and now - self._last_decrease >= DECREASE_INTERVAL:
+                self._last_decrease = now
+                self.decreases += 1
+                return self._set_fps(self.fps * DECREASE_FACTOR)
+            return None
+
+        if self.avg_processing_time < HEADROOM_LOAD * budget and frame_age <= budget:
+            if self._headroom_since is None:
+                self._headroom_since = now
+            elif self.fps < self.max_fps and now - self._headroom_since >= HEADROOM_SECONDS:
+                self._headroom_since = now
+                self.increases += 1
+                return self._set_fps(self.fps + self.increase_step)
+        else:
+            self._headroom_since = None
+
+        return None
+
+    def _set_fps(self, fps: float) -> float:
+        self.fps = round(min(max(fps, self.min_fps), self.max_fps), 3)
+        return self.fps
+
+    def stats(self) -> dict:
+        """Taxa efetiva e ajustes feitos."""
+        return {
+            "effective_fps": self.fps,
+            "fps_decreases": self.decreases,
+            "fps_increases": self.increases,
+        }
@@ -0,0 +1,223 @@
+"""
+Captura de frames das câmeras, com reconexão.
+
+O loop de captura pode rodar em uma thread do processo da câmera (modo padrão)
+ou em um processo próprio que grava os frames em um FrameRingBuffer
+(CAPTURE_MODE=process), tirando a decodificação do interpretador da inferência.
+"""
+import multiprocessing as mp
+import signal
+import time
+import cv2
+import numpy as np
+from typing import Callable, Dict, Any, Optional
+
+from app.core.frame_ring import FrameRingBuffer, make_ring_spec
+from app.core.frame_sampler import FrameSampler
+from app.utils.logging_utils import setup_logger
+from app.config import settings
+
+logger = setup_logger("frame_capture")
+
+
+def capture_loop(
+    cam_id: int,
+    url: str,
+    should_stop,
+    on_frame: Callable[[np.ndarray], None],
+    start_time: float,
+    sampler: Optional[FrameSampler] = None,
+) -> bool:
+    """
+    Lê frames da câmera até should_stop ser sinalizado, chamando on_frame para cada
+    frame selecionado pelo sampler. Frames descartados passam apenas por grab(),
+    sem decodificação. Sem sampler, todos os frames são decodificados.
+    Retorna False se o máximo de reconexões foi atingido.
+    """
+    max_reconnect_attempts = settings.MAX_RECONNECT_ATTEMPTS or 5
+    reconnect_delay = settings.INITIAL_RECONNECT_DELAY or 2
+
+    capture = None
+    reconnect_count = 0
+    gave_up = False
+
+    while not should_stop.is_set():
+
+        # Conexão
+        if capture is None or not capture.isOpened():
+            if reconnect_count >= max_reconnect_attempts:
+                logger.error(f"Câmera {cam_id}: máximo de reconexões atingido")
+                gave_up = True
+                break
+
+            if reconnect_count > 0:
+                wait_time = reconnect_delay * reconnect_count
+                logger.info(
+                    f"Câmera {cam_id}: aguardando {wait_time}s para reconectar..."
+                )
+                time.sleep(wait_time)
+
+            logger.info(f"Câmera {cam_id}: conectando...")
+
+            try:
+                if capture is not None:
+                    capture.release()
+
+                capture = cv2.VideoCapture(url)
+                capture.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+
+                if capture.isOpened():
+                    connection_time = time.time()
+                    logger.info(
+                        f"Câmera {cam_id}: conectada com sucesso [{connection_time - start_time}s]"
+                    )
+                    reconnect_count = 0
+
+                    if sampler is not None:
+                        sampler.reset()
+                        sampler.set_source_fps(capture.get(cv2.CAP_PROP_FPS))
+                        logger.info(
+                            f"Câmera {cam_id}: fonte a {sampler.source_fps:.2f} fps, "
+                            f"amostrando {sampler.target_fps:g} fps"
+                        )
+                else:
+                    logger.warning(f"Câmera {cam_id}: falha ao conectar")
+                    reconnect_count += 1
+                    continue
+
+            except Exception as e:
+                logger.error(f"Câmera {cam_id}: erro ao conectar - {e}")
+                reconnect_count += 1
+                continue
+
+        # Lê frame
+        try:
+            if not capture.grab():
+                logger.warning(f"Câmera {cam_id}: falha ao ler frame")
+                capture.release()
+                capture = None
+                reconnect_count += 1
+                continue
+
+            # Frames descartados não são decodificados
+            if sampler is not None and not sampler.should_decode(
+                capture.get(cv2.CAP_PROP_POS_MSEC)
+            ):
+                continue
+
+            ret, frame = capture.retrieve()
+
+            if not ret or frame is None:
+                logger.warning(f"Câmera {cam_id}: falha ao decodificar frame")
+                capture.release()
+                capture = None
+                reconnect_count += 1
+                continue
+
+            if sampler is not None:
+                sampler.mark_decoded()
+
+            on_frame(frame)
+
+        except Exception as e:
+            logger.error(f"Câmera {cam_id}: erro na leitura - {e}")
+            if capture is not None:
+                capture.release()
+                capture = None
+            reconnect_count += 1
+
+    # Cleanup
+    if capture is not None:
+        capture.release()
+
+    return not gave_up
+
+
+def _capture_process_main(
+    cam_id: int,
+    url: str,
+    ring_spec: Dict[str, Any],
+    frame_ready,
+    should_stop,
+    capture_stats,
+    target_fps,
+) -> None:
+    """
+    Processo de captura: decodifica os frames amostrados e grava no buffer compartilhado.
+    capture_stats recebe os contadores [frames recebidos, frames decodificados].
+    target_fps (mp.Value) é a taxa de amostragem, que o processo da câmera pode alterar.
+    """
+
+    # terminate() envia SIGTERM; converte em saída normal para liberar a memória
+    def handle_sigterm(signum, frame):
+        should_stop.set()
+
+    signal.signal(signal.SIGTERM, handle_sigterm)
+
+    ring = FrameRingBuffer.from_spec(ring_spec, create=True)
+    sampler = FrameSampler(target_fps.value)
+
+    def on_frame(frame: np.ndarray) -> None:
+        ring.write(frame, time.time())
+        capture_stats[0] = sampler.frames_grabbed
+        capture_stats[1] = sampler.frames_decoded
+        frame_ready.set()
+        if target_fps.value != sampler.target_fps:
+            sampler.set_target_fps(target_fps.value)
+
+    try:
+        capture_loop(cam_id, url, should_stop, on_frame, time.time(), sampler)
+    finally:
+        should_stop.set()
+        frame_ready.set()
+        ring.close()
+        logger.info(f"Câmera {cam_id}: processo de captura encerrado")
+
+
+def start_capture_process(cam_id: int, url: str, target_fps: float) -> tuple:
+    """
+    Inicia o processo de captura de uma câmera, amostrando target_fps frames por segundo.
+    Retorna (processo, canal) onde o canal deve ser passado ao processo da câmera.
+    """
+    ring_spec = make_ring_spec(
+        cam_id,
+        settings.FRAME_RING_SLOTS,
+        settings.FRAME_RING_MAX_HEIGHT,
+        settings.FRAME_RING_MAX_WIDTH,
+    )
+    frame_ready = mp.Event()
+    should_stop = mp.Event()
+    capture_stats = mp.Array("q", 2, lock=False)
+    target_fps_value = mp.Value("d", target_fps, lock=False)
+
+    process = mp.Process(
+        target=_capture_process_main,
+        args=(
+            cam_id,
+            url,
+            ring_spec,
+            frame_ready,
+            should_stop,
+            capture_stats,
+            target_fps_value,
+        ),
+        daemon=True,
+        name=f"capture_{cam_id}",
+    )
+    process.start()
+
+    return process, (ring_spec, frame_ready, should_stop, capture_stats, target_fps_value)
+
+
+def attach_ring(ring_spec: Dict[str, Any], should_stop, timeout: float = 30.0):
+    """
+    Conecta ao buffer criado pelo processo de captura, aguardando sua criação.
+    """
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            return FrameRingBuffer.from_spec(ring_spec)
+        except FileNotFoundError:
+            if should_stop.is_set() or time.monotonic() > deadline:
+                raise
+            time.sleep(0.05)
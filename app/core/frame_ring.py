@@ -0,0 +1,201 @@
+"""
+Buffer circular de frames em memória compartilhada.
+
+Um único escritor (processo de captura) grava frames decodificados em slots
+pré-alocados de `multiprocessing.shared_memory`; um único leitor (processo de
+inferência da câmera) lê sempre o slot mais recente sem copiar os pixels.
+Cada slot possui número de sequência, timestamp e dimensões do frame.
+
+O leitor reserva o slot do frame que está usando (a reserva vale até a
+próxima leitura) e o escritor pula o slot reservado, então a view entregue
+pelo read_latest não é sobrescrita durante a inferência nem durante a cópia
+do best-shot, mesmo com a inferência mais lenta que a captura.
+"""
+import cv2
+import numpy as np
+from multiprocessing import resource_tracker, shared_memory
+from typing import Dict, Any, Optional, Tuple
+
+from app.utils.logging_utils import setup_logger
+
+logger = setup_logger("frame_ring")
+
+SLOT_HEADER_DTYPE = np.dtype(
+    [
+        ("seq", np.int64),  # 0 = vazio, -1 = escrita em andamento
+        ("timestamp", np.float64),
+        ("height", np.int32),
+        ("width", np.int32),
+    ]
+)
+
+# Área de controle no início do segmento: seq do frame reservado pelo leitor
+CONTROL_DTYPE = np.dtype([("claimed_seq", np.int64)])
+
+
+class FrameRingBuffer:
+    """Buffer circular de frames BGR em memória compartilhada (1 escritor, 1 leitor)."""
+
+    def __init__(
+        self,
+        name: str,
+        num_slots: int,
+        max_height: int,
+        max_width: int,
+        create: bool = False,
+    ):
+        if num_slots < 2:
+            raise ValueError("O buffer de frames precisa de pelo menos 2 slots")
+
+        self.name = name
+        self.num_slots = num_slots
+        self.max_height = max_height
+        self.max_width = max_width
+        self.slot_size = max_height * max_width * 3
+
+        header_bytes = CONTROL_DTYPE.itemsize + SLOT_HEADER_DTYPE.itemsize * num_slots
+        total_size = header_bytes + self.slot_size * num_slots
+
+        self.shm = shared_memory.SharedMemory(
+            name=name, create=create, size=total_size if create else 0
+        )
+        self._owner = create
+
+        if not create:
+            # Só o dono do segmento deve removê-lo; evita que o resource_tracker
+            # apague a memória quando o leitor terminar
+            resource_tracker.unregister(self.shm._name, "shared_memory")
+
+        self.control = np.ndarray((1,), dtype=CONTROL_DTYPE, buffer=self.shm.buf)
+        self.headers = np.ndarray(
+            (num_slots,),
+            dtype=SLOT_HEADER_DTYPE,
+            buffer=self.shm.buf,
+            offset=CONTROL_DTYPE.itemsize,
+        )
+        self.slots = np.ndarray(
+            (num_slots, self.slot_size),
+            dtype=np.uint8,
+            buffer=self.shm.buf,
+            offset=header_bytes,
+        )
+
+        if create:
+            self.control[:] = 0
+            self.headers[:] = 0
+
+        self._next_seq = 1
+        self._next_slot = 0
+        self._warned_resize = False
+
+    @classmethod
+    def from_spec(cls, spec: Dict[str, Any], create: bool = False) -> "FrameRingBuffer":
+        """Cria/conecta o buffer a partir do dicionário gerado por make_ring_spec."""
+        return cls(
+            spec["name"],
+            spec["num_slots"],
+            spec["max_height"],
+            spec["max_width"],
+            create=create,
+        )
+
+    def write(self, frame: np.ndarray, timestamp: float) -> int:
+        """
+        Grava o frame no próximo slot (pulando o reservado pelo leitor) e
+        retorna seu número de sequência.
+        """
+        height, width = frame.shape[:2]
+
+        if height > self.max_height or width > self.max_width:
+            scale = min(self.max_height / height, self.max_width / width)
+            width, height = int(width * scale), int(height * scale)
+            frame = cv2.resize(frame, (width, height))
+            if not self._warned_resize:
+                logger.warning(
+                    f"Frame maior que o slot do buffer {self.name}; redimensionando para {width}x{height}"
+                )
+                self._warned_resize = True
+
+        seq = self._next_seq
+        slot = self._next_slot
+        claimed = int(self.control["claimed_seq"][0])
+        if claimed and int(self.headers["seq"][slot]) == claimed:
+            slot = (slot + 1) % self.num_slots
+        self._next_slot = (slot + 1) % self.num_slots
+        size = height * width * 3
+
+        self.headers["seq"][slot] = -1
+        np.copyto(self.slots[slot, :size].reshape(height, width, 3), frame)
+        self.headers["timestamp"][slot] = timestamp
+        self.headers["height"][slot] = height
+        self.headers["width"][slot] = width
+        self.headers["seq"][slot] = seq
+
+        self._next_seq += 1
+        return seq
+
+    def read_latest(
+        self, last_seq: int = 0
+    ) -> Optional[Tuple[int, float, np.ndarray]]:
+        """
+        Retorna (seq, timestamp, frame) do slot mais recente, se for mais novo que last_seq.
+        O frame é uma view somente-leitura da memória compartilhada (sem cópia),
+        válida até a próxima chamada: o slot fica reservado e o escritor não o
+        sobrescreve.
+        """
+        seqs = self.headers["seq"]
+        slot = int(np.argmax(seqs))
+        seq = int(seqs[slot])
+
+        if seq <= last_seq:
+            return None
+
+        height = int(self.headers["height"][slot])
+        width = int(self.headers["width"][slot])
+        timestamp = float(self.headers["timestamp"][slot])
+
+        # Reserva o slot; se o escritor já começou a reescrevê-lo, desiste
+        self.control["claimed_seq"][0] = seq
+        if int(seqs[slot]) != seq:
+            return None
+
+        frame = self.slots[slot, : height * width * 3].reshape(height, width, 3)
+        frame.flags.writeable = False
+
+        # Slot reescrito durante a leitura do cabeçalho
+        if int(seqs[slot]) != seq:
+            return None
+
+        return seq, timestamp, frame
+
+    def is_current(self, seq: int) -> bool:
+        """Indica se o frame de sequência seq ainda não foi sobrescrito."""
+        return bool((self.headers["seq"] == seq).any())
+
+    def close(self) -> None:
+        """Libera o mapeamento (e remove o segmento, se for o dono)."""
+        self.control = None
+        self.headers = None
+        self.slots = None
+        self.shm.close()
+        if self._owner:
+            try:
+                self.shm.unlink()
+            except FileNotFoundError:
+                pass
+
+
+def make_ring_spec(
+    camera_id: int, num_slots: int, max_height: int, max_width: int
+) -> Dict[str, Any]:
+    """
+    Gera a descrição (serializável) de um buffer para uma câmera.
+    """
+    import uuid
+
+    return {
+        "name": f"nuvyolo_cam{camera_id}_{uuid.uuid4().hex[:8]}",
+        "num_slots": num_slots,
+        "max_height": max_height,
+        "max_width": max_width,
+    }
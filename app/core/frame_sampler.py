@@ -0,0 +1,119 @@
+"""
+Amostragem dos frames da fonte antes da decodificação.
+
+O loop de captura chama `grab()` para todos os frames, mas só chama
+`retrieve()` (decodificação completa para BGR) nos frames que o sampler
+seleciona para inferência.
+
+A seleção é feita por tempo de stream: o sampler usa o timestamp de cada frame
+(CAP_PROP_POS_MSEC) ou, na falta dele, o índice do frame e o FPS real da fonte
+(CAP_PROP_FPS), e escolhe um frame a cada 1 / frames_per_second segundos.
+Assim taxas fracionárias (ex: 0.5 fps) e fontes de 25 fps funcionam corretamente.
+
+Os timestamps só passam a ser usados depois de dois valores positivos e
+crescentes: o primeiro frame costuma vir com POS_MSEC igual a 0, e fontes sem
+timestamp continuam no índice do frame.
+"""
+from typing import Optional
+
+# FPS assumido quando a fonte não informa o seu
+DEFAULT_SOURCE_FPS = 30.0
+MAX_SOURCE_FPS = 240.0
+
+# Tolerância para comparação de tempos (em segundos)
+TIME_EPSILON = 1e-6
+
+
+class FrameSampler:
+    """Seleciona quais frames da fonte serão decodificados e processados."""
+
+    def __init__(self, target_fps: float, source_fps: float = DEFAULT_SOURCE_FPS):
+        if target_fps <= 0:
+            raise ValueError(f"frames_per_second deve ser positivo: {target_fps}")
+
+        self.target_fps = float(target_fps)
+        self.source_fps = float(source_fps)
+        self.frames_grabbed = 0
+        self.frames_decoded = 0
+        self.reset()
+
+    def reset(self) -> None:
+        """Reinicia a linha do tempo (ex: após reconexão com a câmera)."""
+        self._frame_index = 0
+        self._use_timestamps = False
+        self._last_position = None
+        self._last_time = None
+        self._next_due = None
+
+    def set_source_fps(self, fps: Optional[float]) -> None:
+        """Atualiza o FPS da fonte (CAP_PROP_FPS), ignorando valores inválidos."""
+        if fps and 0 < fps <= MAX_SOURCE_FPS:
+            self.source_fps = float(fps)
+
+    def set_target_fps(self, fps: float) -> None:
+        """Altera a taxa de amostragem sem reiniciar a linha do tempo."""
+        if fps > 0:
+            self.target_fps = float(fps)
+
+    def _stream_time(self, position_ms: Optional[float]) -> float:
+        """
+        Tempo do frame atual na stream, em segundos.
+        """
+        frame_period = 1.0 / self.source_fps
+        valid_position = position_ms is not None and position_ms > 0
+
+        # A fonte fornece timestamps a partir de dois valores positivos crescentes
+        if (
+            not self._use_timestamps
+            and valid_position
+            and self._last_position is not None
+            and position_ms > self._last_position
+        ):
+            self._use_timestamps = True
+        if valid_position:
+            self._last_position = position_ms
+
+        if self._use_timestamps:
+            stream_time = position_ms / 1000.0 if valid_position else 0.0
+            # Frames sem timestamp, repetidos ou fora de ordem avançam um período da fonte
+            if stream_time <= self._last_time:
+                stream_time = self._last_time + frame_period
+        else:
+            stream_time = self._frame_index * frame_period
+
+        self._last_time = stream_time
+        return stream_time
+
+    def should_decode(self, position_ms: Optional[float] = None) -> bool:
+        """
+        Registra um frame recebido (grab) e indica se ele deve ser decodificado.
+        position_ms: timestamp do frame na stream (CAP_PROP_POS_MSEC), se disponível.
+        """
+        self.frames_grabbed += 1
+        stream_time = self._stream_time(position_ms)
+        self._frame_index += 1
+
+        if self._next_due is not None and stream_time + TIME_EPSILON < self._next_due:
+            return False
+
+        interval = 1.0 / self.target_fps
+
+        # Primeiro frame ou atraso maior que um intervalo: realinha a agenda
+        if self._next_due is None or stream_time - self._next_due >= interval:
+            self._next_due = stream_time + interval
+        else:
+            self._next_due += interval
+
+        return True
+
+    def mark_decoded(self) -> None:
+        """Registra um frame decodificado (retrieve)."""
+        self.frames_decoded += 1
+
+    def stats(self) -> dict:
+        """Contadores de frames recebidos e decodificados."""
+        return {
+            "frames_grabbed": self.frames_grabbed,
+            "frames_decoded": self.frames_decoded,
+            "source_fps": round(self.source_fps, 2),
+        }
@@ -0,0 +1,352 @@
+"""
+Servidor de inferência compartilhado entre os processos de câmera.
+
+Cada worker do servidor mantém os modelos YOLO carregados uma única vez, junta
+frames de todas as câmeras atribuídas a ele e executa `model.predict` em lotes
+de tamanho dinâmico (limitados por INFERENCE_MAX_BATCH_SIZE e por um prazo
+máximo de espera INFERENCE_MAX_WAIT_MS). As detecções voltam para cada câmera
+pelo seu próprio canal de resposta, identificadas por número de sequência.
+
+O rastreamento continua sendo feito em cada câmera (ver app.core.tracking).
+"""
+import atexit
+import multiprocessing as mp
+import queue
+import threading
+import time
+import numpy as np
+from multiprocessing.connection import Connection
+from typing import Dict, List, Optional, Tuple, Any
+
+from app.utils.logging_utils import setup_logger
+from app.config import settings
+
+logger = setup_logger("inference_server")
+
+EMPTY_DETECTIONS = np.empty((0, 6), dtype=np.float32)
+
+
+def _stream_params(stream_config) -> tuple:
+    """
+    Parâmetros de inferência que precisam ser iguais para frames do mesmo lote.
+    """
+    return (
+        stream_config.detection_model_path,
+        stream_config.inference_backend,
+        stream_config.device,
+        stream_config.confidence_threshold,
+        stream_config.iou,
+        tuple(stream_config.classes) if stream_config.classes else None,
+        stream_config.inference_size,
+    )
+
+
+def _inference_worker_main(
+    worker_id: int,
+    request_queue: mp.Queue,
+    control_conn: Connection,
+    max_batch_size: int,
+    max_wait_ms: float,
+) -> None:
+    """
+    Loop principal de um worker de inferência (roda em processo separado).
+    """
+    from app.core.model_export import load_model, model_key as get_model_key
+
+    worker_logger = setup_logger(f"inference_worker_{worker_id}")
+    response_conns: Dict[int, Connection] = {}
+    models: Dict[tuple, Any] = {}
+    class_ids_cache: Dict[tuple, Optional[List[int]]] = {}
+    names_sent = set()
+    max_wait = max_wait_ms / 1000.0
+
+    def handle_control_messages() -> bool:
+        while control_conn.poll():
+            message = control_conn.recv()
+            command = message[0]
+
+            if command == "register":
+                _, camera_id, conn = message
+                response_conns[camera_id] = conn
+                worker_logger.info(f"Câmera {camera_id} registrada no worker {worker_id}")
+            elif command == "unregister":
+                conn = response_conns.pop(message[1], None)
+                if conn is not None:
+                    conn.close()
+                names_sent.difference_update(
+                    [key for key in names_sent if key[0] == message[1]]
+                )
+            elif command == "stop":
+                return False
+        return True
+
+    def get_model(model_key: tuple):
+        if model_key not in models:
+            worker_logger.info(f"Carregando modelo YOLO: {model_key[0]} ({model_key[1]})")
+            models[model_key] = load_model(*model_key)
+        return models[model_key]
+
+    def get_class_ids(model, model_key: tuple, classes: Optional[tuple]):
+        cache_key = (model_key, classes)
+        if cache_key not in class_ids_cache:
+            if classes:
+                name_to_index = {v: k for k, v in model.names.items()}
+                class_ids_cache[cache_key] = [
+                    name_to_index[name] for name in classes if name in name_to_index
+                ]
+            else:
+                class_ids_cache[cache_key] = None
+        return class_ids_cache[cache_key]
+
+    def run_batch(batch: list) -> None:
+        # Agrupa requisições que podem ir no mesmo predict
+        groups: Dict[tuple, list] = {}
+        for request in batch:
+            groups.setdefault(request[3], []).append(request)
+
+        for params, requests in groups.items():
+            model_path, backend, device, conf, iou, classes, imgsz = params
+            model_key = get_model_key(model_path, backend, imgsz)
+            try:
+                model = get_model(model_key)
+                inference_start = time.time()
+                results = model.predict(
+                    source=[request[2] for request in requests],
+                    conf=conf,
+                    iou=iou,
+                    classes=get_class_ids(model, model_key, classes),
+                    device=device,
+                    imgsz=imgsz,
+                    verbose=False,
+                )
+                inference_time = time.time() - inference_start
+                detections = [
+                    result.boxes.data.cpu().numpy().astype(np.float32)
+                    for result in results
+                ]
+            except Exception as e:
+                worker_logger.error(f"Erro na inferência em lote ({model_path}): {e}")
+                detections = [EMPTY_DETECTIONS] * len(requests)
+                inference_time = 0.0
+
+            for request, camera_detections in zip(requests, detections):
+                camera_id, seq = request[0], request[1]
+                conn = response_conns.get(camera_id)
+                if conn is None:
+                    continue
+
+                # Nomes das classes vão apenas na primeira resposta de cada câmera
+                names = None
+                if (camera_id, model_key) not in names_sent and model_key in models:
+                    names = dict(models[model_key].names)
+                    names_sent.add((camera_id, model_key))
+
+                try:
+                    conn.send((seq, camera_detections, names, inference_time))
+                except (BrokenPipeError, OSError):
+                    response_conns.pop(camera_id, None)
+
+    worker_logger.info(f"Worker de inferência {worker_id} iniciado")
+
+    while handle_control_messages():
+        try:
+            first_request = request_queue.get(timeout=0.1)
+        except queue.Empty:
+            continue
+
+        # Junta mais frames até encher o lote ou estourar o prazo
+        batch = [first_request]
+        deadline = time.monotonic() + max_wait
+        while len(batch) < max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(request_queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+
+        # Registros podem ter chegado enquanto o lote era montado
+        if not handle_control_messages():
+            break
+
+        run_batch(batch)
+
+    worker_logger.info(f"Worker de inferência {worker_id} encerrado")
+
+
+class InferenceClient:
+    """
+    Lado da câmera do servidor de inferência. Envia frames e aguarda as detecções.
+    """
+
+    def __init__(
+        self,
+        camera_id: int,
+        request_queue: mp.Queue,
+        response_conn: Connection,
+        timeout: float = 5.0,
+    ):
+        self.camera_id = camera_id
+        self.request_queue = request_queue
+        self.response_conn = response_conn
+        self.timeout = timeout
+        self.names: Dict[int, str] = {}
+        self.last_inference_time = 0.0
+        self._seq = 0
+
+    def detect(self, frame: np.ndarray, stream_config) -> np.ndarray:
+        """
+        Retorna as detecções do frame (N x 6: x1, y1, x2, y2, conf, cls).
+        """
+        self._seq += 1
+        seq = self._seq
+        deadline = time.monotonic() + self.timeout
+
+        try:
+            self.request_queue.put(
+                (self.camera_id, seq, frame, _stream_params(stream_config)),
+                timeout=self.timeout,
+            )
+        except queue.Full:
+            raise TimeoutError("Fila do servidor de inferência cheia")
+
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0 or not self.response_conn.poll(remaining):
+                raise TimeoutError("Timeout aguardando o servidor de inferência")
+
+            response_seq, detections, names, inference_time = self.response_conn.recv()
+            if names:
+                self.names = names
+
+            # Respostas atrasadas de frames anteriores são descartadas
+            if response_seq == seq:
+                self.last_inference_time = inference_time
+                return detections
+
+
+class InferenceServer:
+    """Gerencia os processos workers de inferência e a atribuição de câmeras."""
+
+    def __init__(self, num_workers: int, max_batch_size: int, max_wait_ms: float):
+        self.num_workers = max(1, num_workers)
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait_ms = max_wait_ms
+        self.workers: List[Dict[str, Any]] = []
+        self.camera_workers: Dict[int, int] = {}
+        self._lock = threading.Lock()
+
+    def start(self) -> None:
+        """Inicia os workers, se ainda não estiverem rodando."""
+        with self._lock:
+            if self.workers:
+                return
+
+            for worker_id in range(self.num_workers):
+                request_queue = mp.Queue(maxsize=self.max_batch_size * 4)
+                control_recv, control_send = mp.Pipe(duplex=False)
+
+                process = mp.Process(
+                    target=_inference_worker_main,
+                    args=(
+                        worker_id,
+                        request_queue,
+                        control_recv,
+                        self.max_batch_size,
+                        self.max_wait_ms,
+                    ),
+                    daemon=True,
+                    name=f"inference_worker_{worker_id}",
+                )
+                process.start()
+                control_recv.close()
+
+                self.workers.append(
+                    {
+                        "process": process,
+                        "request_queue": request_queue,
+                        "control": control_send,
+                        "cameras": set(),
+                    }
+                )
+                logger.info(
+                    f"✓ Worker de inferência {worker_id} iniciado (PID: {process.pid})"
+                )
+
+    def register_camera(self, camera_id: int) -> Tuple[mp.Queue, Connection]:
+        """
+        Atribui a câmera ao worker menos ocupado e retorna o canal
+        (fila de requisições, conexão de respostas) a ser passado ao processo da câmera.
+        """
+        self.start()
+        self.unregister_camera(camera_id)
+
+        with self._lock:
+            worker_id = min(
+                range(len(self.workers)),
+                key=lambda index: len(self.workers[index]["cameras"]),
+            )
+            worker = self.workers[worker_id]
+
+            response_recv, response_send = mp.Pipe(duplex=False)
+            worker["control"].send(("register", camera_id, response_send))
+            response_send.close()
+
+            worker["cameras"].add(camera_id)
+            self.camera_workers[camera_id] = worker_id
+
+        return worker["request_queue"], response_recv
+
+    def unregister_camera(self, camera_id: int) -> None:
+        """Remove a câmera do worker ao qual estava atribuída."""
+        with self._lock:
+            worker_id = self.camera_workers.pop(camera_id, None)
+            if worker_id is None:
+                return
+
+            worker = self.workers[worker_id]
+            worker["cameras"].discard(camera_id)
+            try:
+                worker["control"].send(("unregister", camera_id))
+            except (BrokenPipeError, OSError):
+                pass
+
+    def stop(self) -> None:
+        """Encerra todos os workers."""
+        with self._lock:
+            for worker in self.workers:
+                try:
+                    worker["control"].send(("stop",))
+                except (BrokenPipeError, OSError):
+                    pass
+
+            for worker in self.workers:
+                process = worker["process"]
+                process.join(timeout=5)
+                if process.is_alive():
+                    process.kill()
+                    process.join()
+
+            self.workers.clear()
+            self.camera_workers.clear()
+
+    def get_info(self) -> Dict[int, Dict[str, Any]]:
+        """Retorna informações sobre os workers de inferência."""
+        return {
+            worker_id: {
+                "pid": worker["process"].pid,
+                "alive": worker["process"].is_alive(),
+                "cameras": sorted(worker["cameras"]),
+            }
+            for worker_id, worker in enumerate(self.workers)
+        }
+
+
+# Instância global do servidor (iniciada sob demanda)
+inference_server = InferenceServer(
+    num_workers=settings.INFERENCE_SERVER_WORKERS,
+    max_batch_size=settings.INFERENCE_MAX_BATCH_SIZE,
+    max_wait_ms=settings.INFERENCE_MAX_WAIT_MS,
+)
+atexit.register(inference_server.stop)
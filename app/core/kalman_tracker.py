@@ -0,0 +1,202 @@
+"""
+Tracker leve por IoU com filtro de Kalman, em numpy puro (tracker_model="kalman_iou").
+
+Alternativa aos trackers do ultralytics para nós só com CPU: não há
+compensação de movimento da câmera (GMC) nem associação em dois estágios.
+Por frame:
+
+1. predição de Kalman de todos os tracks de uma vez (estado cx, cy, w, h e
+   velocidades, modelo de velocidade constante);
+2. matriz de custo 1 - IoU entre as caixas previstas e as detecções,
+   calculada vetorialmente;
+3. associação pelo algoritmo de Jonker-Volgenant (lap.lapjv), com IoU
+   mínimo MATCH_IOU;
+4. atualização de Kalman dos tracks associados, também em lote.
+
+Detecções sem track viram tracks novos. Um track novo que não é associado
+no frame seguinte é descartado; os demais sobrevivem sem detecção por até
+TRACK_BUFFER frames (proporcional ao fps), continuando a ser previstos.
+
+A saída tem o mesmo formato dos trackers do ultralytics:
+x1, y1, x2, y2, track_id, confiança, classe, índice da detecção.
+"""
+import lap
+import numpy as np
+
+# IoU mínimo entre a caixa prevista e a detecção para associar
+MATCH_IOU = 0.3
+# Frames (a 30 fps) que um track sobrevive sem detecção
+TRACK_BUFFER = 30
+# Associações necessárias para o track sobreviver a um frame sem detecção
+MIN_HITS = 2
+
+# Ruído do processo e da medição, relativo ao tamanho da caixa
+STD_WEIGHT_POSITION = 1.0 / 20
+STD_WEIGHT_VELOCITY = 1.0 / 160
+
+_NDIM = 4
+_MOTION = np.eye(2 * _NDIM)
+_MOTION[:_NDIM, _NDIM:] = np.eye(_NDIM)
+
+EMPTY_TRACKS = np.empty((0, 8), dtype=np.float32)
+
+
+def iou_matrix(boxes_a: np.ndarray, boxes_b: np.ndarray) -> np.ndarray:
+    """IoU entre todas as caixas (x1, y1, x2, y2) de boxes_a (N) e boxes_b (M): N x M."""
+    top_left = np.maximum(boxes_a[:, None, :2], boxes_b[None, :, :2])
+    bottom_right = np.minimum(boxes_a[:, None, 2:], boxes_b[None, :, 2:])
+    intersection = np.prod(np.clip(bottom_right - top_left, 0, None), axis=2)
+
+    area_a = np.prod(boxes_a[:, 2:] - boxes_a[:, :2], axis=1)
+    area_b = np.prod(boxes_b[:, 2:] - boxes_b[:, :2], axis=1)
+    return intersection / (area_a[:, None] + area_b[None, :] - intersection + 1e-9)
+
+
+def _to_xywh(boxes: np.ndarray) -> np.ndarray:
+    """x1, y1, x2, y2 -> cx, cy, w, h"""
+    wh = boxes[:, 2:4] - boxes[:, :2]
+    return np.concatenate([boxes[:, :2] + wh / 2, wh], axis=1)
+
+
+def _to_xyxy(xywh: np.ndarray) -> np.ndarray:
+    """cx, cy, w, h -> x1, y1, x2, y2"""
+    half = np.clip(xywh[:, 2:4], 1, None) / 2
+    return np.concatenate([xywh[:, :2] - half, xywh[:, :2] + half], axis=1)
+
+
+def _box_scale(xywh: np.ndarray) -> np.ndarray:
+    """w, h, w, h de cada caixa (escala dos ruídos), com mínimo de 1 pixel."""
+    return np.tile(np.clip(xywh[:, 2:4], 1, None), 2)
+
+
+class KalmanIouTracker:
+    """Tracker de uma câmera, com o estado de todos os tracks em arrays."""
+
+    def __init__(self, frame_rate: int = 30, match_iou: float = MATCH_IOU):
+        self.match_iou = match_iou
+        self.max_missing = max(1, int(frame_rate / 30.0 * TRACK_BUFFER))
+        self.reset()
+
+    def reset(self) -> None:
+        """Descarta todos os tracks."""
+        self.mean = np.empty((0, 2 * _NDIM))
+        self.covariance = np.empty((0, 2 * _NDIM, 2 * _NDIM))
+        self.track_ids = np.empty(0, dtype=np.int64)
+        self.hits = np.empty(0, dtype=np.int32)
+        self.missing = np.empty(0, dtype=np.int32)
+        self._next_id = 1
+
+    def _predict(self) -> None:
+        """Predição de Kalman de todos os tracks."""
+        wh = _box_scale(self.mean)
+        std = np.concatenate([STD_WEIGHT_POSITION * wh, STD_WEIGHT_VELOCITY * wh], axis=1)
+
+        self.mean = self.mean @ _MOTION.T
+        self.covariance = _MOTION @ self.covariance @ _MOTION.T
+        self.covariance[:, range(2 * _NDIM), range(2 * _NDIM)] += std**2
+
+    def _update(self, tracks: np.ndarray, measurements: np.ndarray) -> None:
+        """Correção de Kalman dos tracks indicados com as medições (cx, cy, w, h)."""
+        mean = self.mean[tracks]
+        covariance = self.covariance[tracks]
+
+        wh = _box_scale(mean)
+        innovation_cov = covariance[:, :_NDIM, :_NDIM].copy()
+        innovation_cov[:, range(_NDIM), range(_NDIM)] += (STD_WEIGHT_POSITION * wh) ** 2
+
+        # K = P Hᵀ S⁻¹ (S é simétrica: S Kᵀ = H P)
+        gain = np.linalg.solve(innovation_cov, covariance[:, :_NDIM, :]).transpose(0, 2, 1)
+        innovation = measurements - mean[:, :_NDIM]
+
+        self.mean[tracks] = mean + np.einsum("nij,nj->ni", gain, innovation)
+        self.covariance[tracks] = covariance - gain @ innovation_cov @ gain.transpose(0, 2, 1)
+
+    def _associate(self, detection_boxes: np.ndarray):
+        """Pares (track, detecção) com IoU acima do mínimo, pela atribuição ótima."""
+        if len(self.track_ids) == 0 or len(detection_boxes) == 0:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+
+        cost = 1.0 - iou_matrix(_to_xyxy(self.mean[:, :_NDIM]), detection_boxes)
+        _, assignment, _ = lap.lapjv(cost, extend_cost=True, cost_limit=1.0 - self.match_iou)
+
+        tracks = np.flatnonzero(assignment >= 0)
+        return tracks, assignment[tracks]
+
+    def update(self, detections: np.ndarray) -> np.ndarray:
+        """
+        Atualiza os tracks com as detecções do frame (N x 6: x1, y1, x2, y2,
+        conf, cls) e retorna os tracks vistos neste frame (M x 8).
+        """
+        detections = np.asarray(detections, dtype=np.float64).reshape(-1, 6)
+        detection_boxes = detections[:, :4]
+
+        if len(self.track_ids):
+            self._predict()
+
+        matched_tracks, matched_detections = self._associate(detection_boxes)
+        if len(matched_tracks):
+            self._update(matched_tracks, _to_xywh(detection_boxes[matched_detections]))
+
+        self.missing += 1
+        self.missing[matched_tracks] = 0
+        self.hits[matched_tracks] += 1
+
+        # Tracks novos sem confirmação ou ausentes há muito tempo saem
+        keep = (self.missing == 0) | (
+            (self.hits >= MIN_HITS) & (self.missing <= self.max_missing)
+        )
+        if not keep.all():
+            new_index = np.cumsum(keep) - 1
+            matched_tracks = new_index[matched_tracks]
+            self.mean = self.mean[keep]
+            self.covariance = self.covariance[keep]
+            self.track_ids = self.track_ids[keep]
+            self.hits = self.hits[keep]
+            self.missing = self.missing[keep]
+
+        # Detecções sem track iniciam tracks novos
+        new_detections = np.setdiff1d(
+            np.arange(len(detections)), matched_detections, assume_unique=True
+        )
+        new_tracks = self._start_tracks(detection_boxes[new_detections])
+
+        output_tracks = np.concatenate([matched_tracks, new_tracks])
+        output_detections = np.concatenate([matched_detections, new_detections])
+        if len(output_tracks) == 0:
+            return EMPTY_TRACKS
+
+        return np.column_stack(
+            [
+                _to_xyxy(self.mean[output_tracks, :_NDIM]),
+                self.track_ids[output_tracks],
+                detections[output_detections, 4],
+                detections[output_detections, 5],
+                output_detections,
+            ]
+        ).astype(np.float32)
+
+    def _start_tracks(self, boxes: np.ndarray) -> np.ndarray:
+        """Cria tracks para as caixas e retorna os seus índices."""
+        count = len(boxes)
+        if count == 0:
+            return np.empty(0, dtype=np.int64)
+
+        xywh = _to_xywh(boxes)
+        wh = _box_scale(xywh)
+        std = np.concatenate(
+            [2 * STD_WEIGHT_POSITION * wh, 10 * STD_WEIGHT_VELOCITY * wh], axis=1
+        )
+        covariance = np.zeros((count, 2 * _NDIM, 2 * _NDIM))
+        covariance[:, range(2 * _NDIM), range(2 * _NDIM)] = std**2
+
+        start = len(self.track_ids)
+        self.mean = np.concatenate([self.mean, np.pad(xywh, ((0, 0), (0, _NDIM)))])
+        self.covariance = np.concatenate([self.covariance, covariance])
+        self.track_ids = np.concatenate(
+            [self.track_ids, np.arange(self._next_id, self._next_id + count)]
+        )
+        self.hits = np.concatenate([self.hits, np.ones(count, dtype=np.int32)])
+        self.missing = np.concatenate([self.missing, np.zeros(count, dtype=np.int32)])
+        self._next_id += count
+
+        return np.arange(start, start + count)
@@ -0,0 +1,144 @@
+"""
+Backends de inferência exportados (ONNX Runtime, OpenVINO).
+
+Com `inference_backend` diferente de "pytorch", os pesos `.pt` são exportados
+no primeiro uso e o artefato fica em cache em disco (MODEL_CACHE_DIR), com nome
+derivado do hash dos pesos, do tamanho de entrada e do backend. Todos os
+processos (câmeras e workers de inferência) reutilizam o mesmo artefato; um
+lock de arquivo garante que só um deles faça a exportação.
+
+O modelo exportado é carregado pelo próprio YOLO da ultralytics, então o
+formato das detecções (Results / boxes.data) é o mesmo do modelo PyTorch.
+
+O backend "onnx-int8" é o ONNX quantizado estaticamente, calibrado com frames
+das câmeras (ver app.core.quantization); o nome do artefato inclui também a
+identificação do conjunto de calibração.
+
+Os modelos são exportados com eixos dinâmicos (dynamic=True), para que o
+servidor de inferência envie lotes de tamanho variável. O tamanho de
+exportação é o inference_size da stream, que também é passado como imgsz em
+cada inferência, e faz parte do nome do artefato.
+"""
+import fcntl
+import functools
+import hashlib
+import os
+import shutil
+from typing import Dict
+
+from app.utils.logging_utils import setup_logger
+from app.config import settings
+
+logger = setup_logger("model_export")
+
+# Tamanho de entrada usado na exportação (padrão da ultralytics)
+DEFAULT_IMGSZ = 640
+
+# Formato de exportação da ultralytics e sufixo do artefato de cada backend
+EXPORT_FORMATS: Dict[str, Dict[str, str]] = {
+    "onnx": {"format": "onnx", "suffix": ".onnx"},
+    "openvino": {"format": "openvino", "suffix": "_openvino_model"},
+    "onnx-int8": {"format": "onnx", "suffix": ".onnx"},
+}
+
+INFERENCE_BACKENDS = ("pytorch",) + tuple(EXPORT_FORMATS)
+
+
+def file_hash(path: str, length: int = 16) -> str:
+    """Hash (sha256, truncado) do conteúdo do arquivo de pesos."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()[:length]
+
+
+@functools.lru_cache(maxsize=None)
+def _resolve_weights(model_path: str) -> str:
+    """
+    Caminho local dos pesos, sem carregar o modelo. Nomes como "yolov8n.pt"
+    são baixados pela ultralytics no primeiro uso.
+    """
+    if os.path.isfile(model_path):
+        return model_path
+
+    from ultralytics.utils.downloads import attempt_download_asset
+
+    return str(attempt_download_asset(model_path))
+
+
+def artifact_path(model_path: str, backend: str, imgsz: int) -> str:
+    """Caminho do artefato exportado no cache."""
+    weights = _resolve_weights(model_path)
+    stem = os.path.splitext(os.path.basename(weights))[0]
+    name = f"{stem}-{file_hash(weights)}-{imgsz}-{backend}"
+    if backend == "onnx-int8":
+        from app.core.quantization import calibration_fingerprint
+
+        # Modelo INT8 depende também dos frames de calibração
+        name += "-" + calibration_fingerprint(
+            settings.QUANT_CALIBRATION_DIR, settings.QUANT_CALIBRATION_FRAMES
+        )
+    return os.path.join(settings.MODEL_CACHE_DIR, name + EXPORT_FORMATS[backend]["suffix"])
+
+
+def export_model(model_path: str, backend: str, imgsz: int = DEFAULT_IMGSZ) -> str:
+    """
+    Retorna o artefato do modelo para o backend, exportando-o se ainda não
+    estiver no cache.
+    """
+    if backend not in EXPORT_FORMATS:
+        raise ValueError(f"Backend de inferência desconhecido: {backend}")
+
+    target = artifact_path(model_path, backend, imgsz)
+    if os.path.exists(target):
+        return target
+
+    os.makedirs(settings.MODEL_CACHE_DIR, exist_ok=True)
+
+    # Outros processos podem estar exportando o mesmo modelo
+    with open(target + ".lock", "w") as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            if os.path.exists(target):
+                return target
+
+            if backend == "onnx-int8":
+                from app.core.quantization import quantize_model
+
+                return quantize_model(model_path, imgsz, target)
+
+            from ultralytics import YOLO
+
+            logger.info(f"Exportando {model_path} para {backend} (imgsz={imgsz})...")
+            exported = YOLO(_resolve_weights(model_path)).export(
+                format=EXPORT_FORMATS[backend]["format"],
+                imgsz=imgsz,
+                dynamic=True,  # lotes de tamanho variável no servidor de inferência
+                verbose=False,
+            )
+
+            # A ultralytics grava ao lado dos pesos: move para o cache
+            shutil.move(str(exported), target)
+            logger.info(f"Modelo exportado: {target}")
+            return target
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def model_key(model_path: str, backend: str, imgsz: int = DEFAULT_IMGSZ) -> tuple:
+    """
+    Identifica o modelo carregado: o tamanho de entrada só distingue modelos
+    exportados (os pesos PyTorch aceitam qualquer imgsz).
+    """
+    return model_path, backend, DEFAULT_IMGSZ if backend == "pytorch" else imgsz
+
+
+def load_model(model_path: str, backend: str = "pytorch", imgsz: int = DEFAULT_IMGSZ):
+    """Carrega o YOLO para o backend escolhido."""
+    from ultralytics import YOLO
+
+    if backend == "pytorch":
+        return YOLO(model_path)
+
+    return YOLO(export_model(model_path, backend, imgsz), task="detect")
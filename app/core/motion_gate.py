@@ -0,0 +1,78 @@
+"""
+Filtro de movimento antes da inferência (motion_gate).
+
+Cada frame amostrado é reduzido para MOTION_WIDTH pixels de largura em tons de
+cinza e comparado com o frame da última inferência. Se a fração de pixels que
+mudaram mais que PIXEL_DELTA ficar abaixo do limite da stream, a cena é
+considerada parada e a detecção é pulada. Uma inferência é forçada a cada
+motion_keepalive_seconds, mesmo sem movimento.
+
+Como a referência é o frame da última inferência (e não o anterior), mudanças
+lentas se acumulam até disparar uma nova detecção.
+"""
+import time
+
+import cv2
+import numpy as np
+
+# Largura da imagem comparada (a altura segue a proporção do frame)
+MOTION_WIDTH = 160
+# Diferença mínima de intensidade para um pixel contar como alterado
+PIXEL_DELTA = 25
+# Suavização antes da comparação (reduz o ruído do sensor e da compressão)
+BLUR_KERNEL = (5, 5)
+
+
+class MotionGate:
+    """Decide, por câmera, se um frame precisa passar pela detecção."""
+
+    def __init__(self, threshold: float, keepalive_seconds: float):
+        self.threshold = threshold
+        self.keepalive_seconds = keepalive_seconds
+        self.frames_inferred = 0
+        self.frames_skipped = 0
+        self._reference = None
+        self._last_inference = float("-inf")
+
+    def _downscale(self, frame: np.ndarray) -> np.ndarray:
+        height, width = frame.shape[:2]
+        size = (MOTION_WIDTH, max(1, round(height * MOTION_WIDTH / width)))
+        small = cv2.resize(frame, size, interpolation=cv2.INTER_AREA)
+        return cv2.GaussianBlur(cv2.cvtColor(small, cv2.COLOR_BGR2GRAY), BLUR_KERNEL, 0)
+
+    def motion(self, gray: np.ndarray) -> float:
+        """Fração dos pixels alterados em relação ao frame da última inferência."""
+        diff = cv2.absdiff(gray, self._reference)
+        return np.count_nonzero(diff > PIXEL_DELTA) / diff.size
+
+    def should_infer(self, frame: np.ndarray) -> bool:
+        """Indica se o frame deve passar pela detecção (e atualiza a referência)."""
+        gray = self._downscale(frame)
+        now = time.monotonic()
+
+        infer = (
+            self._reference is None
+            or self._reference.shape != gray.shape
+            or now - self._last_inference >= self.keepalive_seconds
+            or self.motion(gray) >= self.threshold
+        )
+
+        if infer:
+            self._reference = gray
+            self._last_inference = now
+            self.frames_inferred += 1
+        else:
+            self.frames_skipped += 1
+        return infer
+
+    @property
+    def skip_fraction(self) -> float:
+        total = self.frames_inferred + self.frames_skipped
+        return self.frames_skipped / total if total else 0.0
+
+    def stats(self) -> dict:
+        """Frames pulados por falta de movimento."""
+        return {
+            "frames_skipped": self.frames_skipped,
+            "motion_skip_fraction": round(self.skip_fraction, 4),
+        }
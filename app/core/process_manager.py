@@ -5,8 +5,10 @@ import multiprocessing as mp
 import signal
 import sys
 import atexit
-from typing import Dict
+from typing import Dict, List, Optional
+from app.core.camera_status import CameraStatus
 from app.utils.logging_utils import setup_logger
+from app.utils.process_utils import process_memory
 
 logger = setup_logger("process_manager")
 
@@ -15,7 +17,12 @@ class CameraProcessManager:
     """Gerencia processos de câmeras e garante cleanup no shutdown."""
     
     def __init__(self):
+        # mp.Process ou WorkerHandle (processos criados pelo zygote)
         self.processes: Dict[int, mp.Process] = {}
+        # Processos auxiliares de cada câmera (ex: processo de captura)
+        self.helper_processes: Dict[int, List[mp.Process]] = {}
+        # Estado de prontidão de cada câmera (loading, warming, running)
+        self.camera_status: Dict[int, CameraStatus] = {}
         self._setup_signal_handlers()
         atexit.register(self.cleanup_all)
     
@@ -30,13 +37,34 @@ class CameraProcessManager:
         self.cleanup_all()
         sys.exit(0)
     
-    def add_process(self, camera_id: int, process: mp.Process):
-        """Adiciona processo à lista gerenciada."""
+    def add_process(
+        self,
+        camera_id: int,
+        process: mp.Process,
+        helpers: Optional[List[mp.Process]] = None,
+        status: Optional[CameraStatus] = None,
+    ):
+        """Adiciona processo (e seus auxiliares) à lista gerenciada."""
         self.processes[camera_id] = process
+        if helpers:
+            self.helper_processes[camera_id] = helpers
+        if status is not None:
+            self.camera_status[camera_id] = status
         logger.info(f"✓ Processo câmera {camera_id} registrado (PID: {process.pid})")
     
+    def _terminate_helpers(self, camera_id: int):
+        """Termina os processos auxiliares de uma câmera."""
+        for helper in self.helper_processes.pop(camera_id, []):
+            if helper.is_alive():
+                helper.terminate()
+                helper.join(timeout=5)
+                if helper.is_alive():
+                    helper.kill()
+                    helper.join()
+    
     def remove_process(self, camera_id: int):
         """Remove e termina processo específico."""
+        self._terminate_helpers(camera_id)
         if camera_id in self.processes:
             process = self.processes[camera_id]
             
@@ -51,6 +79,9 @@ class CameraProcessManager:
                     process.join()
             
             del self.processes[camera_id]
+            status = self.camera_status.pop(camera_id, None)
+            if status is not None:
+                status.close()
             logger.info(f"✓ Processo câmera {camera_id} removido")
     
     def cleanup_all(self):
@@ -77,7 +108,13 @@ class CameraProcessManager:
                 process.kill()
                 process.join()
         
+        for camera_id in list(self.helper_processes.keys()):
+            self._terminate_helpers(camera_id)
+        
         self.processes.clear()
+        for status in self.camera_status.values():
+            status.close()
+        self.camera_status.clear()
         logger.info("✓ Todos os processos encerrados")
     
     def get_active_count(self) -> int:
@@ -88,11 +125,23 @@ class CameraProcessManager:
         """Retorna informações sobre processos ativos."""
         info = {}
         for camera_id, process in self.processes.items():
+            alive = process.is_alive()
             info[camera_id] = {
                 "pid": process.pid,
-                "alive": process.is_alive(),
+                "alive": alive,
                 "exitcode": process.exitcode,
+                "memory": process_memory(process.pid) if alive else None,
+                "helpers": [
+                    {"name": helper.name, "pid": helper.pid, "alive": helper.is_alive()}
+                    for helper in self.helper_processes.get(camera_id, [])
+                ],
             }
+
+            status = self.camera_status.get(camera_id)
+            if status is not None:
+                if not alive and status.state != "stopped":
+                    status.set_state("stopped")
+                info[camera_id]["status"] = status.to_dict()
         return info
 
 
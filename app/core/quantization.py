@@ -0,0 +1,303 @@
+"""
+Modo INT8: quantização estática (ONNX Runtime) calibrada com frames das
+próprias câmeras.
+
+Fluxo:
+    1. capture_calibration_frames: captura frames de uma câmera (ou vídeo) pelo
+       mesmo caminho de captura usado na detecção (capture_loop + FrameSampler)
+       e grava em QUANT_CALIBRATION_DIR.
+    2. quantize_model: exporta o modelo FP32 para ONNX (cache do model_export)
+       e gera o modelo INT8 (QDQ) calibrado com esses frames. É chamado pelo
+       model_export no primeiro uso do backend "onnx-int8".
+    3. compare_models: relatório de acurácia (detecções do INT8 casadas com as
+       do FP32 nos mesmos frames) e de ganho de latência.
+
+Uso pela linha de comando (a partir da raiz do projeto):
+    python -m app.core.quantization --source rtsp://... --models yolov8n.pt yolov8s.pt
+"""
+import argparse
+import glob
+import hashlib
+import json
+import os
+import threading
+import time
+import cv2
+import numpy as np
+from typing import Any, Dict, List, Optional
+
+from app.core.frame_capture import capture_loop
+from app.core.frame_sampler import FrameSampler
+from app.utils.logging_utils import setup_logger
+from app.config import settings
+
+logger = setup_logger("quantization")
+
+# Cor de preenchimento do letterbox (a mesma da ultralytics)
+LETTERBOX_COLOR = (114, 114, 114)
+
+# IoU mínimo para considerar duas detecções (FP32 x INT8) o mesmo objeto
+MATCH_IOU = 0.5
+
+
+def capture_calibration_frames(
+    source: str,
+    output_dir: str,
+    count: int,
+    fps: float = 1.0,
+    timeout: float = 600.0,
+) -> int:
+    """
+    Captura count frames da fonte, amostrados a fps, e grava como JPEG em
+    output_dir. Retorna o número de frames gravados.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    should_stop = threading.Event()
+    saved = [0]
+
+    def on_frame(frame: np.ndarray) -> None:
+        path = os.path.join(output_dir, f"calib_{int(time.time() * 1000)}_{saved[0]:05d}.jpg")
+        cv2.imwrite(path, frame, [int(cv2.IMWRITE_JPEG_QUALITY), 95])
+        saved[0] += 1
+        if saved[0] >= count:
+            should_stop.set()
+
+    capture_thread = threading.Thread(
+        target=capture_loop,
+        args=(0, source, should_stop, on_frame, time.time(), FrameSampler(fps)),
+        daemon=True,
+    )
+    capture_thread.start()
+    capture_thread.join(timeout)
+    should_stop.set()
+
+    logger.info(f"{saved[0]} frames de calibração gravados em {output_dir}")
+    return saved[0]
+
+
+def calibration_paths(directory: str, limit: Optional[int] = None) -> List[str]:
+    """Arquivos dos frames de calibração usados na quantização."""
+    return sorted(glob.glob(os.path.join(directory, "*.jpg")))[:limit]
+
+
+def calibration_fingerprint(directory: str, limit: Optional[int] = None) -> str:
+    """
+    Identifica o conjunto de calibração (nome, tamanho e data de modificação de
+    cada frame e o limite de frames): entra no nome do artefato INT8, então
+    recapturar os frames ou mudar QUANT_CALIBRATION_FRAMES gera outro modelo.
+    """
+    digest = hashlib.sha256(f"{limit}\n".encode())
+    for path in calibration_paths(directory, limit):
+        stat = os.stat(path)
+        digest.update(f"{os.path.basename(path)} {stat.st_size} {stat.st_mtime_ns}\n".encode())
+    return digest.hexdigest()[:12]
+
+
+def load_calibration_frames(directory: str, limit: Optional[int] = None) -> List[np.ndarray]:
+    """Frames de calibração gravados em disco."""
+    paths = calibration_paths(directory, limit)
+    return [frame for frame in (cv2.imread(path) for path in paths) if frame is not None]
+
+
+def letterbox(frame: np.ndarray, imgsz: int) -> np.ndarray:
+    """
+    Pré-processamento equivalente ao da ultralytics: redimensiona mantendo a
+    proporção, completa com LETTERBOX_COLOR e converte para NCHW RGB float32.
+    """
+    height, width = frame.shape[:2]
+    scale = min(imgsz / height, imgsz / width)
+    new_width, new_height = int(round(width * scale)), int(round(height * scale))
+    resized = cv2.resize(frame, (new_width, new_height), interpolation=cv2.INTER_LINEAR)
+
+    canvas = np.full((imgsz, imgsz, 3), LETTERBOX_COLOR, dtype=np.uint8)
+    top = (imgsz - new_height) // 2
+    left = (imgsz - new_width) // 2
+    canvas[top : top + new_height, left : left + new_width] = resized
+
+    tensor = canvas[:, :, ::-1].transpose(2, 0, 1).astype(np.float32) / 255.0
+    return np.ascontiguousarray(tensor[None])
+
+
+def quantize_model(model_path: str, imgsz: int, output_path: str) -> str:
+    """
+    Gera o modelo INT8 em output_path a partir do ONNX FP32 do modelo,
+    calibrado com os frames de QUANT_CALIBRATION_DIR.
+    """
+    import onnx
+    from onnxruntime.quantization import (
+        CalibrationDataReader,
+        QuantFormat,
+        QuantType,
+        quantize_static,
+    )
+    from app.core.model_export import export_model
+
+    frames = load_calibration_frames(
+        settings.QUANT_CALIBRATION_DIR, settings.QUANT_CALIBRATION_FRAMES
+    )
+    if not frames:
+        raise RuntimeError(
+            f"Nenhum frame de calibração em {settings.QUANT_CALIBRATION_DIR}. "
+            "Capture frames com: python -m app.core.quantization --source <url>"
+        )
+
+    fp32_path = export_model(model_path, "onnx", imgsz)
+    input_name = onnx.load(fp32_path, load_external_data=False).graph.input[0].name
+
+    class FrameReader(CalibrationDataReader):
+        def __init__(self):
+            self._frames = iter(frames)
+
+        def get_next(self):
+            frame = next(self._frames, None)
+            return None if frame is None else {input_name: letterbox(frame, imgsz)}
+
+    # Gera em arquivo temporário: um artefato incompleto nunca entra no cache
+    tmp_path = output_path + ".tmp.onnx"
+
+    logger.info(f"Quantizando {model_path} com {len(frames)} frames de calibração...")
+    quantize_static(
+        fp32_path,
+        tmp_path,
+        FrameReader(),
+        quant_format=QuantFormat.QDQ,
+        activation_type=QuantType.QUInt8,
+        weight_type=QuantType.QInt8,
+        per_channel=True,
+    )
+
+    # Metadados da ultralytics (nomes das classes, stride, imgsz) usados pelo YOLO
+    fp32_model = onnx.load(fp32_path, load_external_data=False)
+    int8_model = onnx.load(tmp_path)
+    if not int8_model.metadata_props:
+        for prop in fp32_model.metadata_props:
+            int8_model.metadata_props.add(key=prop.key, value=prop.value)
+        onnx.save(int8_model, tmp_path)
+
+    os.replace(tmp_path, output_path)
+
+    logger.info(f"Modelo INT8 gerado: {output_path}")
+    return output_path
+
+
+def _box_iou(boxes_a: np.ndarray, boxes_b: np.ndarray) -> np.ndarray:
+    """IoU entre todos os pares de caixas (x1, y1, x2, y2)."""
+    top_left = np.maximum(boxes_a[:, None, :2], boxes_b[None, :, :2])
+    bottom_right = np.minimum(boxes_a[:, None, 2:], boxes_b[None, :, 2:])
+    intersection = np.prod(np.clip(bottom_right - top_left, 0, None), axis=2)
+    area_a = np.prod(boxes_a[:, 2:] - boxes_a[:, :2], axis=1)
+    area_b = np.prod(boxes_b[:, 2:] - boxes_b[:, :2], axis=1)
+    return intersection / (area_a[:, None] + area_b[None, :] - intersection + 1e-9)
+
+
+def match_detections(reference: np.ndarray, candidate: np.ndarray) -> Dict[str, float]:
+    """
+    Casa (guloso, por IoU e mesma classe) as detecções N x 6 do modelo
+    quantizado com as do modelo de referência.
+    """
+    if len(reference) == 0 or len(candidate) == 0:
+        return {"matched": 0, "iou_sum": 0.0}
+
+    iou = _box_iou(reference[:, :4], candidate[:, :4])
+    iou[reference[:, 5][:, None] != candidate[:, 5][None, :]] = 0
+
+    matched = 0
+    iou_sum = 0.0
+    while True:
+        index = np.unravel_index(np.argmax(iou), iou.shape)
+        best = iou[index]
+        if best < MATCH_IOU:
+            break
+        matched += 1
+        iou_sum += float(best)
+        iou[index[0], :] = 0
+        iou[:, index[1]] = 0
+
+    return {"matched": matched, "iou_sum": iou_sum}
+
+
+def compare_models(
+    model_path: str, frames: List[np.ndarray], imgsz: int, device: str = "cpu"
+) -> Dict[str, Any]:
+    """
+    Roda os modelos FP32 (ONNX) e INT8 nos mesmos frames e retorna a diferença
+    de acurácia (precisão e recall do INT8 em relação ao FP32) e de latência.
+    """
+    from app.core.model_export import load_model
+
+    models = {
+        "fp32": load_model(model_path, "onnx", imgsz),
+        "int8": load_model(model_path, "onnx-int8", imgsz),
+    }
+
+    detections = {name: [] for name in models}
+    latencies = {name: [] for name in models}
+    for name, model in models.items():
+        model.predict(frames[0], imgsz=imgsz, device=device, verbose=False)  # aquecimento
+        for frame in frames:
+            start = time.perf_counter()
+            result = model.predict(frame, imgsz=imgsz, device=device, verbose=False)[0]
+            latencies[name].append((time.perf_counter() - start) * 1000)
+            detections[name].append(result.boxes.data.cpu().numpy())
+
+    matched = 0
+    iou_sum = 0.0
+    for reference, candidate in zip(detections["fp32"], detections["int8"]):
+        match = match_detections(reference, candidate)
+        matched += match["matched"]
+        iou_sum += match["iou_sum"]
+
+    total_fp32 = sum(len(d) for d in detections["fp32"])
+    total_int8 = sum(len(d) for d in detections["int8"])
+    fp32_ms = float(np.mean(latencies["fp32"]))
+    int8_ms = float(np.mean(latencies["int8"]))
+
+    return {
+        "model": model_path,
+        "frames": len(frames),
+        "fp32_detections": total_fp32,
+        "int8_detections": total_int8,
+        "recall_vs_fp32": round(matched / total_fp32, 4) if total_fp32 else None,
+        "precision_vs_fp32": round(matched / total_int8, 4) if total_int8 else None,
+        "mean_matched_iou": round(iou_sum / matched, 4) if matched else None,
+        "fp32_ms": round(fp32_ms, 2),
+        "int8_ms": round(int8_ms, 2),
+        "speedup": round(fp32_ms / int8_ms, 2) if int8_ms else None,
+    }
+
+
+def main() -> None:
+    from app.core.model_export import DEFAULT_IMGSZ
+
+    parser = argparse.ArgumentParser(description="Calibração e quantização INT8")
+    parser.add_argument("--source", help="URL da câmera ou vídeo para capturar frames")
+    parser.add_argument("--frames", type=int, default=settings.QUANT_CALIBRATION_FRAMES)
+    parser.add_argument("--fps", type=float, default=1.0, help="Taxa de captura dos frames")
+    parser.add_argument("--models", nargs="+", default=["yolov8n.pt", "yolov8s.pt", "yolov8m.pt"])
+    parser.add_argument("--imgsz", type=int, default=DEFAULT_IMGSZ)
+    parser.add_argument("--device", default="cpu")
+    parser.add_argument("--report", default="quantization_report.json")
+    args = parser.parse_args()
+
+    if args.source:
+        capture_calibration_frames(
+            args.source, settings.QUANT_CALIBRATION_DIR, args.frames, args.fps
+        )
+
+    frames = load_calibration_frames(settings.QUANT_CALIBRATION_DIR, args.frames)
+    report = [compare_models(model, frames, args.imgsz, args.device) for model in args.models]
+
+    for entry in report:
+        logger.info(
+            f"{entry['model']}: {entry['fp32_ms']}ms -> {entry['int8_ms']}ms "
+            f"({entry['speedup']}x), recall {entry['recall_vs_fp32']}, "
+            f"precisão {entry['precision_vs_fp32']}"
+        )
+
+    with open(args.report, "w") as f:
+        json.dump(report, f, indent=2)
+    logger.info(f"Relatório salvo em {args.report}")
+
+
+if __name__ == "__main__":
+    main()
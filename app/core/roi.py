@@ -0,0 +1,90 @@
+"""
+Regiões de interesse (ROI) por câmera.
+
+A stream pode definir polígonos em coordenadas normalizadas (0 a 1) do frame.
+A inferência roda apenas no recorte retangular que envolve a união dos
+polígonos, então menos pixels entram no modelo; as detecções são devolvidas
+em coordenadas do frame somando a origem do recorte. Com roi_filter, só ficam
+as detecções cujo ponto de apoio (centro da base da bbox) cai dentro de algum
+polígono.
+
+O recorte e a máscara dos polígonos são calculados uma vez por resolução.
+"""
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import cv2
+import numpy as np
+
+from app.api.models.camera import StreamConfig
+
+_geometry_cache: Dict[tuple, "RoiGeometry"] = {}
+
+
+class RoiGeometry:
+    """Recorte e máscara dos polígonos de uma câmera em uma resolução."""
+
+    __slots__ = ("x1", "y1", "x2", "y2", "mask")
+
+    def __init__(self, polygons: List[np.ndarray]):
+        points = np.concatenate(polygons)
+        self.x1 = int(points[:, 0].min())
+        self.y1 = int(points[:, 1].min())
+        self.x2 = int(points[:, 0].max()) + 1
+        self.y2 = int(points[:, 1].max()) + 1
+
+        # Máscara no espaço do recorte (1 dentro de algum polígono)
+        self.mask = np.zeros((self.y2 - self.y1, self.x2 - self.x1), dtype=np.uint8)
+        cv2.fillPoly(self.mask, [polygon - (self.x1, self.y1) for polygon in polygons], 1)
+
+    @property
+    def origin(self) -> Tuple[int, int]:
+        return self.x1, self.y1
+
+    def crop(self, frame: np.ndarray) -> np.ndarray:
+        """Recorte do frame que envolve os polígonos (view, sem cópia)."""
+        return frame[self.y1 : self.y2, self.x1 : self.x2]
+
+    def contains(self, boxes: np.ndarray) -> np.ndarray:
+        """
+        Indica quais bboxes (em coordenadas do frame) têm o centro da base
+        dentro de algum polígono.
+        """
+        height, width = self.mask.shape
+        anchor_x = np.clip((boxes[:, 0] + boxes[:, 2]) // 2 - self.x1, 0, width - 1)
+        anchor_y = np.clip(boxes[:, 3] - 1 - self.y1, 0, height - 1)
+        return self.mask[anchor_y, anchor_x] > 0
+
+
+def _polygon_key(roi: Sequence[Sequence[Sequence[float]]]) -> tuple:
+    return tuple(tuple(tuple(point) for point in polygon) for polygon in roi)
+
+
+def get_roi(stream_config: StreamConfig, frame_shape: Tuple[int, ...]) -> Optional[RoiGeometry]:
+    """
+    Geometria da ROI da câmera para a resolução do frame (ou None, sem ROI).
+    Polígonos com menos de 3 pontos são ignorados.
+    """
+    if not stream_config.roi:
+        return None
+
+    height, width = frame_shape[:2]
+    cache_key = (_polygon_key(stream_config.roi), width, height)
+    geometry = _geometry_cache.get(cache_key)
+
+    if geometry is None:
+        scale = np.array([width, height], dtype=np.float64)
+        limit = np.array([width - 1, height - 1])
+        polygons = [
+            np.clip(np.round(np.asarray(polygon, dtype=np.float64) * scale), 0, limit).astype(
+                np.int32
+            )
+            for polygon in stream_config.roi
+            if len(polygon) >= 3
+        ]
+        if not polygons:
+            return None
+
+        geometry = RoiGeometry(polygons)
+        _geometry_cache[cache_key] = geometry
+
+    return geometry
@@ -0,0 +1,128 @@
+"""
+Snapshots (imagens JPEG) enviados junto com os eventos.
+
+Um snapshot guarda apenas os pixels que o evento pode usar, copiados do frame
+no momento em que ele vira a melhor imagem (best-shot) de algum track, e só é
+codificado em JPEG quando um evento que o usa é enviado, uma única vez:
+
+- FrameSnapshot: o frame já reduzido para WIDTH_RESIZE, compartilhado por
+  todos os tracks daquele frame, cada um com a sua bbox mapeada para a escala
+  da imagem;
+- CropSnapshot (modo "crop" de StreamConfig.snapshot_mode): apenas a região
+  da bbox mais uma margem de contexto, com a bbox relativa ao recorte. A
+  miniatura opcional do frame inteiro é um FrameSnapshot com a largura da
+  miniatura, compartilhado pelos objetos do frame.
+
+Assim a memória retida por track é limitada à imagem que será enviada, e não
+ao frame em resolução original.
+"""
+import threading
+import cv2
+import numpy as np
+from typing import Optional
+
+from app.utils.image_utils import convert_frame_to_bytes
+from app.config import settings
+
+
+class FrameSnapshot:
+    """Frame reduzido para max_width na criação e codificado sob demanda, uma única vez."""
+
+    def __init__(
+        self,
+        frame: np.ndarray,
+        max_width: Optional[int] = None,
+        interpolation: int = cv2.INTER_LINEAR,
+    ):
+        max_width = max_width or settings.WIDTH_RESIZE
+        height, width = frame.shape[:2]
+        if width > max_width:
+            self.scale = max_width / width
+            self.frame = cv2.resize(
+                frame,
+                (max_width, max(1, int(height * self.scale))),
+                interpolation=interpolation,
+            )
+        else:
+            # O frame da câmera é reaproveitado (buffer compartilhado ou
+            # próxima leitura): a cópia é do tamanho da imagem enviada
+            self.scale = 1.0
+            self.frame = frame.copy()
+        self._frame_bytes: Optional[bytes] = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def thumbnail(cls, frame: np.ndarray, width: int) -> "FrameSnapshot":
+        """Miniatura de baixa resolução do frame inteiro."""
+        return cls(frame, width, cv2.INTER_AREA)
+
+    def encode(self) -> bytes:
+        """Codifica o frame (apenas na primeira chamada)."""
+        with self._lock:
+            if self._frame_bytes is None:
+                self._frame_bytes = convert_frame_to_bytes(
+                    self.frame, settings.QUALITY_CONVERT
+                )
+                self.frame = None
+            return self._frame_bytes
+
+    def map_bboxes(self, boxes: np.ndarray) -> np.ndarray:
+        """Converte bboxes do frame original para a escala da imagem codificada."""
+        if self.scale == 1.0:
+            return boxes
+        return (boxes * self.scale).astype(np.int32)
+
+
+class CropSnapshot:
+    """
+    Recorte de um objeto: a bbox expandida por margin (fração do tamanho da
+    bbox em cada lado), limitado a WIDTH_RESIZE de largura.
+    """
+
+    def __init__(
+        self,
+        frame: np.ndarray,
+        box: np.ndarray,
+        margin: float,
+        thumbnail: Optional[FrameSnapshot] = None,
+    ):
+        height, width = frame.shape[:2]
+        x1, y1, x2, y2 = box.astype(np.int32).tolist()
+        margin_x, margin_y = int((x2 - x1) * margin), int((y2 - y1) * margin)
+        cx1, cx2 = max(0, x1 - margin_x), min(width, x2 + margin_x)
+        cy1, cy2 = max(0, y1 - margin_y), min(height, y2 + margin_y)
+
+        # Origem do recorte no frame original e bbox relativa ao recorte
+        self.origin = (cx1, cy1)
+        bbox = np.array([x1 - cx1, y1 - cy1, x2 - cx1, y2 - cy1], dtype=np.int32)
+
+        crop = frame[cy1:cy2, cx1:cx2]
+        crop_width = cx2 - cx1
+        if crop_width > settings.WIDTH_RESIZE:
+            scale = settings.WIDTH_RESIZE / crop_width
+            crop = cv2.resize(
+                crop, (settings.WIDTH_RESIZE, max(1, int((cy2 - cy1) * scale)))
+            )
+            bbox = (bbox * scale).astype(np.int32)
+        else:
+            crop = crop.copy()
+
+        self.crop = crop
+        self.bbox = tuple(bbox.tolist())
+        self.thumbnail = thumbnail
+        self._crop_bytes: Optional[bytes] = None
+        self._lock = threading.Lock()
+
+    def encode(self) -> bytes:
+        """Codifica o recorte (apenas na primeira chamada)."""
+        with self._lock:
+            if self._crop_bytes is None:
+                self._crop_bytes = convert_frame_to_bytes(
+                    self.crop, settings.QUALITY_CONVERT
+                )
+                self.crop = None
+            return self._crop_bytes
+
+    def encode_thumbnail(self) -> Optional[bytes]:
+        """Miniatura do frame inteiro, se configurada (compartilhada pelo frame)."""
+        return self.thumbnail.encode() if self.thumbnail is not None else None
@@ -0,0 +1,274 @@
+"""
+Tabela de objetos rastreados de uma câmera em formato struct-of-arrays.
+
+Cada coluna (ids, bboxes, contadores, timestamps, maior área) é um array numpy
+e um dicionário mapeia track_id -> linha. Envelhecer os tracks ausentes e
+selecionar os expirados são operações vetorizadas sobre as colunas, sem
+percorrer dicionários em Python a cada frame.
+
+Os timestamps são guardados como float de time.monotonic() e convertidos para
+ISO apenas quando o evento é montado.
+
+A classe de cada track é decidida por uma votação incremental (contagem por
+classe, opcionalmente ponderada pela confiança), com memória constante por
+track independentemente de quanto tempo o objeto permanece visível.
+
+A imagem de cada track é uma referência ao snapshot do melhor frame candidato
+(FrameSnapshot ou CropSnapshot) e à bbox nesse frame; nada é codificado
+enquanto o objeto está visível.
+"""
+import datetime
+import threading
+import time
+import numpy as np
+from typing import Dict, Any, List, Optional
+
+# Número inicial de colunas da votação de classes (classes do COCO)
+DEFAULT_NUM_CLASSES = 80
+
+
+class TrackStore:
+    """Objetos rastreados de uma câmera (uma linha por track)."""
+
+    def __init__(self, capacity: int = 64, num_classes: int = DEFAULT_NUM_CLASSES):
+        self.size = 0
+        self.capacity = capacity
+        self.index: Dict[int, int] = {}
+        self.names: Dict[int, str] = {}
+
+        # Acesso compartilhado entre a thread da câmera e o envio de eventos
+        self.lock = threading.Lock()
+
+        # Referência para converter time.monotonic() em horário de parede
+        self._wall_offset = time.time() - time.monotonic()
+
+        self.track_ids = np.zeros(capacity, dtype=np.int64)
+        self.bboxes = np.zeros((capacity, 4), dtype=np.int32)
+        self.last_seen = np.zeros(capacity, dtype=np.int32)  # frames sem aparecer
+        self.first_seen = np.zeros(capacity, dtype=np.float64)
+        self.last_seen_time = np.zeros(capacity, dtype=np.float64)
+
+        # Melhor frame candidato (best-shot) de cada track
+        self.best_score = np.zeros(capacity, dtype=np.float32)
+        self.best_bboxes = np.zeros((capacity, 4), dtype=np.int32)
+        self.best_shots = np.empty(capacity, dtype=object)
+
+        # Votação de classes
+        self.class_votes = np.zeros((capacity, num_classes), dtype=np.float32)
+        self.vote_total = np.zeros(capacity, dtype=np.float32)
+        self.best_class = np.full(capacity, -1, dtype=np.int32)
+        self.best_votes = np.zeros(capacity, dtype=np.float32)
+        self.detection_count = np.zeros(capacity, dtype=np.int32)
+
+    _columns = (
+        "track_ids",
+        "bboxes",
+        "last_seen",
+        "first_seen",
+        "last_seen_time",
+        "best_score",
+        "best_bboxes",
+        "best_shots",
+        "class_votes",
+        "vote_total",
+        "best_class",
+        "best_votes",
+        "detection_count",
+    )
+
+    def __len__(self) -> int:
+        return self.size
+
+    def __contains__(self, track_id: int) -> bool:
+        return track_id in self.index
+
+    def _grow(self, needed: int) -> None:
+        new_capacity = self.capacity
+        while new_capacity < needed:
+            new_capacity *= 2
+
+        for name in self._columns:
+            column = getattr(self, name)
+            allocate = np.empty if column.dtype == object else np.zeros
+            grown = allocate((new_capacity,) + column.shape[1:], dtype=column.dtype)
+            grown[: self.size] = column[: self.size]
+            setattr(self, name, grown)
+
+        self.capacity = new_capacity
+
+    def _ensure_classes(self, num_classes: int) -> None:
+        """Amplia a tabela de votos se o modelo tiver mais classes que o previsto."""
+        current = self.class_votes.shape[1]
+        if num_classes <= current:
+            return
+
+        grown = np.zeros((self.capacity, num_classes), dtype=np.float32)
+        grown[:, :current] = self.class_votes
+        self.class_votes = grown
+
+    def to_iso(self, timestamp: float) -> str:
+        """Converte um timestamp monotônico da tabela para ISO."""
+        return datetime.datetime.fromtimestamp(timestamp + self._wall_offset).isoformat()
+
+    def update(
+        self,
+        track_ids: np.ndarray,
+        boxes: np.ndarray,
+        class_ids: np.ndarray,
+        confidences: np.ndarray,
+        names: Dict[int, str],
+        weighted_vote: bool = False,
+        now: Optional[float] = None,
+    ) -> np.ndarray:
+        """
+        Atualiza (ou cria) os tracks detectados no frame atual e contabiliza o
+        voto de classe de cada detecção (ponderado pela confiança se weighted_vote).
+
+        Retorna a linha de cada detecção na tabela.
+        """
+        now = time.monotonic() if now is None else now
+        count = len(track_ids)
+
+        with self.lock:
+            self.names = names
+            if count:
+                self._ensure_classes(int(class_ids.max()) + 1)
+
+            ids = track_ids.tolist()
+            rows = np.empty(count, dtype=np.int64)
+            is_new = np.zeros(count, dtype=bool)
+
+            for position, track_id in enumerate(ids):
+                row = self.index.get(track_id)
+                if row is None:
+                    is_new[position] = True
+                else:
+                    rows[position] = row
+
+            new_count = int(is_new.sum())
+            if new_count:
+                if self.size + new_count > self.capacity:
+                    self._grow(self.size + new_count)
+
+                new_rows = np.arange(self.size, self.size + new_count)
+                rows[is_new] = new_rows
+                for row, track_id in zip(new_rows.tolist(), track_ids[is_new].tolist()):
+                    self.index[track_id] = row
+
+                self.size += new_count
+                self.track_ids[new_rows] = track_ids[is_new]
+                self.first_seen[new_rows] = now
+                self.best_score[new_rows] = 0
+                self.best_shots[new_rows] = None
+                self.class_votes[new_rows] = 0
+                self.vote_total[new_rows] = 0
+                self.best_class[new_rows] = -1
+                self.best_votes[new_rows] = 0
+                self.detection_count[new_rows] = 0
+
+            self.bboxes[rows] = boxes
+            self.last_seen[rows] = 0
+            self.last_seen_time[rows] = now
+
+            # Votação incremental: O(1) por detecção
+            if weighted_vote:
+                weights = confidences.astype(np.float32)
+            else:
+                weights = np.ones(count, dtype=np.float32)
+
+            self.class_votes[rows, class_ids] += weights
+            self.vote_total[rows] += weights
+            self.detection_count[rows] += 1
+
+            votes = self.class_votes[rows, class_ids]
+            leader = votes > self.best_votes[rows]
+            self.best_votes[rows[leader]] = votes[leader]
+            self.best_class[rows[leader]] = class_ids[leader]
+
+        return rows
+
+    def set_best_shots(
+        self, rows: np.ndarray, scores: np.ndarray, boxes: np.ndarray, snapshot: Any
+    ) -> None:
+        """
+        Substitui o melhor frame candidato dos tracks indicados (mesma thread
+        que chamou update, com as linhas retornadas por ele). snapshot é um
+        único objeto compartilhado pelas linhas ou uma lista com um por linha.
+        """
+        with self.lock:
+            self.best_score[rows] = scores
+            self.best_bboxes[rows] = boxes
+            self.best_shots[rows] = snapshot
+
+    def touch(self, track_ids: np.ndarray, now: Optional[float] = None) -> np.ndarray:
+        """
+        Marca como vistos os tracks indicados que ainda estão na tabela, sem
+        contar uma nova detecção (frames pulados sem movimento na cena).
+        Retorna as linhas desses tracks.
+        """
+        now = time.monotonic() if now is None else now
+
+        with self.lock:
+            rows = np.array(
+                [self.index[track_id] for track_id in track_ids.tolist() if track_id in self.index],
+                dtype=np.int64,
+            )
+            self.last_seen[rows] = 0
+            self.last_seen_time[rows] = now
+
+        return rows
+
+    def age_missing(self, seen_rows: np.ndarray) -> None:
+        """Incrementa o contador de ausência de todos os tracks não vistos no frame."""
+        with self.lock:
+            missing = np.ones(self.size, dtype=bool)
+            missing[seen_rows] = False
+            self.last_seen[: self.size][missing] += 1
+
+    def pop_expired(self, max_missing_frames: int) -> List[Dict[str, Any]]:
+        """
+        Remove os tracks ausentes há max_missing_frames frames ou mais e retorna
+        os seus dados.
+        """
+        with self.lock:
+            expired = self.last_seen[: self.size] >= max_missing_frames
+            if not expired.any():
+                return []
+
+            disappeared_objects = []
+            for row in np.flatnonzero(expired).tolist():
+                best_class = int(self.best_class[row])
+                disappeared_objects.append(
+                    {
+                        "track_id": int(self.track_ids[row]),
+                        "class": self.names.get(best_class, str(best_class)),
+                        "last_bbox": tuple(self.bboxes[row].tolist()),
+                        "last_seen_time": self.to_iso(self.last_seen_time[row]),
+                        "first_seen": self.to_iso(self.first_seen[row]),
+                        "best_shot": self.best_shots[row],
+                        "best_shot_bbox": self.best_bboxes[row].copy(),
+                        "detection_count": int(self.detection_count[row]),
+                        "best_class_votes": float(self.best_votes[row]),
+                        "total_class_votes": float(self.vote_total[row]),
+                    }
+                )
+
+            self._remove(expired)
+
+        return disappeared_objects
+
+    def _remove(self, remove_mask: np.ndarray) -> None:
+        """Compacta a tabela removendo as linhas marcadas."""
+        keep = ~remove_mask
+        new_size = int(keep.sum())
+
+        for name in self._columns:
+            column = getattr(self, name)
+            column[:new_size] = column[: self.size][keep]
+            if column.dtype == object:
+                column[new_size : self.size] = None
+
+        self.size = new_size
+        self.index = {
+            track_id: row for row, track_id in enumerate(self.track_ids[:new_size].tolist())
+        }
@@ -0,0 +1,78 @@
+"""
+Rastreamento de objetos desacoplado da inferência.
+
+Cada câmera possui sua própria instância de tracker (BYTETrack/BoT-SORT do
+ultralytics, ou o tracker leve "kalman_iou"), alimentada apenas pelas
+detecções daquela câmera. Isso permite que um mesmo modelo atenda várias
+câmeras sem misturar os IDs dos objetos.
+"""
+import numpy as np
+from typing import Optional
+
+from ultralytics.engine.results import Boxes
+from ultralytics.trackers.bot_sort import BOTSORT
+from ultralytics.trackers.byte_tracker import BYTETracker
+from ultralytics.utils import IterableSimpleNamespace, yaml_load
+from ultralytics.utils.checks import check_yaml
+
+from app.core.kalman_tracker import KalmanIouTracker
+from app.utils.logging_utils import setup_logger
+
+logger = setup_logger("tracking")
+
+TRACKER_MAP = {"bytetrack": BYTETracker, "botsort": BOTSORT}
+# Trackers próprios, escolhidos pelo nome em tracker_model (sem YAML)
+BUILTIN_TRACKERS = {"kalman_iou": KalmanIouTracker}
+
+# Saída do tracker: x1, y1, x2, y2, track_id, confiança, classe, índice da detecção
+EMPTY_TRACKS = np.empty((0, 8), dtype=np.float32)
+
+
+def create_tracker(tracker_model: str, frame_rate: int = 30):
+    """
+    Cria uma instância de tracker a partir do YAML do ultralytics (ex: botsort.yaml)
+    ou pelo nome de um tracker próprio (ex: kalman_iou).
+    """
+    if tracker_model in BUILTIN_TRACKERS:
+        return BUILTIN_TRACKERS[tracker_model](frame_rate=frame_rate)
+
+    cfg = IterableSimpleNamespace(**yaml_load(check_yaml(tracker_model)))
+
+    if cfg.tracker_type not in TRACKER_MAP:
+        raise ValueError(
+            f"Tracker não suportado: '{cfg.tracker_type}' (use bytetrack ou botsort)"
+        )
+
+    return TRACKER_MAP[cfg.tracker_type](args=cfg, frame_rate=frame_rate)
+
+
+class CameraTracker:
+    """Tracker isolado de uma câmera."""
+
+    def __init__(self, tracker_model: str, frame_rate: int = 30):
+        self.tracker_model = tracker_model
+        self.tracker = create_tracker(tracker_model, frame_rate)
+        self.builtin = tracker_model in BUILTIN_TRACKERS
+
+    def update(self, detections: np.ndarray, frame: Optional[np.ndarray]) -> np.ndarray:
+        """
+        Atualiza o tracker com as detecções do frame (N x 6: x1, y1, x2, y2, conf, cls).
+        Deve ser chamado mesmo sem detecções, para envelhecer os tracks.
+        """
+        if detections is None or len(detections) == 0:
+            detections = np.empty((0, 6), dtype=np.float32)
+
+        if self.builtin:
+            return self.tracker.update(detections)
+
+        orig_shape = frame.shape[:2] if frame is not None else (0, 0)
+        tracks = self.tracker.update(Boxes(detections, orig_shape), frame)
+
+        if tracks is None or len(tracks) == 0:
+            return EMPTY_TRACKS
+
+        return np.asarray(tracks, dtype=np.float32)
+
+    def reset(self) -> None:
+        """Descarta todos os tracks ativos."""
+        self.tracker.reset()
@@ -0,0 +1,421 @@
+"""
+Lançamento dos processos de câmera a partir de um processo zygote.
+
+Com CAMERA_LAUNCHER=zygote, um processo dedicado importa uma única vez os
+módulos pesados (ultralytics, torch, OpenCV), carrega os pesos dos modelos,
+congela o GC (gc.freeze) e cria cada processo de câmera por fork a partir de
+si. Os filhos já nascem com tudo carregado e compartilham essas páginas por
+copy-on-write; como os objetos congelados ficam fora das gerações do GC, as
+coletas nos filhos não escrevem nos cabeçalhos deles e as páginas continuam
+compartilhadas.
+
+O zygote é criado (por fork da API) na primeira câmera, depois que o
+despachante de eventos e o servidor de inferência já estão rodando, e herda as
+filas deles. Pela conexão de comandos passam apenas objetos serializáveis (as
+configurações, a conexão de respostas do servidor de inferência e o
+CameraStatus); o canal de captura é criado pelo próprio zygote.
+
+A API recebe WorkerHandles, com a mesma interface de mp.Process usada pelo
+process_manager.
+"""
+import atexit
+import gc
+import multiprocessing as mp
+import os
+import signal
+import sys
+import threading
+import time
+from multiprocessing.connection import Connection
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.core.camera_status import CameraStatus
+from app.core.model_export import DEFAULT_IMGSZ
+from app.utils.logging_utils import setup_logger
+from app.utils.process_utils import process_memory
+from app.config import settings
+
+logger = setup_logger("worker_launcher")
+
+# Tempo máximo de espera pela conexão com o zygote (ex: dentro de um handler de sinal)
+LOCK_TIMEOUT = 5.0
+
+
+def _camera_worker_main(
+    camera_info_dict: dict,
+    stream_config_dict: dict,
+    stream_state: dict,
+    inference_channel,
+    capture_channel,
+    event_channel,
+    camera_status: CameraStatus,
+) -> None:
+    """Processo da câmera, criado por fork do zygote."""
+    from app.api.models.camera import CameraInfo, StreamConfig
+    from app.core.detection_service import process_camera_stream
+    from app.core.shared_state import active_streams
+
+    # Os handlers de sinal do zygote não valem para a câmera
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+    # O estado herdado do zygote é o da época em que ele foi criado
+    active_streams[camera_info_dict["camera_id"]] = stream_state
+
+    process_camera_stream(
+        CameraInfo(**camera_info_dict),
+        StreamConfig(**stream_config_dict),
+        inference_channel,
+        capture_channel,
+        event_channel,
+        camera_status,
+    )
+
+
+def _zygote_main(conn: Connection, parent_pid: int) -> None:
+    """
+    Processo zygote: carrega os módulos e modelos e atende os comandos da API
+    (preload, launch, poll, stop) até a API encerrar.
+    """
+    # Ctrl+C é tratado pela API, que encerra o zygote
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+
+    start = time.time()
+    from app.core import detection_service
+    from app.core.frame_capture import start_capture_process
+    from app.core.event_dispatcher import event_dispatcher
+    from app.core.inference_server import inference_server
+
+    gc.freeze()
+    logger.info(f"✓ Zygote pronto em {time.time() - start:.1f}s (PID: {os.getpid()})")
+
+    children: Dict[int, mp.Process] = {}
+    loaded_models = set()
+
+    def preload(model_path: str, backend: str, imgsz: int) -> None:
+        if (model_path, backend, imgsz) in loaded_models:
+            return
+        detection_service.get_or_load_model(model_path, backend, imgsz)
+        loaded_models.add((model_path, backend, imgsz))
+        # Os pesos passam para a geração permanente antes dos próximos forks
+        gc.freeze()
+
+    def launch(
+        camera_info_dict: dict,
+        stream_config_dict: dict,
+        stream_state: dict,
+        inference_worker: Optional[int],
+        response_conn: Optional[Connection],
+        camera_status: CameraStatus,
+    ) -> List[Tuple[str, int]]:
+        cam_id = camera_info_dict["camera_id"]
+
+        if response_conn is None:
+            preload(
+                stream_config_dict["detection_model_path"],
+                stream_config_dict["inference_backend"],
+                stream_config_dict["inference_size"],
+            )
+
+        helpers = []
+        capture_channel = None
+        if settings.CAPTURE_MODE == "process":
+            capture_process, capture_channel = start_capture_process(
+                cam_id, camera_info_dict["url"], stream_config_dict["frames_per_second"]
+            )
+            helpers.append(capture_process)
+
+        inference_channel = None
+        if response_conn is not None:
+            request_queue = inference_server.workers[inference_worker]["request_queue"]
+            inference_channel = (request_queue, response_conn)
+
+        process = mp.Process(
+            target=_camera_worker_main,
+            args=(
+                camera_info_dict,
+                stream_config_dict,
+                stream_state,
+                inference_channel,
+                capture_channel,
+                (event_dispatcher.event_queue, event_dispatcher.stats),
+                camera_status,
+            ),
+            daemon=True,
+            name=f"camera_{cam_id}",
+        )
+        process.start()
+
+        # As cópias do zygote não são mais necessárias
+        if response_conn is not None:
+            response_conn.close()
+        camera_status.close()
+
+        launched = [process] + helpers
+        for child in launched:
+            children[child.pid] = child
+        return [(child.name, child.pid) for child in launched]
+
+    def poll(pids: List[int]) -> Dict[int, Tuple[bool, Optional[int]]]:
+        result = {}
+        for pid in pids:
+            child = children.get(pid)
+            result[pid] = (False, None) if child is None else (child.is_alive(), child.exitcode)
+        return result
+
+    commands = {"preload": preload, "launch": launch, "poll": poll}
+
+    try:
+        while os.getppid() == parent_pid:
+            if not conn.poll(0.5):
+                # Recolhe os filhos que terminaram
+                mp.active_children()
+                continue
+
+            try:
+                command, *args = conn.recv()
+            except EOFError:
+                break
+
+            if command == "stop":
+                break
+
+            try:
+                conn.send(("ok", commands[command](*args)))
+            except Exception as e:
+                logger.error(f"Zygote: erro no comando {command}: {e}")
+                conn.send(("error", str(e)))
+    finally:
+        for child in children.values():
+            if child.is_alive():
+                child.terminate()
+        for child in children.values():
+            child.join(timeout=5)
+        logger.info("Zygote encerrado")
+
+
+class WorkerHandle:
+    """
+    Processo criado pelo zygote. Expõe a parte da interface de mp.Process
+    usada pelo process_manager.
+    """
+
+    def __init__(self, launcher: "ZygoteLauncher", name: str, pid: int):
+        self._launcher = launcher
+        self.name = name
+        self.pid = pid
+        # (vivo, código de saída) depois que o processo termina: evita novas
+        # consultas ao zygote
+        self._exit_status: Optional[Tuple[bool, Optional[int]]] = None
+
+    def _poll(self) -> Tuple[bool, Optional[int]]:
+        if self._exit_status is not None:
+            return self._exit_status
+        status = self._launcher.poll(self.pid)
+        if not status[0]:
+            self._exit_status = status
+        return status
+
+    def is_alive(self) -> bool:
+        return self._poll()[0]
+
+    @property
+    def exitcode(self) -> Optional[int]:
+        return self._poll()[1]
+
+    def _signal(self, signum: int) -> None:
+        try:
+            os.kill(self.pid, signum)
+        except ProcessLookupError:
+            pass
+
+    def terminate(self) -> None:
+        self._signal(signal.SIGTERM)
+
+    def kill(self) -> None:
+        self._signal(signal.SIGKILL)
+
+    def join(self, timeout: Optional[float] = None) -> None:
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while self.is_alive():
+            if deadline is not None and time.monotonic() >= deadline:
+                return
+            time.sleep(0.05)
+
+
+class ZygoteLauncher:
+    """Gerencia o processo zygote e o lançamento das câmeras a partir dele."""
+
+    def __init__(self):
+        self.process: Optional[mp.Process] = None
+        self._conn: Optional[Connection] = None
+        self._lock = threading.Lock()
+        # Filas da API herdadas pelo zygote quando foi criado
+        self._event_queue = None
+        self._request_queues: List[Any] = []
+        atexit.register(self.stop)
+
+    @staticmethod
+    def _shared_queues() -> Tuple[Any, List[Any]]:
+        """Filas do despachante e do servidor de inferência atualmente em uso."""
+        from app.core.event_dispatcher import event_dispatcher
+
+        request_queues = []
+        if settings.INFERENCE_SERVER:
+            from app.core.inference_server import inference_server
+
+            request_queues = [worker["request_queue"] for worker in inference_server.workers]
+        return event_dispatcher.event_queue, request_queues
+
+    def start(self) -> None:
+        """Cria o zygote, se ainda não estiver rodando."""
+        with self._lock:
+            if self.process is not None and self.process.is_alive():
+                return
+
+            # O zygote herda as filas: elas precisam existir antes do fork
+            from app.core.event_dispatcher import event_dispatcher
+
+            event_dispatcher.start()
+            if settings.INFERENCE_SERVER:
+                from app.core.inference_server import inference_server
+
+                inference_server.start()
+
+            parent_conn, child_conn = mp.Pipe()
+            # Não daemônico: o zygote cria os processos das câmeras
+            self.process = mp.Process(
+                target=_zygote_main,
+                args=(child_conn, os.getpid()),
+                name="camera_zygote",
+            )
+            self.process.start()
+            child_conn.close()
+
+            self._conn = parent_conn
+            self._event_queue, self._request_queues = self._shared_queues()
+            logger.info(f"✓ Zygote de câmeras iniciado (PID: {self.process.pid})")
+
+    def _request(self, command: str, *args) -> Any:
+        if not self._lock.acquire(timeout=LOCK_TIMEOUT):
+            raise RuntimeError("Zygote ocupado")
+        try:
+            if self._conn is None:
+                raise RuntimeError("Zygote não iniciado")
+            self._conn.send((command,) + args)
+            # Os filhos herdam a ponta do zygote: se ele morrer não há EOF
+            while not self._conn.poll(0.5):
+                if not self.process.is_alive():
+                    raise EOFError("processo encerrado")
+            status, reply = self._conn.recv()
+        except (EOFError, OSError) as e:
+            raise RuntimeError(f"Zygote indisponível: {e}")
+        finally:
+            self._lock.release()
+
+        if status == "error":
+            raise RuntimeError(reply)
+        return reply
+
+    def preload(
+        self, model_path: str, backend: str = "pytorch", imgsz: int = DEFAULT_IMGSZ
+    ) -> None:
+        """Carrega o modelo no zygote, para ser herdado pelas próximas câmeras."""
+        self.start()
+        self._request("preload", model_path, backend, imgsz)
+
+    def launch(
+        self,
+        camera_info_dict: dict,
+        stream_config_dict: dict,
+        inference_channel: Optional[tuple],
+        camera_status: CameraStatus,
+    ) -> Optional[Tuple[WorkerHandle, List[WorkerHandle]]]:
+        """
+        Cria o processo da câmera (e o de captura, se CAPTURE_MODE=process) a
+        partir do zygote. Retorna (processo, auxiliares), ou None se as filas
+        herdadas pelo zygote não forem mais as atuais (ex: despachante
+        reiniciado); nesse caso a câmera deve ser criada diretamente pela API.
+        """
+        self.start()
+
+        event_queue, request_queues = self._shared_queues()
+        inference_worker = response_conn = None
+        if inference_channel is not None:
+            request_queue, response_conn = inference_channel
+            inference_worker = next(
+                (
+                    index
+                    for index, inherited in enumerate(self._request_queues)
+                    if inherited is request_queue
+                ),
+                None,
+            )
+
+        if event_queue is not self._event_queue or (
+            inference_channel is not None and inference_worker is None
+        ):
+            logger.warning(
+                "Zygote com filas desatualizadas: câmera será criada diretamente pela API"
+            )
+            return None
+
+        from app.core.shared_state import active_streams
+
+        stream_state = active_streams.get(camera_info_dict["camera_id"], {"active": True})
+        launched = self._request(
+            "launch",
+            camera_info_dict,
+            stream_config_dict,
+            stream_state,
+            inference_worker,
+            response_conn,
+            camera_status,
+        )
+        handles = [WorkerHandle(self, name, pid) for name, pid in launched]
+        return handles[0], handles[1:]
+
+    def poll(self, pid: int) -> Tuple[bool, Optional[int]]:
+        """(vivo, código de saída) de um processo criado pelo zygote."""
+        try:
+            return tuple(self._request("poll", [pid])[pid])
+        except RuntimeError:
+            # Sem o zygote não há código de saída; verifica direto no /proc
+            return os.path.exists(f"/proc/{pid}"), None
+
+    def stop(self) -> None:
+        """Encerra o zygote (e as câmeras criadas por ele)."""
+        if self.process is None:
+            return
+
+        if self._lock.acquire(timeout=LOCK_TIMEOUT):
+            try:
+                self._conn.send(("stop",))
+            except (OSError, ValueError):
+                pass
+            finally:
+                self._lock.release()
+
+        self.process.join(timeout=10)
+        if self.process.is_alive():
+            self.process.kill()
+            self.process.join()
+
+        self._conn.close()
+        self._conn = None
+        self.process = None
+
+    def get_info(self) -> Dict[str, Any]:
+        if self.process is None:
+            return {"alive": False}
+
+        return {
+            "pid": self.process.pid,
+            "alive": self.process.is_alive(),
+            "memory": process_memory(self.process.pid),
+        }
+
+
+# Instância global do lançador (o zygote é criado na primeira câmera)
+camera_launcher = ZygoteLauncher()
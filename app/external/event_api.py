@@ -1,40 +1,82 @@
 import requests
-from typing import Dict, Any, Optional
+from requests.adapters import HTTPAdapter
+from typing import Dict, Any, List, Optional
 import logging
 from app.utils.logging_utils import setup_logger
 from app.api.models.event import Event
+from app.external.event_codec import CONTENT_TYPE, encode_event, encode_batch
 from app.config import settings
 
 logger = setup_logger("event_api")
 
+# Resultado do envio de um lote
+BATCH_DELIVERED = "delivered"
+BATCH_RETRY = "retry"  # falha transitória: conexão, timeout ou 5xx
+BATCH_REJECTED = "rejected"  # recusa permanente (4xx): reenviar não adianta
+
+# Códigos 4xx que indicam falha transitória
+RETRIABLE_STATUS = {408, 429}
+
+# Sessão com keep-alive para os envios diretos (sem o despachante)
+_session: Optional[requests.Session] = None
+
+
+def create_session(pool_size: int = 4) -> requests.Session:
+    """
+    Cria uma sessão HTTP com pool de conexões persistentes (keep-alive).
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def _get_session() -> requests.Session:
+    global _session
+    if _session is None:
+        _session = create_session()
+    return _session
+
+
+def build_event_payload(event: Event, latencia, fps) -> Dict[str, Any]:
+    """
+    Monta o evento a ser codificado por encode_event (imagens em bytes crus).
+    """
+    event_dict = {
+        "camera_id": event.camera_id,
+        "start": event.start,
+        "end": event.end,
+        "event_type": event.event_type,
+        "tag": event.tag,
+        "coord_initial": event.coord_initial,
+        "coord_end": event.coord_end,
+        "latency": latencia,
+        "fps": fps,
+        "print": event.print,
+    }
+
+    # Modo crop: coordenadas relativas ao recorte e miniatura opcional do frame
+    if event.crop_origin is not None:
+        event_dict["crop_origin"] = event.crop_origin
+    if event.thumbnail:
+        event_dict["thumbnail"] = event.thumbnail
+
+    return event_dict
+
 
 def send_event(event: Event, latencia, fps) -> bool:
     """
     Envia o evento para o endpoint de eventos.
     """
-    try:
-        event_viewer_url = settings.SEND_EVENT_URL
+    event_dict = build_event_payload(event, latencia, fps)
 
-        if isinstance(event.print, bytes):
-            print_hex = event.print.hex()
-        else:
-            print_hex = event.print
-
-        event_dict = {
-            "camera_id": event.camera_id,
-            "start": event.start,
-            "end": event.end,
-            "event_type": event.event_type,
-            "tag": event.tag,
-            "coord_initial": event.coord_initial,
-            "coord_end": event.coord_end,
-            "latency": latencia,
-            "fps": fps,
-            # "print": print_hex,
-        }
-
-        response = requests.post(
-            event_viewer_url, json=event_dict, timeout=settings.SEND_EVENT_TIMEOUT
+    try:
+        response = _get_session().post(
+            settings.SEND_EVENT_URL,
+            data=encode_event(event_dict),
+            headers={"Content-Type": CONTENT_TYPE},
+            timeout=settings.SEND_EVENT_TIMEOUT,
         )
 
         if response.status_code == 200:
@@ -69,3 +111,40 @@ def send_event(event: Event, latencia, fps) -> bool:
         # logger.error(f"Erro geral ao enviar evento para o visualizador: {e}")
 
     return False
+
+
+def send_event_batch(
+    records: List[bytes], session: Optional[requests.Session] = None
+) -> str:
+    """
+    Envia vários eventos (já codificados por encode_event) em uma única
+    requisição para o endpoint de lote.
+    Retorna BATCH_DELIVERED, BATCH_RETRY (falha transitória, o lote pode ser
+    reenviado) ou BATCH_REJECTED (o receptor recusou o lote).
+    """
+    session = session or _get_session()
+
+    try:
+        response = session.post(
+            settings.SEND_EVENT_BATCH_URL,
+            data=encode_batch(records),
+            headers={"Content-Type": CONTENT_TYPE},
+            timeout=settings.SEND_EVENT_TIMEOUT,
+        )
+
+        if response.status_code == 200:
+            logger.info(f"Lote de {len(records)} eventos enviado")
+            return BATCH_DELIVERED
+
+        logger.error(
+            f"Falha ao enviar lote de {len(records)} eventos. "
+            f"Código de status: {response.status_code}"
+        )
+        if 400 <= response.status_code < 500 and response.status_code not in RETRIABLE_STATUS:
+            return BATCH_REJECTED
+    except requests.exceptions.Timeout:
+        logger.error(f"Timeout ao enviar lote de {len(records)} eventos")
+    except requests.exceptions.RequestException as e:
+        logger.error(f"Erro de requisição ao enviar lote de {len(records)} eventos: {e}")
+
+    return BATCH_RETRY
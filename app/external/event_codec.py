@@ -0,0 +1,93 @@
+"""
+Formato binário de transporte dos eventos.
+
+Cada evento é um registro com prefixo de tamanho:
+
+    [tamanho metadados: u32][tamanho print: u32][tamanho miniatura: u32]
+    [metadados JSON][bytes do print][bytes da miniatura]
+
+Os metadados são serializados com orjson (ou json da biblioteca padrão, se
+orjson não estiver instalado) e as imagens JPEG vão como bytes crus, sem hex.
+Um lote é apenas a concatenação dos registros, enviada com CONTENT_TYPE.
+O decodificador equivalente do visualizador está em event_viewer_demo/main.py.
+"""
+import struct
+from typing import Any, Dict, Iterable, List
+
+try:
+    import orjson
+
+    def _dumps(data: Dict[str, Any]) -> bytes:
+        return orjson.dumps(data)
+
+    _loads = orjson.loads
+except ImportError:
+    import json
+
+    def _dumps(data: Dict[str, Any]) -> bytes:
+        return json.dumps(data, separators=(",", ":")).encode()
+
+    _loads = json.loads
+
+CONTENT_TYPE = "application/x-nuv-events"
+
+RECORD_HEADER = struct.Struct(">III")
+
+# Campos binários, transportados fora dos metadados
+BINARY_FIELDS = ("print", "thumbnail")
+
+
+def encode_event(event_dict: Dict[str, Any]) -> bytes:
+    """Codifica um evento (com print/thumbnail em bytes) em um registro."""
+    metadata = {
+        key: value for key, value in event_dict.items() if key not in BINARY_FIELDS
+    }
+    metadata_bytes = _dumps(metadata)
+    print_bytes = event_dict.get("print") or b""
+    thumbnail_bytes = event_dict.get("thumbnail") or b""
+
+    return b"".join(
+        (
+            RECORD_HEADER.pack(
+                len(metadata_bytes), len(print_bytes), len(thumbnail_bytes)
+            ),
+            metadata_bytes,
+            print_bytes,
+            thumbnail_bytes,
+        )
+    )
+
+
+def encode_batch(records: Iterable[bytes]) -> bytes:
+    """Corpo de uma requisição com vários registros."""
+    return b"".join(records)
+
+
+def decode_events(body: bytes) -> List[Dict[str, Any]]:
+    """Decodifica um corpo com um ou mais registros."""
+    events = []
+    view = memoryview(body)
+    offset = 0
+
+    while offset < len(body):
+        if offset + RECORD_HEADER.size > len(body):
+            raise ValueError("Registro de evento truncado")
+        metadata_size, print_size, thumbnail_size = RECORD_HEADER.unpack_from(
+            body, offset
+        )
+        offset += RECORD_HEADER.size
+        end = offset + metadata_size + print_size + thumbnail_size
+        if end > len(body):
+            raise ValueError("Registro de evento truncado")
+
+        event = _loads(view[offset : offset + metadata_size].tobytes())
+        offset += metadata_size
+        event["print"] = view[offset : offset + print_size].tobytes()
+        offset += print_size
+        event["thumbnail"] = (
+            view[offset : offset + thumbnail_size].tobytes() if thumbnail_size else None
+        )
+        offset = end
+        events.append(event)
+
+    return events
@@ -3,27 +3,20 @@ import numpy as np
 import asyncio
 from typing import Tuple, Optional
 from app.utils.logging_utils import setup_logger
+from app.utils.jpeg_encoders import get_default_encoder
 
 logger = setup_logger("image_utils")
 
 
 def convert_frame_to_bytes(frame: np.ndarray, quality) -> bytes:
     """
-    Conversão com qualidade configurável
+    Conversão com qualidade configurável, usando o codificador JPEG do deployment
     """
     if frame is None or frame.size == 0:
         raise ValueError("Frame inválido")
 
-    encode_params = [
-        int(cv2.IMWRITE_JPEG_QUALITY),
-        quality,
-    ]
-
     try:
-        success, encoded_image = cv2.imencode(".jpg", frame, encode_params)
-        if not success:
-            raise ValueError("Falha ao codificar")
-        return encoded_image.tobytes()
+        return get_default_encoder().encode(frame, quality)
     except Exception as e:
         logger.error(f"Erro ao converter frame: {e}")
         raise
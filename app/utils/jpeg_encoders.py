@@ -0,0 +1,174 @@
+"""
+Codificadores JPEG intercambiáveis.
+
+Backends disponíveis:
+    - opencv: cv2.imencode (sempre disponível)
+    - turbojpeg: libjpeg-turbo via PyTurboJPEG (opcional)
+    - simplejpeg: libjpeg-turbo via simplejpeg (opcional)
+
+O backend é escolhido por deployment (JPEG_ENCODER). Se o backend pedido não
+estiver instalado, o próximo disponível é usado ("auto" escolhe o mais rápido).
+O preset rápido (JPEG_FAST_PRESET) usa subamostragem 4:2:0 e qualidade
+limitada a FAST_PRESET_MAX_QUALITY; a DCT rápida só existe nos backends sobre
+libjpeg-turbo (turbojpeg e simplejpeg), pois cv2.imencode não a expõe.
+"""
+import cv2
+import numpy as np
+from typing import Dict, List, Optional, Type
+
+from app.utils.logging_utils import setup_logger
+
+logger = setup_logger("jpeg_encoders")
+
+FAST_PRESET_MAX_QUALITY = 60
+
+# Ordem de preferência para o modo "auto" e para fallback
+AUTO_ORDER = ["turbojpeg", "simplejpeg", "opencv"]
+
+
+class JpegEncoder:
+    """Interface dos codificadores JPEG."""
+
+    name = "base"
+
+    def __init__(self, fast: bool = False):
+        self.fast = fast
+
+    def _quality(self, quality: int) -> int:
+        return min(quality, FAST_PRESET_MAX_QUALITY) if self.fast else quality
+
+    def encode(self, frame: np.ndarray, quality: int) -> bytes:
+        raise NotImplementedError
+
+
+class OpenCVEncoder(JpegEncoder):
+    """cv2.imencode (sem DCT rápida: o preset rápido só muda subamostragem e qualidade)."""
+
+    name = "opencv"
+
+    def encode(self, frame: np.ndarray, quality: int) -> bytes:
+        encode_params = [int(cv2.IMWRITE_JPEG_QUALITY), self._quality(quality)]
+
+        if self.fast:
+            encode_params += [int(cv2.IMWRITE_JPEG_OPTIMIZE), 0]
+            if hasattr(cv2, "IMWRITE_JPEG_SAMPLING_FACTOR"):
+                encode_params += [
+                    int(cv2.IMWRITE_JPEG_SAMPLING_FACTOR),
+                    int(cv2.IMWRITE_JPEG_SAMPLING_FACTOR_420),
+                ]
+
+        success, encoded_image = cv2.imencode(".jpg", frame, encode_params)
+        if not success:
+            raise ValueError("Falha ao codificar")
+        return encoded_image.tobytes()
+
+
+class TurboJpegEncoder(JpegEncoder):
+    """libjpeg-turbo via PyTurboJPEG."""
+
+    name = "turbojpeg"
+
+    def __init__(self, fast: bool = False):
+        super().__init__(fast)
+        import turbojpeg
+
+        self._turbojpeg = turbojpeg
+        self._encoder = turbojpeg.TurboJPEG()
+
+    def encode(self, frame: np.ndarray, quality: int) -> bytes:
+        flags = self._turbojpeg.TJFLAG_FASTDCT if self.fast else 0
+        return self._encoder.encode(
+            frame,
+            quality=self._quality(quality),
+            pixel_format=self._turbojpeg.TJPF_BGR,
+            jpeg_subsample=self._turbojpeg.TJSAMP_420,
+            flags=flags,
+        )
+
+
+class SimpleJpegEncoder(JpegEncoder):
+    """libjpeg-turbo via simplejpeg."""
+
+    name = "simplejpeg"
+
+    def __init__(self, fast: bool = False):
+        super().__init__(fast)
+        import simplejpeg
+
+        self._simplejpeg = simplejpeg
+
+    def encode(self, frame: np.ndarray, quality: int) -> bytes:
+        return self._simplejpeg.encode_jpeg(
+            np.ascontiguousarray(frame),
+            quality=self._quality(quality),
+            colorspace="BGR",
+            colorsubsampling="420",
+            fastdct=self.fast,
+        )
+
+
+ENCODER_BACKENDS: Dict[str, Type[JpegEncoder]] = {
+    "opencv": OpenCVEncoder,
+    "turbojpeg": TurboJpegEncoder,
+    "simplejpeg": SimpleJpegEncoder,
+}
+
+
+def available_backends() -> List[str]:
+    """Backends que podem ser carregados neste ambiente."""
+    available = []
+    for name in AUTO_ORDER:
+        try:
+            ENCODER_BACKENDS[name]()
+            available.append(name)
+        except Exception:
+            continue
+    return available
+
+
+def create_jpeg_encoder(name: str = "auto", fast: bool = False) -> JpegEncoder:
+    """
+    Cria o codificador pedido, usando o próximo backend disponível se ele
+    não puder ser carregado.
+    """
+    name = (name or "auto").strip().lower()
+
+    if name != "auto" and name not in ENCODER_BACKENDS:
+        logger.warning(f"Codificador JPEG desconhecido '{name}', usando 'auto'")
+        name = "auto"
+
+    candidates = AUTO_ORDER if name == "auto" else [name] + [
+        backend for backend in AUTO_ORDER if backend != name
+    ]
+
+    for backend in candidates:
+        try:
+            encoder = ENCODER_BACKENDS[backend](fast=fast)
+        except Exception as e:
+            if backend == name:
+                logger.warning(
+                    f"Codificador JPEG '{backend}' indisponível ({e}), usando fallback"
+                )
+            continue
+
+        logger.info(
+            f"Codificador JPEG: {encoder.name}{' (preset rápido)' if fast else ''}"
+        )
+        return encoder
+
+    raise RuntimeError("Nenhum codificador JPEG disponível")
+
+
+_default_encoder: Optional[JpegEncoder] = None
+
+
+def get_default_encoder() -> JpegEncoder:
+    """Codificador configurado para o deployment (JPEG_ENCODER, JPEG_FAST_PRESET)."""
+    global _default_encoder
+    if _default_encoder is None:
+        from app.config import settings
+
+        _default_encoder = create_jpeg_encoder(
+            settings.JPEG_ENCODER, settings.JPEG_FAST_PRESET
+        )
+    return _default_encoder
@@ -0,0 +1,46 @@
+"""
+Informações de processos lidas do /proc (Linux).
+"""
+from typing import Dict, Optional
+
+# Campos do smaps_rollup somados em cada métrica (valores em kB)
+_MEMORY_FIELDS = {
+    "rss_mb": ("Rss",),
+    "pss_mb": ("Pss",),
+    "shared_mb": ("Shared_Clean", "Shared_Dirty"),
+    "private_mb": ("Private_Clean", "Private_Dirty"),
+}
+
+
+def process_memory(pid: Optional[int]) -> Optional[Dict[str, float]]:
+    """
+    Memória do processo em MB. Além do RSS, retorna o PSS (memória compartilhada
+    dividida entre os processos que a usam), que soma corretamente entre
+    processos criados por fork, e as parcelas compartilhada e privada.
+    Retorna None se o processo não existir ou o /proc não estiver disponível.
+    """
+    if pid is None:
+        return None
+
+    values: Dict[str, int] = {}
+    try:
+        with open(f"/proc/{pid}/smaps_rollup") as f:
+            for line in f:
+                parts = line.split()
+                if len(parts) >= 2 and parts[0].endswith(":"):
+                    values[parts[0][:-1]] = int(parts[1])
+    except (OSError, ValueError):
+        # Kernels sem smaps_rollup: apenas o RSS
+        try:
+            with open(f"/proc/{pid}/status") as f:
+                for line in f:
+                    if line.startswith("VmRSS:"):
+                        return {"rss_mb": round(int(line.split()[1]) / 1024, 1)}
+        except (OSError, ValueError):
+            pass
+        return None
+
+    return {
+        metric: round(sum(values.get(field, 0) for field in fields) / 1024, 1)
+        for metric, fields in _MEMORY_FIELDS.items()
+    }
@@ -8,10 +8,18 @@ import uvicorn
 import os
 import uuid
 import base64
+import json
+import struct
 from datetime import datetime
 import logging
 from PIL import Image, ImageDraw
 
+try:
+    import orjson
+    json_loads = orjson.loads
+except ImportError:
+    json_loads = json.loads
+
 # Configuração de logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -39,7 +47,60 @@ class EventReceive(BaseModel):
     tag: str  # classe do objeto (carro, pessoa, etc)
     coord_initial: Tuple[int, int]
     coord_end: Tuple[int, int]
-    print: str  # imagem codificada em hexadecimal
+    print: bytes  # imagem JPEG
+    # Presentes quando o print é apenas o recorte do objeto (coordenadas relativas ao recorte)
+    crop_origin: Optional[Tuple[int, int]] = None
+    thumbnail: Optional[bytes] = None  # miniatura JPEG do frame inteiro
+
+# Formato binário enviado pelo despachante (ver app/external/event_codec.py):
+# [u32 metadados][u32 print][u32 miniatura][metadados JSON][print][miniatura]
+EVENTS_CONTENT_TYPE = "application/x-nuv-events"
+RECORD_HEADER = struct.Struct(">III")
+
+def decode_events(body: bytes) -> List[Dict[str, Any]]:
+    """
+    Decodifica um corpo com um ou mais registros binários de eventos.
+    """
+    events = []
+    offset = 0
+    while offset < len(body):
+        if offset + RECORD_HEADER.size > len(body):
+            raise ValueError("Registro de evento truncado")
+        metadata_size, print_size, thumbnail_size = RECORD_HEADER.unpack_from(body, offset)
+        offset += RECORD_HEADER.size
+        end = offset + metadata_size + print_size + thumbnail_size
+        if end > len(body):
+            raise ValueError("Registro de evento truncado")
+
+        event = json_loads(body[offset:offset + metadata_size])
+        offset += metadata_size
+        event["print"] = body[offset:offset + print_size]
+        offset += print_size
+        event["thumbnail"] = body[offset:end] if thumbnail_size else None
+        offset = end
+        events.append(event)
+    return events
+
+async def parse_events(request: Request) -> List[EventReceive]:
+    """
+    Lê os eventos da requisição: registros binários ou JSON com imagens em
+    hexadecimal (um evento ou {"events": [...]}).
+    """
+    body = await request.body()
+    try:
+        if request.headers.get("content-type", "").startswith(EVENTS_CONTENT_TYPE):
+            raw_events = decode_events(body)
+        else:
+            data = json_loads(body)
+            raw_events = data["events"] if "events" in data else [data]
+            for raw_event in raw_events:
+                raw_event["print"] = bytes.fromhex(raw_event["print"])
+                if raw_event.get("thumbnail"):
+                    raw_event["thumbnail"] = bytes.fromhex(raw_event["thumbnail"])
+        return [EventReceive(**raw_event) for raw_event in raw_events]
+    except Exception as e:
+        logger.error(f"Requisição de eventos inválida: {e}")
+        raise HTTPException(status_code=422, detail=str(e))
 
 # Armazenamento em memória para eventos (em produção, use um banco de dados)
 events_storage = {}
@@ -135,78 +196,116 @@ def draw_bounding_box(image_bytes, coord_initial, coord_end, tag):
         # Retornar a imagem original se houver erro
         return image_bytes
 
+def store_event(event: EventReceive) -> str:
+    """
+    Salva as imagens do evento e o armazena. Retorna o ID gerado.
+    """
+    # Gerar ID único para o evento
+    event_id = str(uuid.uuid4())
+
+    image_bytes = event.print
+
+    # 1. Salvar imagem recortada (apenas o objeto) em cropped_images/
+    cropped_path = crop_and_save_object(
+        image_bytes,
+        event.coord_initial,
+        event.coord_end,
+        event_id
+    )
+
+    # 2. Desenhar a bounding box na imagem completa
+    image_with_bbox = draw_bounding_box(
+        image_bytes, 
+        event.coord_initial, 
+        event.coord_end, 
+        event.tag
+    )
+
+    # 3. Salvar a imagem completa com a bounding box em images/
+    image_path = f"static/images/{event_id}.jpg"
+    with open(image_path, "wb") as img_file:
+        img_file.write(image_with_bbox)
+
+    # 4. Salvar a miniatura do frame inteiro, se enviada
+    thumbnail_path = None
+    if event.thumbnail:
+        thumbnail_path = f"static/images/{event_id}_thumb.jpg"
+        with open(thumbnail_path, "wb") as thumb_file:
+            thumb_file.write(event.thumbnail)
+
+    # Criar timestamp legível
+    try:
+        start_dt = datetime.fromisoformat(event.start)
+        end_dt = datetime.fromisoformat(event.end)
+        start_formatted = start_dt.strftime("%d/%m/%Y %H:%M:%S")
+        end_formatted = end_dt.strftime("%d/%m/%Y %H:%M:%S")
+        duration = (end_dt - start_dt).total_seconds()
+    except ValueError:
+        # Fallback se não conseguir parsear a data
+        start_formatted = event.start
+        end_formatted = event.end
+        duration = 0
+
+    # Armazenar evento com informações adicionais
+    events_storage[event_id] = {
+        "id": event_id,
+        "camera_id": event.camera_id,
+        "start": start_formatted,
+        "end": end_formatted,
+        "event_type": event.event_type,
+        "tag": event.tag,
+        "duration": f"{duration:.2f} segundos",
+        "coord_initial": event.coord_initial,
+        "coord_end": event.coord_end,
+        "image_path": image_path,
+        "cropped_path": cropped_path,  # Caminho da imagem recortada
+        "thumbnail_path": thumbnail_path,  # Miniatura do frame (modo crop)
+        "crop_origin": event.crop_origin,
+        "timestamp": datetime.now().strftime("%d/%m/%Y %H:%M:%S"),
+    }
+
+    logger.info(f"Evento recebido e armazenado com ID: {event_id}")
+    logger.info(f"Imagem completa: {image_path}")
+    logger.info(f"Imagem recortada: {cropped_path}")
+
+    return event_id
+
 @app.post("/events/receive")
-async def receive_event(event: EventReceive):
+async def receive_event(request: Request):
     """
     Endpoint para receber eventos do sistema de detecção de objetos.
     """
+    events = await parse_events(request)
+    if len(events) != 1:
+        raise HTTPException(status_code=422, detail="Esperado exatamente um evento")
+
     try:
-        # Gerar ID único para o evento
-        event_id = str(uuid.uuid4())
-        
-        # Converter hexadecimal para bytes
-        image_bytes = bytes.fromhex(event.print)
-        
-        # 1. Salvar imagem recortada (apenas o objeto) em cropped_images/
-        cropped_path = crop_and_save_object(
-            image_bytes,
-            event.coord_initial,
-            event.coord_end,
-            event_id
-        )
-        
-        # 2. Desenhar a bounding box na imagem completa
-        image_with_bbox = draw_bounding_box(
-            image_bytes, 
-            event.coord_initial, 
-            event.coord_end, 
-            event.tag
-        )
-        
-        # 3. Salvar a imagem completa com a bounding box em images/
-        image_path = f"static/images/{event_id}.jpg"
-        with open(image_path, "wb") as img_file:
-            img_file.write(image_with_bbox)
-        
-        # Criar timestamp legível
-        try:
-            start_dt = datetime.fromisoformat(event.start)
-            end_dt = datetime.fromisoformat(event.end)
-            start_formatted = start_dt.strftime("%d/%m/%Y %H:%M:%S")
-            end_formatted = end_dt.strftime("%d/%m/%Y %H:%M:%S")
-            duration = (end_dt - start_dt).total_seconds()
-        except ValueError:
-            # Fallback se não conseguir parsear a data
-            start_formatted = event.start
-            end_formatted = event.end
-            duration = 0
-        
-        # Armazenar evento com informações adicionais
-        events_storage[event_id] = {
-            "id": event_id,
-            "camera_id": event.camera_id,
-            "start": start_formatted,
-            "end": end_formatted,
-            "event_type": event.event_type,
-            "tag": event.tag,
-            "duration": f"{duration:.2f} segundos",
-            "coord_initial": event.coord_initial,
-            "coord_end": event.coord_end,
-            "image_path": image_path,
-            "cropped_path": cropped_path,  # Caminho da imagem recortada
-            "timestamp": datetime.now().strftime("%d/%m/%Y %H:%M:%S"),
-        }
-        
-        logger.info(f"Evento recebido e armazenado com ID: {event_id}")
-        logger.info(f"Imagem completa: {image_path}")
-        logger.info(f"Imagem recortada: {cropped_path}")
-        
+        event_id = store_event(events[0])
         return {"status": "success", "event_id": event_id}
         
     except Exception as e:
         logger.error(f"Erro ao processar evento: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.post("/events/receive/batch")
+async def receive_event_batch(request: Request):
+    """
+    Endpoint para receber um lote de eventos em uma única requisição.
+    Eventos com erro são ignorados sem descartar o restante do lote.
+    """
+    events = await parse_events(request)
+    event_ids = []
+    failed = 0
+    for event in events:
+        try:
+            event_ids.append(store_event(event))
+        except Exception as e:
+            failed += 1
+            logger.error(f"Erro ao processar evento do lote: {e}")
+
+    logger.info(f"Lote recebido: {len(event_ids)} eventos armazenados, {failed} com erro")
+    return {"status": "success", "event_ids": event_ids, "failed": failed}
+
 @app.get("/", response_class=HTMLResponse)
 async def home(request: Request):
     """
@@ -513,6 +612,13 @@ event_detail_html = """
                     <img src="/{{ event.cropped_path }}" alt="Objeto recortado">
                 </div>
                 {% endif %}
+
+                {% if event.thumbnail_path %}
+                <div class="image-box">
+                    <h3>Miniatura do Frame</h3>
+                    <img src="/{{ event.thumbnail_path }}" alt="Miniatura do frame">
+                </div>
+                {% endif %}
             </div>
             
             <div class="detail-info">
@@ -543,6 +649,11 @@ event_detail_html = """
                     
                     <dt>Coordenadas Finais:</dt>
                     <dd>{{ event.coord_end }}</dd>
+
+                    {% if event.crop_origin %}
+                    <dt>Origem do Recorte no Frame:</dt>
+                    <dd>{{ event.crop_origin }}</dd>
+                    {% endif %}
                 </dl>
             </div>
             
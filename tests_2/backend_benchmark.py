@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+Benchmark dos backends de inferência (app/core/model_export.py)
+Compara a latência por frame de yolov8n/s/m em PyTorch, ONNX Runtime, OpenVINO e INT8
+(os backends exportados são usados apenas se as dependências estiverem instaladas).
+A primeira execução exporta os modelos para o cache (MODEL_CACHE_DIR).
+
+Uso (a partir da raiz do projeto):
+    python tests_2/backend_benchmark.py [--video prepared.flv] [--frames 100] [--device cpu]
+"""
+import argparse
+import importlib.util
+import json
+import os
+import statistics
+import sys
+import time
+from datetime import datetime
+
+import cv2
+import numpy as np
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+from app.core.model_export import DEFAULT_IMGSZ, load_model  # noqa: E402
+
+MODELS = ["yolov8n.pt", "yolov8s.pt", "yolov8m.pt"]
+
+# Pacote necessário para cada backend
+BACKEND_REQUIREMENTS = {
+    "pytorch": "torch",
+    "onnx": "onnxruntime",
+    "openvino": "openvino",
+    "onnx-int8": "onnxruntime",  # requer frames de calibração (app/core/quantization.py)
+}
+
+
+def available_backends():
+    return [
+        backend
+        for backend, package in BACKEND_REQUIREMENTS.items()
+        if importlib.util.find_spec(package) is not None
+    ]
+
+
+def load_frames(video_path, count):
+    """Frames do vídeo de teste, se existir, ou sintéticos (720p)"""
+    frames = []
+    if video_path and os.path.exists(video_path):
+        capture = cv2.VideoCapture(video_path)
+        while len(frames) < count:
+            ret, frame = capture.read()
+            if not ret:
+                break
+            frames.append(frame)
+        capture.release()
+
+    if not frames:
+        print("⚠️  Vídeo não encontrado, usando frames sintéticos (sem objetos reais)")
+        rng = np.random.default_rng(0)
+        frames = [rng.integers(0, 255, (720, 1280, 3), dtype=np.uint8) for _ in range(count)]
+
+    return frames
+
+
+def benchmark(model, frames, device, warmup=10):
+    """Latência por frame (ms) e média de detecções por frame"""
+    for frame in frames[:warmup]:
+        model.predict(frame, device=device, verbose=False)
+
+    times = []
+    detections = 0
+    for frame in frames:
+        start = time.perf_counter()
+        results = model.predict(frame, device=device, verbose=False)
+        times.append((time.perf_counter() - start) * 1000)
+        detections += len(results[0].boxes)
+
+    return {
+        "mean_ms": round(statistics.mean(times), 2),
+        "p50_ms": round(statistics.median(times), 2),
+        "p95_ms": round(sorted(times)[int(len(times) * 0.95) - 1], 2),
+        "fps": round(1000 / statistics.mean(times), 1),
+        "detections_per_frame": round(detections / len(frames), 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark dos backends de inferência")
+    parser.add_argument("--video", default="prepared.flv")
+    parser.add_argument("--frames", type=int, default=100)
+    parser.add_argument("--device", default="cpu")
+    parser.add_argument("--models", nargs="+", default=MODELS)
+    parser.add_argument("--output", default=None)
+    args = parser.parse_args()
+
+    backends = available_backends()
+    frames = load_frames(args.video, args.frames)
+
+    print(f"🔧 Backends disponíveis: {', '.join(backends)}")
+    print(f"🖼️  {len(frames)} frames, imgsz={DEFAULT_IMGSZ}, device={args.device}\n")
+
+    results = []
+    print(f"{'Modelo':<12} {'Backend':<10} {'Média':>9} {'P50':>9} {'P95':>9} {'FPS':>7} {'Det/frame':>10}")
+    print("-" * 72)
+
+    for model_path in args.models:
+        for backend in backends:
+            try:
+                model = load_model(model_path, backend)
+                stats = benchmark(model, frames, args.device)
+            except Exception as e:
+                print(f"{model_path:<12} {backend:<10} ❌ {e}")
+                continue
+
+            results.append({"model": model_path, "backend": backend, **stats})
+            print(
+                f"{model_path:<12} {backend:<10} {stats['mean_ms']:>7.2f}ms "
+                f"{stats['p50_ms']:>7.2f}ms {stats['p95_ms']:>7.2f}ms "
+                f"{stats['fps']:>7.1f} {stats['detections_per_frame']:>10.2f}"
+            )
+
+    output = args.output or os.path.join(
+        os.path.dirname(os.path.abspath(__file__)),
+        f"backend_benchmark_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json",
+    )
+    with open(output, "w") as f:
+        json.dump(
+            {"device": args.device, "imgsz": DEFAULT_IMGSZ, "frames": len(frames), "results": results},
+            f,
+            indent=2,
+        )
+    print(f"\n💾 Resultados salvos em {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Benchmark de inicialização das câmeras (app/core/worker_launcher.py)
+Inicia N câmeras por /monitor/batch na API já rodando e mede o tempo até todas
+chegarem ao estado "running" e a memória (RSS e PSS) dos processos de câmera.
+Para comparar os lançadores, rode uma vez com a API iniciada com
+CAMERA_LAUNCHER=zygote e outra com CAMERA_LAUNCHER=process.
+
+Uso (com a API e as streams de teste rodando):
+    python tests_2/camera_startup_benchmark.py --cameras 20 --model yolov8n.pt
+"""
+import argparse
+import json
+import os
+import time
+from datetime import datetime
+
+import requests
+
+API_URL = "http://localhost:8000"
+
+
+def wait_until_running(camera_ids, timeout):
+    """Aguarda todas as câmeras chegarem a "running". Retorna a última resposta do /monitored."""
+    deadline = time.time() + timeout
+    while True:
+        monitored = requests.get(f"{API_URL}/monitored", timeout=10).json()
+        states = {
+            camera["camera_id"]: camera.get("process_info", {}).get("status", {}).get("state")
+            for camera in monitored["cameras"]
+        }
+        if all(states.get(camera_id) == "running" for camera_id in camera_ids):
+            return monitored
+        if time.time() > deadline:
+            print(f"⚠️  Timeout: {sum(s == 'running' for s in states.values())} câmeras em running")
+            return monitored
+        time.sleep(0.2)
+
+
+def summarize(monitored, elapsed):
+    cameras = [camera for camera in monitored["cameras"] if "process_info" in camera]
+    memory = [camera["process_info"].get("memory") or {} for camera in cameras]
+    startup = [
+        camera["process_info"]["status"]["startup_seconds"]
+        for camera in cameras
+        if (camera["process_info"].get("status") or {}).get("startup_seconds") is not None
+    ]
+    launcher = monitored.get("camera_launcher") or {}
+    launcher_memory = launcher.get("memory") or {}
+
+    return {
+        "cameras": len(cameras),
+        "all_running_seconds": round(elapsed, 2),
+        "startup_seconds_max": round(max(startup), 2) if startup else None,
+        "startup_seconds_mean": round(sum(startup) / len(startup), 2) if startup else None,
+        "workers_rss_mb": round(sum(m.get("rss_mb", 0) for m in memory), 1),
+        "workers_pss_mb": round(sum(m.get("pss_mb", 0) for m in memory), 1),
+        "worker_private_mb_mean": (
+            round(sum(m.get("private_mb", 0) for m in memory) / len(memory), 1) if memory else None
+        ),
+        "zygote_pss_mb": launcher_memory.get("pss_mb"),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de inicialização das câmeras")
+    parser.add_argument("--cameras", type=int, default=20)
+    parser.add_argument("--first-camera", type=int, default=1)
+    parser.add_argument("--model", default="yolov8n.pt")
+    parser.add_argument("--fps", type=float, default=5)
+    parser.add_argument("--device", default="cpu")
+    parser.add_argument("--timeout", type=float, default=300)
+    parser.add_argument("--output", default=None)
+    args = parser.parse_args()
+
+    camera_ids = list(range(args.first_camera, args.first_camera + args.cameras))
+    requests.post(f"{API_URL}/stop/all", timeout=30)
+
+    start = time.time()
+    response = requests.post(
+        f"{API_URL}/monitor/batch",
+        json={
+            "camera_ids": camera_ids,
+            "device": args.device,
+            "tracker_model": "botsort.yaml",
+            "classes": ["car", "truck", "bus", "person"],
+            "detection_model_path": args.model,
+            "frames_per_second": args.fps,
+            "frames_before_disappearance": 5,
+            "confidence_threshold": 0.50,
+            "iou": 0.5,
+            "min_track_frames": 5,
+        },
+        timeout=args.timeout,
+    )
+    response.raise_for_status()
+
+    monitored = wait_until_running(camera_ids, args.timeout)
+    result = summarize(monitored, time.time() - start)
+    requests.post(f"{API_URL}/stop/all", timeout=30)
+
+    for key, value in result.items():
+        print(f"{key:<26} {value}")
+
+    output = args.output or os.path.join(
+        os.path.dirname(os.path.abspath(__file__)),
+        f"camera_startup_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json",
+    )
+    with open(output, "w") as f:
+        json.dump({"model": args.model, **result}, f, indent=2)
+    print(f"\n💾 Resultados salvos em {output}")
+
+
+if __name__ == "__main__":
+    main()
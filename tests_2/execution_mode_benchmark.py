@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+Benchmark dos modos de execução das câmeras (EXECUTION_MODE)
+Compara thread, process e pool com 1, 5, 10 e 50 câmeras: FPS e latência
+(metrics_server), CPU/RAM do sistema e memória (PSS) dos processos de câmera.
+Reinicia a API com o EXECUTION_MODE de cada rodada; usa a mesma infraestrutura
+(streams FFMPEG, metrics_server) do performance_test.py.
+
+Uso (a partir da raiz do projeto, com o servidor RTMP rodando):
+    python tests_2/execution_mode_benchmark.py [--fps 5] [--model yolov8n.pt] [--pool-workers 4]
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from datetime import datetime
+
+import requests
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from performance_test import PerformanceTest  # noqa: E402
+
+MODES = ["thread", "process", "pool"]
+CAMERAS = [1, 5, 10, 50]
+
+
+class ExecutionModeBenchmark(PerformanceTest):
+    def __init__(self, fps, model, pool_workers, duration):
+        super().__init__()
+        self.fps = fps
+        self.model = model
+        self.pool_workers = pool_workers
+        self.test_duration = duration
+        self.mode = None
+
+    def start_main_app(self):
+        """Inicia a API com o modo de execução da rodada"""
+        env = f"EXECUTION_MODE={self.mode}"
+        if self.pool_workers:
+            env += f" POOL_WORKERS={self.pool_workers}"
+        self.start_process(f"{env} uvicorn app.main:app --host 0.0.0.0 --port 8000", "Main App")
+        if not self.wait_for_service("http://localhost:8000"):
+            raise Exception("Main app não iniciou")
+        time.sleep(2)
+
+    def collect_camera_memory(self):
+        """Memória dos processos das câmeras (no modo pool várias câmeras têm o mesmo PID)"""
+        try:
+            monitored = requests.get("http://localhost:8000/monitored", timeout=10).json()
+        except Exception:
+            return {}
+
+        memory_by_pid = {}
+        for camera in monitored.get("cameras", []):
+            info = camera.get("process_info") or {}
+            if info.get("pid") is not None and info.get("memory"):
+                memory_by_pid[info["pid"]] = info["memory"]
+
+        return {
+            "processes": len(memory_by_pid),
+            "rss_mb": round(sum(m.get("rss_mb", 0) for m in memory_by_pid.values()), 1),
+            "pss_mb": round(sum(m.get("pss_mb", 0) for m in memory_by_pid.values()), 1),
+        }
+
+    def run_mode(self, mode):
+        self.mode = mode
+        print(f"\n{'#'*60}\n⚙️  EXECUTION_MODE={mode}\n{'#'*60}")
+        try:
+            self.start_metrics_server()
+            self.start_main_app()
+
+            for num_cameras in CAMERAS:
+                result = self.run_single_test(num_cameras, self.fps, self.model)
+                if result:
+                    result["config"]["execution_mode"] = mode
+                    self.results.append(result)
+                    self.save_consolidated_results(final=False)
+                time.sleep(5)
+        finally:
+            self.stop_all_processes()
+
+    def collect_system_metrics(self, duration):
+        # A memória é lida com as câmeras ainda rodando
+        metrics = super().collect_system_metrics(duration)
+        metrics["camera_memory"] = self.collect_camera_memory()
+        return metrics
+
+    def print_summary(self):
+        print(f"\n{'modo':<8} {'câmeras':>7} {'fps':>6} {'lat(ms)':>8} {'cpu%':>6} {'procs':>6} {'pss(MB)':>8}")
+        for r in self.results:
+            app, system = r["app"], r["system"]
+            memory = system.get("camera_memory", {})
+            print(
+                f"{r['config']['execution_mode']:<8} {r['config']['cameras']:>7} "
+                f"{app.get('avg_fps', 0):>6} {app.get('avg_latency', 0):>8} "
+                f"{system['cpu_avg']:>6} {memory.get('processes', '-'):>6} "
+                f"{memory.get('pss_mb', '-'):>8}"
+            )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark dos modos de execução das câmeras")
+    parser.add_argument("--fps", type=float, default=5)
+    parser.add_argument("--model", default="yolov8n.pt")
+    parser.add_argument("--pool-workers", type=int, default=None)
+    parser.add_argument("--duration", type=int, default=60)
+    parser.add_argument("--modes", nargs="+", default=MODES, choices=MODES)
+    args = parser.parse_args()
+
+    benchmark = ExecutionModeBenchmark(args.fps, args.model, args.pool_workers, args.duration)
+    if not os.path.exists(benchmark.video_path):
+        print(f"❌ Vídeo não encontrado: {benchmark.video_path}")
+        return
+
+    try:
+        for mode in args.modes:
+            benchmark.run_mode(mode)
+    except KeyboardInterrupt:
+        print("\n\n⚠️  Teste interrompido pelo usuário")
+    finally:
+        benchmark.stop_all_processes()
+
+    output = os.path.join(
+        benchmark.test_dir, f"execution_modes_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    )
+    with open(output, "w") as f:
+        json.dump(benchmark.results, f, indent=2)
+    benchmark.print_summary()
+    print(f"\n💾 Resultados salvos em {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark dos codificadores JPEG (app/utils/jpeg_encoders.py)
+Mede o tempo de codificação por frame de cada backend disponível, com e sem o
+preset rápido, nas resoluções do workload.json (360p, 720p, 1080p).
+
+Uso:
+    python tests_2/jpeg_encoder_benchmark.py [--video prepared.flv] [--iterations 200]
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+from datetime import datetime
+
+import cv2
+import numpy as np
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+from app.utils.jpeg_encoders import available_backends, create_jpeg_encoder  # noqa: E402
+
+RESOLUTIONS = {
+    "360p": (640, 360),
+    "720p": (1280, 720),
+    "1080p": (1920, 1080),
+}
+
+QUALITY = 75  # mesmo padrão de QUALITY_CONVERT
+
+
+def load_resolutions(workload_path):
+    """Resoluções dos cenários do workload.json"""
+    with open(workload_path) as f:
+        workload = json.load(f)
+    names = []
+    for cenario in workload["cenarios"]:
+        if cenario["resolucao"] in RESOLUTIONS and cenario["resolucao"] not in names:
+            names.append(cenario["resolucao"])
+    return names
+
+
+def load_frame(video_path):
+    """Frame de referência: do vídeo de teste, se existir, ou sintético"""
+    if video_path and os.path.exists(video_path):
+        capture = cv2.VideoCapture(video_path)
+        # Pula alguns frames para evitar telas pretas do início
+        for _ in range(30):
+            capture.grab()
+        ret, frame = capture.read()
+        capture.release()
+        if ret:
+            return frame
+        print(f"⚠️  Não foi possível ler {video_path}, usando frame sintético")
+
+    # Gradiente + ruído: evita o caso trivial de imagem uniforme
+    height, width = RESOLUTIONS["1080p"][1], RESOLUTIONS["1080p"][0]
+    rng = np.random.default_rng(0)
+    gradient = np.linspace(0, 255, width, dtype=np.float32)[None, :, None]
+    frame = np.broadcast_to(gradient, (height, width, 3)).astype(np.float32)
+    frame += rng.normal(0, 20, (height, width, 3))
+    return np.clip(frame, 0, 255).astype(np.uint8)
+
+
+def benchmark(encoder, frame, iterations, warmup=10):
+    """Tempo por frame (ms) e tamanho médio do JPEG"""
+    for _ in range(warmup):
+        encoder.encode(frame, QUALITY)
+
+    times = []
+    size = 0
+    for _ in range(iterations):
+        start = time.perf_counter()
+        data = encoder.encode(frame, QUALITY)
+        times.append((time.perf_counter() - start) * 1000)
+        size += len(data)
+
+    return {
+        "mean_ms": round(statistics.mean(times), 3),
+        "p50_ms": round(statistics.median(times), 3),
+        "p95_ms": round(sorted(times)[int(len(times) * 0.95) - 1], 3),
+        "avg_kb": round(size / iterations / 1024, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark dos codificadores JPEG")
+    parser.add_argument("--video", default="prepared.flv")
+    parser.add_argument("--workload", default=os.path.join(ROOT_DIR, "workload.json"))
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--output", default=None)
+    args = parser.parse_args()
+
+    resolutions = load_resolutions(args.workload)
+    backends = available_backends()
+    base_frame = load_frame(args.video)
+
+    print(f"🔧 Backends disponíveis: {', '.join(backends)}")
+    print(f"📐 Resoluções: {', '.join(resolutions)}\n")
+
+    results = []
+    print(f"{'Resolução':<10} {'Backend':<12} {'Preset':<8} {'Média':>9} {'P50':>9} {'P95':>9} {'Tamanho':>10}")
+    print("-" * 72)
+
+    for resolution in resolutions:
+        frame = cv2.resize(base_frame, RESOLUTIONS[resolution])
+        for backend in backends:
+            for fast in (False, True):
+                encoder = create_jpeg_encoder(backend, fast=fast)
+                stats = benchmark(encoder, frame, args.iterations)
+                results.append(
+                    {"resolution": resolution, "backend": backend, "fast": fast, **stats}
+                )
+                print(
+                    f"{resolution:<10} {backend:<12} {'rápido' if fast else 'padrão':<8} "
+                    f"{stats['mean_ms']:>7.2f}ms {stats['p50_ms']:>7.2f}ms "
+                    f"{stats['p95_ms']:>7.2f}ms {stats['avg_kb']:>8.1f}KB"
+                )
+
+    output = args.output or os.path.join(
+        os.path.dirname(os.path.abspath(__file__)),
+        f"jpeg_benchmark_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json",
+    )
+    with open(output, "w") as f:
+        json.dump({"quality": QUALITY, "iterations": args.iterations, "results": results}, f, indent=2)
+    print(f"\n💾 Resultados salvos em {output}")
+
+
+if __name__ == "__main__":
+    main()
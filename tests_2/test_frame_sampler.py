@@ -0,0 +1,76 @@
+"""
+Testes da amostragem por tempo de stream (app/core/frame_sampler.py)
+
+Uso (a partir da raiz do projeto):
+    python -m pytest tests_2/test_frame_sampler.py
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.frame_sampler import FrameSampler  # noqa: E402
+
+
+def run_sampler(sampler, positions_ms):
+    """
+    Simula o loop de captura: grab de cada frame e retrieve só dos
+    selecionados. Retorna os índices dos frames decodificados.
+    """
+    selected = []
+    for index, position in enumerate(positions_ms):
+        if sampler.should_decode(position):
+            sampler.mark_decoded()
+            selected.append(index)
+    return selected
+
+
+def test_timestamps_used_when_first_frame_is_zero():
+    # Fonte VFR que informa CAP_PROP_FPS errado (30): os frames chegam a cada
+    # 100 ms e o primeiro tem POS_MSEC = 0
+    sampler = FrameSampler(target_fps=2, source_fps=30)
+    positions = [i * 100.0 for i in range(41)]
+
+    selected = run_sampler(sampler, positions)
+
+    # 2 fps pelo tempo da stream: um frame a cada 500 ms (5 frames da fonte)
+    assert selected[-4:] == [25, 30, 35, 40]
+    assert len(selected) == 9
+    assert sampler.frames_grabbed == 41
+    assert sampler.frames_decoded == 9
+
+
+def test_frame_index_without_timestamps():
+    sampler = FrameSampler(target_fps=5, source_fps=25)
+
+    selected = run_sampler(sampler, [0.0] * 50)
+
+    assert selected == list(range(0, 50, 5))
+    assert sampler.stats() == {
+        "frames_grabbed": 50,
+        "frames_decoded": 10,
+        "source_fps": 25.0,
+    }
+
+
+def test_missing_timestamps_keep_schedule():
+    # Fonte a 10 fps com alguns frames sem timestamp: a agenda de 5 fps continua
+    sampler = FrameSampler(target_fps=5, source_fps=10)
+    positions = [0.0, 100.0, 200.0, None, 400.0, None, 600.0, 700.0, 800.0]
+
+    selected = run_sampler(sampler, positions)
+
+    assert selected == [0, 2, 4, 6, 8]
+
+
+def test_reset_restarts_timeline():
+    sampler = FrameSampler(target_fps=1, source_fps=10)
+    run_sampler(sampler, [0.0, 100.0, 200.0])
+
+    # Após reconexão a stream recomeça do zero: o primeiro frame é decodificado
+    sampler.reset()
+    selected = run_sampler(sampler, [0.0, 100.0])
+
+    assert selected == [0]
+    assert sampler.frames_grabbed == 5
+    assert sampler.frames_decoded == 2
@@ -0,0 +1,293 @@
+#!/usr/bin/env python3
+"""
+Benchmark dos trackers (tracker_model): kalman_iou x ByteTrack x BoT-SORT
+Alimenta cada tracker (pelo mesmo CameraTracker usado nas câmeras) com
+sequências de detecções gravadas e mede o tempo de update por frame e as
+trocas de ID (ID switches, como no CLEAR MOT: um objeto do ground truth que
+passa a ser associado a outro track).
+
+As sequências podem ser:
+- sintéticas (padrão): objetos com velocidade quase constante que entram,
+  saem e se cruzam, com detecções perdidas, ruído nas caixas e falsos
+  positivos; o ground truth é conhecido;
+- no formato MOTChallenge (--mot DIR, uma ou mais): DIR/det/det.txt com as
+  detecções, DIR/gt/gt.txt (opcional) com o ground truth e DIR/img1
+  (opcional) com os frames, usados pela compensação de movimento do BoT-SORT.
+
+Uso:
+    python tests_2/tracker_benchmark.py [--sequences 5 --frames 600 --objects 20]
+    python tests_2/tracker_benchmark.py --mot MOT17/train/MOT17-04-FRCNN MOT17/train/MOT17-09-FRCNN
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+from datetime import datetime
+
+import cv2
+import lap
+import numpy as np
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+from app.core.kalman_tracker import iou_matrix  # noqa: E402
+from app.core.tracking import CameraTracker  # noqa: E402
+
+TRACKERS = ["kalman_iou", "bytetrack.yaml", "botsort.yaml"]
+
+# IoU mínimo para associar um objeto do ground truth a um track
+GT_MATCH_IOU = 0.5
+
+# Parâmetros das sequências sintéticas
+FRAME_SIZE = (1280, 720)
+DETECTION_RATE = 0.9  # probabilidade de um objeto visível ser detectado
+BOX_NOISE = 0.03  # desvio do ruído das caixas, em fração do tamanho
+FALSE_POSITIVES = 0.5  # falsos positivos por frame (média)
+
+
+def synthetic_sequence(num_frames, num_objects, seed):
+    """Sequência sintética: lista de (detecções N x 6, ids do gt, caixas do gt)"""
+    rng = np.random.default_rng(seed)
+    width, height = FRAME_SIZE
+
+    objects = []
+    for object_id in range(1, num_objects + 1):
+        box_w = rng.uniform(30, 120)
+        objects.append(
+            {
+                "id": object_id,
+                "start": int(rng.uniform(0, num_frames * 0.7)),
+                "end": num_frames,
+                "center": np.array([rng.uniform(0, width), rng.uniform(0, height)]),
+                "velocity": rng.uniform(-6, 6, 2),
+                "size": np.array([box_w, box_w * rng.uniform(1.5, 3.0)]),
+            }
+        )
+
+    sequence = []
+    for frame_index in range(num_frames):
+        detections, gt_ids, gt_boxes = [], [], []
+
+        for obj in objects:
+            if not obj["start"] <= frame_index < obj["end"]:
+                continue
+            if frame_index > obj["start"]:
+                obj["velocity"] += rng.normal(0, 0.15, 2)
+                obj["center"] += obj["velocity"]
+
+            half = obj["size"] / 2
+            box = np.concatenate([obj["center"] - half, obj["center"] + half])
+            if box[2] < 0 or box[3] < 0 or box[0] > width or box[1] > height:
+                obj["end"] = frame_index  # saiu do frame
+                continue
+
+            gt_ids.append(obj["id"])
+            gt_boxes.append(box)
+            if rng.random() < DETECTION_RATE:
+                noisy = box + rng.normal(0, BOX_NOISE, 4) * np.tile(obj["size"], 2)
+                detections.append([*noisy, rng.uniform(0.4, 0.95), 0])
+
+        for _ in range(rng.poisson(FALSE_POSITIVES)):
+            x, y = rng.uniform(0, width - 60), rng.uniform(0, height - 120)
+            box_w = rng.uniform(20, 60)
+            detections.append([x, y, x + box_w, y + 2 * box_w, rng.uniform(0.25, 0.5), 0])
+
+        sequence.append(
+            (
+                np.array(detections, dtype=np.float32).reshape(-1, 6),
+                np.array(gt_ids, dtype=np.int64),
+                np.array(gt_boxes, dtype=np.float64).reshape(-1, 4),
+            )
+        )
+
+    return sequence
+
+
+def _read_mot_file(path):
+    """Linhas do arquivo MOT (frame, id, x, y, w, h, ...) agrupadas por frame"""
+    data = np.loadtxt(path, delimiter=",", ndmin=2)
+    frames = {}
+    for row in data:
+        frames.setdefault(int(row[0]), []).append(row)
+    return {frame: np.array(rows) for frame, rows in frames.items()}
+
+
+def _mot_boxes(rows):
+    boxes = rows[:, 2:6].copy()
+    boxes[:, 2:] += boxes[:, :2]
+    return boxes
+
+
+def mot_sequence(directory):
+    """Sequência no formato MOTChallenge (o ground truth é opcional)"""
+    detections = _read_mot_file(os.path.join(directory, "det", "det.txt"))
+    gt_path = os.path.join(directory, "gt", "gt.txt")
+    gt = _read_mot_file(gt_path) if os.path.exists(gt_path) else {}
+
+    sequence = []
+    for frame in range(1, max(detections) + 1):
+        rows = detections.get(frame, np.empty((0, 7)))
+        dets = np.column_stack([_mot_boxes(rows), rows[:, 6], np.zeros(len(rows))])
+
+        gt_rows = gt.get(frame, np.empty((0, 7)))
+        if gt_rows.shape[1] > 6:
+            gt_rows = gt_rows[gt_rows[:, 6] > 0]  # só objetos marcados para avaliação
+        sequence.append(
+            (dets.astype(np.float32), gt_rows[:, 1].astype(np.int64), _mot_boxes(gt_rows))
+        )
+
+    return sequence, bool(gt)
+
+
+def mot_frames(directory, num_frames):
+    """Frames de DIR/img1, se existirem (None caso contrário)"""
+    image_dir = os.path.join(directory, "img1")
+    if not os.path.isdir(image_dir):
+        return None
+    names = sorted(os.listdir(image_dir))[:num_frames]
+    return [os.path.join(image_dir, name) for name in names]
+
+
+def background_frame(sequence):
+    """Frame estático com textura, do tamanho da cena (para o GMC do BoT-SORT)"""
+    extent = [FRAME_SIZE[0], FRAME_SIZE[1]]
+    for detections, _, _ in sequence:
+        if len(detections):
+            extent = np.maximum(extent, detections[:, 2:4].max(axis=0))
+    width, height = int(extent[0]), int(extent[1])
+
+    rng = np.random.default_rng(0)
+    texture = rng.integers(0, 256, (height // 8 + 1, width // 8 + 1, 3), dtype=np.uint8)
+    return cv2.resize(texture, (width, height), interpolation=cv2.INTER_NEAREST)
+
+
+class IdSwitchCounter:
+    """Trocas de ID e cobertura do ground truth pelos tracks"""
+
+    def __init__(self):
+        self.last_track = {}
+        self.id_switches = 0
+        self.matched = 0
+        self.total = 0
+        self.track_ids = set()
+
+    def update(self, gt_ids, gt_boxes, tracks):
+        self.total += len(gt_ids)
+        self.track_ids.update(int(track_id) for track_id in tracks[:, 4])
+        if len(gt_ids) == 0 or len(tracks) == 0:
+            return
+
+        cost = 1.0 - iou_matrix(gt_boxes, tracks[:, :4].astype(np.float64))
+        _, assignment, _ = lap.lapjv(cost, extend_cost=True, cost_limit=1.0 - GT_MATCH_IOU)
+
+        for gt_index in np.flatnonzero(assignment >= 0):
+            gt_id = int(gt_ids[gt_index])
+            track_id = int(tracks[assignment[gt_index], 4])
+            previous = self.last_track.get(gt_id)
+            if previous is not None and previous != track_id:
+                self.id_switches += 1
+            self.last_track[gt_id] = track_id
+            self.matched += 1
+
+
+def run_tracker(tracker_model, sequence, frames, frame_rate):
+    """Tempo de update por frame (ms) e métricas de identidade de uma sequência"""
+    tracker = CameraTracker(tracker_model, frame_rate)
+    counter = IdSwitchCounter()
+    times = []
+
+    for index, (detections, gt_ids, gt_boxes) in enumerate(sequence):
+        frame = frames[index] if isinstance(frames, list) else frames
+        if isinstance(frame, str):
+            frame = cv2.imread(frame)
+
+        start = time.perf_counter()
+        tracks = tracker.update(detections, frame)
+        times.append((time.perf_counter() - start) * 1000)
+
+        counter.update(gt_ids, gt_boxes, tracks)
+
+    return times, counter
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark dos trackers")
+    parser.add_argument("--trackers", nargs="+", default=TRACKERS)
+    parser.add_argument("--mot", nargs="+", default=None, help="sequências no formato MOT")
+    parser.add_argument("--sequences", type=int, default=5)
+    parser.add_argument("--frames", type=int, default=600)
+    parser.add_argument("--objects", type=int, default=20)
+    parser.add_argument("--frame-rate", type=int, default=30)
+    parser.add_argument("--output", default=None)
+    args = parser.parse_args()
+
+    sequences = []
+    if args.mot:
+        for directory in args.mot:
+            sequence, has_gt = mot_sequence(directory)
+            if not has_gt:
+                print(f"⚠️  {directory} sem gt/gt.txt: só o tempo será medido")
+            frames = mot_frames(directory, len(sequence)) or background_frame(sequence)
+            sequences.append((os.path.basename(os.path.normpath(directory)), sequence, frames))
+    else:
+        for seed in range(args.sequences):
+            sequence = synthetic_sequence(args.frames, args.objects, seed)
+            sequences.append((f"synthetic_{seed}", sequence, background_frame(sequence)))
+
+    print(f"🎞️  {len(sequences)} sequência(s), trackers: {', '.join(args.trackers)}\n")
+    print(f"{'Tracker':<16} {'Média':>9} {'P95':>9} {'ID sw':>7} {'Cobertura':>10} {'IDs':>6}")
+    print("-" * 62)
+
+    results = []
+    for tracker_model in args.trackers:
+        all_times, per_sequence = [], []
+        totals = {"id_switches": 0, "matched": 0, "total": 0, "ids": 0}
+
+        for name, sequence, frames in sequences:
+            times, counter = run_tracker(tracker_model, sequence, frames, args.frame_rate)
+            all_times.extend(times)
+            per_sequence.append(
+                {
+                    "sequence": name,
+                    "frames": len(sequence),
+                    "mean_ms": round(statistics.mean(times), 3),
+                    "id_switches": counter.id_switches,
+                    "ids_created": len(counter.track_ids),
+                }
+            )
+            totals["id_switches"] += counter.id_switches
+            totals["matched"] += counter.matched
+            totals["total"] += counter.total
+            totals["ids"] += len(counter.track_ids)
+
+        coverage = totals["matched"] / totals["total"] if totals["total"] else None
+        summary = {
+            "tracker": tracker_model,
+            "mean_ms": round(statistics.mean(all_times), 3),
+            "p95_ms": round(sorted(all_times)[int(len(all_times) * 0.95) - 1], 3),
+            "id_switches": totals["id_switches"],
+            "coverage": round(coverage, 4) if coverage is not None else None,
+            "ids_created": totals["ids"],
+            "sequences": per_sequence,
+        }
+        results.append(summary)
+        print(
+            f"{tracker_model:<16} {summary['mean_ms']:>7.3f}ms {summary['p95_ms']:>7.3f}ms "
+            f"{summary['id_switches']:>7} "
+            f"{'-' if coverage is None else f'{coverage:.1%}':>10} {summary['ids_created']:>6}"
+        )
+
+    output = args.output or os.path.join(
+        os.path.dirname(os.path.abspath(__file__)),
+        f"tracker_benchmark_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json",
+    )
+    with open(output, "w") as f:
+        json.dump({"frame_rate": args.frame_rate, "results": results}, f, indent=2)
+    print(f"\n💾 Resultados salvos em {output}")
+
+
+if __name__ == "__main__":
+    main()